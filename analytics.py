@@ -0,0 +1,366 @@
+"""Offline analytics over answer logs: calibrated word difficulties
+
+Reads answer logs written by AnswerLog and computes per word the number
+of answers, the accuracy, the median response time and a Rasch
+(one-parameter IRT) difficulty on the logit scale. It then writes a
+calibration table that the app loads with FROG_CALIBRATION.
+
+Estimation makes a counting pass and a few refinement passes over the logs:
+
+1. Count answers, correct answers and a log-spaced response-time histogram
+   per word, and correct/total answers per session (player).
+2. Alternate, as in joint maximum likelihood with the PROX approximation:
+   a word's difficulty is the mean ability of the players who answered it
+   minus the logit of its accuracy, and a player's ability is the mean
+   difficulty of the words they answered plus the logit of their accuracy.
+   Each pass sums both from the previous estimates. Adaptive selection
+   shows hard words mostly to strong players, so raw accuracy hides how
+   hard a word is; this corrects for it.
+
+Words with at least --min-answers answers are re-levelled by estimated
+difficulty, keeping as many words on each level as the hand-assigned
+levels had.
+
+The logs are split into byte ranges that a process pool parses in chunks
+of NumPy arrays; the parent merges each range's result as it arrives and
+keeps only a few ranges in flight. Memory grows with the number of
+distinct words and sessions, never with the number of answers.
+
+Usage: python analytics.py answers.jsonl [more.jsonl ...] -o calibration.json --workers 8
+       [--bank questions.bank calibrated.bank]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+# Response-time histogram: 96 log-spaced bins from 0.1 s to 2 min; the
+# first and last bins also take anything faster or slower. Counts are
+# 32-bit, enough for 4 billion answers of one word in one bin
+RT_EDGES = np.geomspace(0.1, 120.0, 97)
+RT_DTYPE = np.uint32
+MIN_ANSWERS = 30
+ITERATIONS = 4
+CHUNK_BYTES = 4 << 20
+RECORD_FIELDS = {"session", "word", "difficulty", "correct", "response_time"}
+
+logger = logging.getLogger(__name__)
+
+
+def split_log(path: str, parts: int) -> List[Tuple[str, int, int]]:
+    """Cut a log into about `parts` byte ranges that start at line starts"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            bounds.append(max(bounds[-1], min(f.tell(), size)))
+    bounds.append(size)
+    return [(path, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def read_chunks(path: str, start: int, end: int, chunk_bytes: int = CHUNK_BYTES, report: bool = True) -> Iterator[list]:
+    """Answer records of a byte range, parsed a chunk of lines at a time
+
+    A final line without a newline (a batch cut short by a crash) is
+    skipped, and so are lines that cannot be decoded, as in
+    answer_log.read_answer_log; with `report` their number is logged.
+    """
+    skipped = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        position, rest = start, b""
+        while position < end:
+            block = f.read(min(chunk_bytes, end - position))
+            if not block:
+                break
+            position += len(block)
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            lines, rest = block[:cut], block[cut:]
+            lines = [line for line in lines.split(b"\n") if line.strip()]
+            if not lines:
+                continue
+            try:
+                # One json.loads per chunk is much faster than one per line
+                records = json.loads(b"[" + b",".join(lines) + b"]")
+            except ValueError:
+                records = []
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if isinstance(record, dict) and RECORD_FIELDS <= record.keys():
+                        records.append(record)
+                    else:
+                        skipped += 1
+            yield records
+    if skipped and report:
+        logger.warning("Skipped %d unreadable lines of %s", skipped, path)
+
+
+def session_hashes(sessions) -> Tuple[np.ndarray, np.ndarray]:
+    """Stable 64-bit hashes of the distinct sessions, and each record's index into them"""
+    unique, inverse = np.unique(np.array(sessions), return_inverse=True)
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                          for s in unique.tolist()), dtype=np.uint64, count=len(unique))
+    return hashes, inverse
+
+
+def _group(keys: np.ndarray, *values: np.ndarray):
+    """Unique keys and the per-key sums of each values array"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return (unique,) + tuple(np.bincount(inverse, weights=v, minlength=len(unique)) for v in values)
+
+
+class GroupedSums:
+    """Per-key sums of values added a chunk at a time
+
+    Each chunk is grouped on its own and the grouped chunks are merged
+    into the totals only once they outnumber them, so every key is
+    re-sorted O(log n) times instead of once per chunk.
+    """
+
+    def __init__(self, dtype, values: int):
+        self._parts = [(np.zeros(0, dtype),) + tuple(np.zeros(0) for _ in range(values))]
+        self._grouped = self._pending = 0
+
+    def add(self, keys: np.ndarray, *values: np.ndarray):
+        part = _group(keys, *values)
+        self._parts.append(part)
+        self._pending += len(part[0])
+        if self._pending > self._grouped:
+            self._merge()
+
+    def _merge(self):
+        if len(self._parts) > 1:
+            self._parts = [_group(*(np.concatenate(column) for column in zip(*self._parts)))]
+        self._grouped, self._pending = len(self._parts[0][0]), 0
+
+    def result(self) -> tuple:
+        """Unique keys (sorted) and the per-key sums of each values array"""
+        self._merge()
+        return self._parts[0]
+
+
+def ordered_map(pool, fn, jobs, in_flight: int) -> Iterator:
+    """pool.map that keeps at most `in_flight` jobs submitted or unconsumed"""
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, *job))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+@dataclass
+class WordTally:
+    """Per-word sums of one worker, merged by word in the parent"""
+    words: List[str] = field(default_factory=list)
+    answers: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    correct: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    assigned: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    rt_hist: np.ndarray = field(default_factory=lambda: np.zeros((0, len(RT_EDGES) - 1), RT_DTYPE))
+
+    def __post_init__(self):
+        self._index = {word: i for i, word in enumerate(self.words)}
+
+    def ids(self, words) -> np.ndarray:
+        """Tally rows of `words`, adding rows for new words"""
+        unique, inverse = np.unique(np.array(words), return_inverse=True)
+        rows = np.empty(len(unique), np.int64)
+        for i, word in enumerate(unique.tolist()):
+            row = self._index.get(word)
+            if row is None:
+                row = self._index[word] = len(self.words)
+                self.words.append(word)
+            rows[i] = row
+        grow = len(self.words) - len(self.answers)
+        if grow:
+            self.answers = np.concatenate([self.answers, np.zeros(grow, np.int64)])
+            self.correct = np.concatenate([self.correct, np.zeros(grow, np.int64)])
+            self.assigned = np.concatenate([self.assigned, np.zeros(grow, np.int64)])
+            self.rt_hist = np.concatenate([self.rt_hist, np.zeros((grow, self.rt_hist.shape[1]), RT_DTYPE)])
+        return rows[inverse]
+
+    def merge(self, other: "WordTally"):
+        rows = self.ids(other.words)
+        self.answers[rows] += other.answers
+        self.correct[rows] += other.correct
+        self.assigned[rows] = np.maximum(self.assigned[rows], other.assigned)
+        self.rt_hist[rows] += other.rt_hist
+
+
+def count_range(path: str, start: int, end: int):
+    """Pass 1 over a byte range: word tallies and per-session (correct, total)"""
+    tally = WordTally()
+    sessions = GroupedSums(np.uint64, 2)
+    for records in read_chunks(path, start, end):
+        rows = tally.ids([r["word"] for r in records])
+        correct = np.fromiter((r["correct"] for r in records), dtype=bool, count=len(records))
+        rt = np.fromiter((r["response_time"] for r in records), dtype=np.float64, count=len(records))
+        n = len(tally.words)
+        tally.answers += np.bincount(rows, minlength=n)
+        tally.correct += np.bincount(rows, weights=correct, minlength=n).astype(np.int64)
+        tally.assigned[rows] = np.fromiter((r["difficulty"] for r in records), dtype=np.int64, count=len(records))
+        bins = np.clip(np.searchsorted(RT_EDGES, rt, side="right") - 1, 0, len(RT_EDGES) - 2)
+        tally.rt_hist += np.bincount(rows * tally.rt_hist.shape[1] + bins,
+                                     minlength=tally.rt_hist.size).reshape(tally.rt_hist.shape).astype(RT_DTYPE)
+
+        hashes, inverse = session_hashes([r["session"] for r in records])
+        sessions.add(hashes[inverse], correct.astype(np.float64), np.ones(len(records)))
+    return (tally,) + sessions.result()
+
+
+def refine_range(path: str, start: int, end: int, table_dir: str):
+    """One refinement pass over a byte range
+
+    Returns per word the summed ability of its respondents, and the summed
+    difficulty of the words of each session seen (as indices into the
+    session table).
+    """
+    words = np.load(os.path.join(table_dir, "words.npy")).tolist()
+    difficulty = np.load(os.path.join(table_dir, "difficulty.npy"))
+    hashes = np.load(os.path.join(table_dir, "hashes.npy"), mmap_mode="r")
+    ability = np.load(os.path.join(table_dir, "ability.npy"), mmap_mode="r")
+    index = {word: i for i, word in enumerate(words)}
+    ability_sum = np.zeros(len(words))
+    difficulty_sums = GroupedSums(np.int64, 1)
+    for records in read_chunks(path, start, end, report=False):
+        unique, inverse = np.unique(np.array([r["word"] for r in records]), return_inverse=True)
+        rows = np.fromiter((index[w] for w in unique.tolist()), dtype=np.int64, count=len(unique))[inverse]
+        unique, inverse = session_hashes([r["session"] for r in records])
+        sessions = np.searchsorted(hashes, unique)[inverse]
+        ability_sum += np.bincount(rows, weights=ability[sessions], minlength=len(words))
+        difficulty_sums.add(sessions, difficulty[rows])
+    return (ability_sum,) + difficulty_sums.result()
+
+
+def logit(p):
+    return np.log(p / (1 - p))
+
+
+def median_response_times(rt_hist: np.ndarray) -> np.ndarray:
+    """Median per row of a response-time histogram, interpolated within its bin"""
+    counts = rt_hist.sum(axis=1)
+    cumulative = np.cumsum(rt_hist, axis=1)
+    half = counts / 2
+    bins = np.minimum((cumulative < half[:, None]).sum(axis=1), rt_hist.shape[1] - 1)
+    before = np.where(bins > 0, cumulative[np.arange(len(bins)), bins - 1], 0)
+    inside = np.maximum(rt_hist[np.arange(len(bins)), bins], 1)
+    fraction = np.clip((half - before) / inside, 0, 1)
+    low, high = RT_EDGES[bins], RT_EDGES[bins + 1]
+    return np.where(counts > 0, low * (high / low) ** fraction, np.nan)
+
+
+def relevel(difficulty: np.ndarray, assigned: np.ndarray) -> np.ndarray:
+    """Levels by rank of estimated difficulty, as many words per level as assigned"""
+    levels = np.sort(assigned)
+    calibrated = np.empty_like(assigned)
+    calibrated[np.argsort(difficulty, kind="stable")] = levels
+    return calibrated
+
+
+def analyze(paths: List[str], workers: int = None, min_answers: int = MIN_ANSWERS,
+            iterations: int = ITERATIONS) -> dict:
+    """Calibration table of the answers in `paths`"""
+    workers = workers or os.cpu_count() or 1
+    ranges = [r for path in paths for r in split_log(path, workers * 4)]
+    in_flight = workers * 2
+    tally = WordTally()
+    with ProcessPoolExecutor(workers) as pool:
+        sessions = GroupedSums(np.uint64, 2)
+        for part, hashes, correct, total in ordered_map(pool, count_range, ranges, in_flight):
+            tally.merge(part)
+            sessions.add(hashes, correct, total)
+        s_hash, s_correct, s_total = sessions.result()
+
+        answers = tally.answers
+        calibrated = answers >= min_answers
+        word_logit = logit((tally.correct + 0.5) / (answers + 1))
+        session_logit = logit((s_correct + 0.5) / (s_total + 1))
+        difficulty, ability = -word_logit, session_logit
+
+        # The tables go to the workers as files, the session ones memory-mapped
+        with tempfile.TemporaryDirectory() as table_dir:
+            np.save(os.path.join(table_dir, "hashes.npy"), s_hash)
+            np.save(os.path.join(table_dir, "words.npy"), np.array(tally.words))
+            for _ in range(iterations):
+                if calibrated.any():
+                    difficulty = difficulty - difficulty[calibrated].mean()
+                np.save(os.path.join(table_dir, "difficulty.npy"), difficulty)
+                np.save(os.path.join(table_dir, "ability.npy"), ability)
+                ability_sum, difficulty_sum = np.zeros(len(tally.words)), np.zeros(len(s_hash))
+                jobs = (r + (table_dir,) for r in ranges)
+                for word_sums, s_index, s_sums in ordered_map(pool, refine_range, jobs, in_flight):
+                    ability_sum += word_sums
+                    difficulty_sum[s_index] += s_sums
+                difficulty = ability_sum / np.maximum(answers, 1) - word_logit
+                ability = difficulty_sum / s_total + session_logit
+        if calibrated.any():
+            difficulty -= difficulty[calibrated].mean()
+
+    accuracy = tally.correct / np.maximum(answers, 1)
+    levels = tally.assigned.copy()
+    levels[calibrated] = relevel(difficulty[calibrated], tally.assigned[calibrated])
+    median_rt = median_response_times(tally.rt_hist)
+
+    words = {}
+    for i, word in enumerate(tally.words):
+        words[word] = {
+            "difficulty": int(levels[i]),
+            "assigned": int(tally.assigned[i]),
+            "calibrated": bool(calibrated[i]),
+            "irt": round(float(difficulty[i]), 4),
+            "accuracy": round(float(accuracy[i]), 4),
+            "median_rt": round(float(median_rt[i]), 3),
+            "answers": int(answers[i]),
+        }
+    return {"answers": int(answers.sum()), "sessions": len(s_hash), "min_answers": min_answers, "words": words}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="answer log files (JSON Lines)")
+    parser.add_argument("-o", "--output", default="calibration.json", help="calibration table to write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--min-answers", type=int, default=MIN_ANSWERS, help="answers needed to re-level a word")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS, help="refinement passes over the logs")
+    parser.add_argument("--bank", nargs=2, metavar=("IN", "OUT"), help="also write a re-levelled copy of a bank file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = analyze(args.logs, args.workers, args.min_answers, args.iterations)
+    elapsed = time.perf_counter() - start
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, separators=(",", ":"))
+
+    words = table["words"].values()
+    changed = sum(1 for w in words if w["difficulty"] != w["assigned"])
+    print(f"{table['answers']:,} answers from {table['sessions']:,} sessions in {elapsed:.1f} s "
+          f"({table['answers'] / elapsed:,.0f} answers/s with {args.workers} workers)")
+    print(f"{sum(w['calibrated'] for w in words)} of {len(words)} words calibrated, {changed} changed level")
+    print(f"wrote {args.output}")
+
+    if args.bank:
+        from bank_file import load_bank, write_bank
+        from question_bank import calibrated, load_calibration
+        bank = load_bank(args.bank[0])
+        write_bank(args.bank[1], calibrated((bank[qid] for qid in range(len(bank))), load_calibration(args.output)))
+        print(f"wrote {args.bank[1]}")
+
+
+if __name__ == "__main__":
+    main()
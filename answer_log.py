@@ -0,0 +1,147 @@
+"""Append-only answer event log (JSON Lines)
+
+AnswerLog.append only puts the event in an in-memory buffer; a background
+thread writes buffered events to the file in batches, so answering a
+question never waits for the disk. read_answer_log streams a log back one
+event at a time, so logs of any size can be processed in bounded memory.
+
+A batch cut short by a crash leaves a partial last line. The writer ends
+it with a newline before appending again, and readers skip (and count)
+the lines they cannot decode.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AnswerEvent:
+    session: str
+    word: str
+    difficulty: int
+    category: str
+    correct: bool
+    response_time: float
+    points: int
+    timestamp: float
+
+
+class AnswerLog:
+    """Buffered, append-only writer flushed by a background thread
+
+    Events are written when `batch_size` of them are buffered or every
+    `flush_interval` seconds, whichever comes first. If a write fails the
+    events go back into the buffer and are retried on the next flush; while
+    the file stays unwritable only the newest `max_buffered` are kept.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, flush_interval: float = 1.0, max_buffered: int = 100_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._failing = False
+        # Whether the file may end in a partial line, see _write_buffered
+        self._check_tail = True
+        self._buffer: List[AnswerEvent] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="answer-log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def append(self, event: AnswerEvent):
+        with self._lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._write_buffered()
+            except Exception:
+                logger.exception("Answer log writer failed, events of this batch are lost")
+
+    def _write_buffered(self):
+        with self._lock:
+            events, self._buffer = self._buffer, []
+        if not events:
+            return
+        data = "".join(json.dumps(asdict(e), separators=(",", ":")) + "\n" for e in events).encode("utf-8")
+        try:
+            with open(self.path, "a+b") as f:
+                if self._check_tail and f.seek(0, os.SEEK_END):
+                    # Finish a line left partial by a crash or a failed write
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+            self._check_tail = False
+        except OSError as e:
+            self._check_tail = True
+            failing, self._failing = self._failing, True
+            with self._lock:
+                self._buffer[:0] = events
+                overflow = len(self._buffer) - self.max_buffered
+                if overflow > 0:
+                    del self._buffer[:overflow]
+                    self.dropped += overflow
+                buffered = len(self._buffer)
+            if not failing:
+                logger.warning("Cannot write answer log %s (%s), keeping %d events buffered", self.path, e, buffered)
+            return
+        if self._failing:
+            self._failing = False
+            logger.warning("Answer log %s is writable again, %d events were dropped", self.path, self.dropped)
+
+    def close(self):
+        """Stop the writer thread and write whatever is still buffered"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self._write_buffered()
+
+
+def read_answer_log(path: str) -> Iterator[AnswerEvent]:
+    """Stream the events of a log file, one at a time, skipping unreadable lines"""
+    skipped = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # batch cut short by a crash
+            if not line.strip():
+                continue
+            try:
+                event = AnswerEvent(**json.loads(line))
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            yield event
+    if skipped:
+        logger.warning("Skipped %d unreadable lines of %s", skipped, path)
+
+
+def read_answer_batches(path: str, size: int = 100_000) -> Iterator[List[AnswerEvent]]:
+    """Stream the events of a log file in lists of at most `size`"""
+    batch = []
+    for event in read_answer_log(path):
+        batch.append(event)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -1,10 +1,15 @@
 import streamlit as st
-import random
 import time
-import json
-from dataclasses import dataclass
-from typing import List
-from datetime import datetime
+import os
+import re
+import uuid
+import logging
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from decks import DEFAULT_DECK, Deck, DeckCache, deck_names, load_deck
+from engine import VICTORY_LEVEL, GameEngine
+import fragments
+import instrumentation
+from instrumentation import section, track_rerun_bytes
 
 # Page config
 st.set_page_config(
@@ -14,489 +19,481 @@ st.set_page_config(
     menu_items=None
 )
 
-# Question data with enhanced metadata
-@dataclass
-class Question:
-    word: str
-    meaning: str
-    distractors: List[str]
-    difficulty: int
-    category: str
-    example: str = ""
-    pronunciation: str = ""
-
-QUESTIONS = [
-    # Easy - Level 1
-    Question("Happy", "Feeling joy or pleasure", ["Sad", "Angry", "Tired"], 1, "Emotions", "She felt happy on her birthday.", "HAP-ee"),
-    Question("Quick", "Moving fast or speedy", ["Slow", "Lazy", "Sluggish"], 1, "Speed", "He made a quick decision.", "KWIK"),
-    Question("Bright", "Full of light or shining", ["Dark", "Dim", "Dull"], 1, "Light", "The bright sun warmed the day.", "BRITE"),
-    Question("Small", "Little in size", ["Large", "Huge", "Giant"], 1, "Size", "She has a small puppy.", "SMAWL"),
-    Question("Loud", "Making much noise", ["Quiet", "Silent", "Soft"], 1, "Sound", "The loud music filled the room.", "LOWD"),
-    Question("Hot", "High temperature", ["Cold", "Cool", "Chilly"], 1, "Temperature", "The hot coffee warmed his hands.", "HAHT"),
-    Question("Fast", "High speed movement", ["Slow", "Sluggish", "Dawdling"], 1, "Speed", "The fast runner won the race.", "FAST"),
-    Question("Strong", "Having great power", ["Weak", "Frail", "Feeble"], 1, "Strength", "She has a strong grip.", "STRONG"),
-    
-    # Medium - Level 2
-    Question("Ephemeral", "Short-lived or temporary", ["Eternal", "Permanent", "Lasting"], 2, "Time", "Butterfly life is ephemeral.", "ef-EM-er-ul"),
-    Question("Ubiquitous", "Present everywhere", ["Rare", "Unique", "Absent"], 2, "Presence", "Smartphones are ubiquitous today.", "yoo-BIK-wi-tus"),
-    Question("Serendipity", "Finding good things by luck", ["Misfortune", "Bad luck", "Disaster"], 2, "Fortune", "Meeting her was pure serendipity.", "ser-un-DIP-i-tee"),
-    Question("Ameliorate", "To improve or make better", ["Worsen", "Destroy", "Damage"], 2, "Change", "Education can ameliorate poverty.", "uh-MEEL-yuh-rayt"),
-    Question("Cacophony", "Harsh mix of sounds", ["Harmony", "Music", "Melody"], 2, "Sound", "The cacophony of car horns.", "kuh-KAH-fuh-nee"),
-    Question("Sanguine", "Optimistic and positive", ["Pessimistic", "Gloomy", "Sad"], 2, "Attitude", "He remained sanguine despite losses.", "SAN-gwin"),
-    Question("Zealous", "Very eager and enthusiastic", ["Apathetic", "Lazy", "Indifferent"], 2, "Emotion", "She was zealous about her work.", "ZEL-us"),
-    Question("Enigmatic", "Mysterious and puzzling", ["Clear", "Obvious", "Plain"], 2, "Mystery", "His smile was enigmatic.", "en-ig-MAT-ik"),
-    Question("Resilient", "Quick to recover strength", ["Fragile", "Weak", "Delicate"], 2, "Strength", "She is resilient despite hardships.", "ri-ZIL-yunt"),
-    Question("Pragmatic", "Dealing with things in practical way", ["Idealistic", "Theoretical", "Abstract"], 2, "Nature", "He took a pragmatic approach.", "prag-MAT-ik"),
-    Question("Eloquent", "Fluent and expressive speaker", ["Inarticulate", "Stammering", "Mute"], 2, "Speech", "Her eloquent speech moved everyone.", "EL-uh-kwunt"),
-    Question("Meticulous", "Very careful and precise", ["Careless", "Sloppy", "Reckless"], 2, "Behavior", "She did meticulous research.", "muh-TIK-yuh-lus"),
-    Question("Ambiguous", "Open to more than one interpretation", ["Clear", "Definite", "Precise"], 2, "Clarity", "His answer was ambiguous.", "am-BIG-yuh-us"),
-    
-    # Hard - Level 3
-    Question("Perspicacious", "Having keen insight and judgment", ["Foolish", "Naive", "Gullible"], 3, "Intelligence", "Her perspicacious observation was brilliant.", "per-spi-KAY-shus"),
-    Question("Esoteric", "For specialists only; mysterious", ["Common", "Popular", "Universal"], 3, "Knowledge", "That's too esoteric for most people.", "es-uh-TER-ik"),
-    Question("Perfidious", "Deceitful and untrustworthy", ["Loyal", "Trustworthy", "Faithful"], 3, "Character", "His perfidious actions betrayed them.", "per-FID-ee-us"),
-    Question("Obsequious", "Excessively obedient to authority", ["Defiant", "Bold", "Assertive"], 3, "Behavior", "The obsequious servant bowed repeatedly.", "ub-SEE-kwee-us"),
-    Question("Recalcitrant", "Stubbornly resisting authority", ["Compliant", "Obedient", "Agreeable"], 3, "Attitude", "The recalcitrant child refused to obey.", "ri-KAL-si-trunt"),
-    Question("Munificent", "Extremely generous or lavish", ["Stingy", "Miserly", "Selfish"], 3, "Generosity", "His munificent donation saved the charity.", "myoo-NIF-uh-sunt"),
-    Question("Pellucid", "Crystal clear in meaning or style", ["Obscure", "Confusing", "Vague"], 3, "Clarity", "Her pellucid explanation was perfect.", "puh-LOO-sid"),
-    Question("Phlegmatic", "Calm, unemotional temperament", ["Excitable", "Passionate", "Emotional"], 3, "Temperament", "He remained phlegmatic during the crisis.", "fleg-MAT-ik"),
-    Question("Erudite", "Scholarly and knowledgeable", ["Ignorant", "Uneducated", "Naive"], 3, "Knowledge", "The erudite professor impressed all.", "ER-uh-dite"),
-    Question("Surreptitious", "Secret and stealthy manner", ["Open", "Obvious", "Public"], 3, "Behavior", "He made surreptitious glances at her.", "sur-uh-TISH-us"),
-]
-
-def initialize_game():
-    """Initialize comprehensive game state"""
-    st.session_state.level = 1
-    st.session_state.lives = 3
-    st.session_state.score = 0
-    st.session_state.streak = 0
-    st.session_state.best_streak = 0
-    st.session_state.total_attempts = 0
-    st.session_state.correct_answers = 0
-    st.session_state.used_questions = set()
-    st.session_state.game_over = False
-    st.session_state.victory = False
-    st.session_state.feedback = None
-    st.session_state.game_history = []
-    st.session_state.category_stats = {}
-    st.session_state.difficulty_stats = {1: {'correct': 0, 'total': 0}, 2: {'correct': 0, 'total': 0}, 3: {'correct': 0, 'total': 0}}
-    st.session_state.start_time = time.time()
-    setup_question()
-
-def setup_question():
-    """Setup new question with smart selection"""
-    available = [q for idx, q in enumerate(QUESTIONS) if idx not in st.session_state.used_questions]
-    
-    if not available:
-        st.session_state.used_questions.clear()
-        available = QUESTIONS
-    
-    # Smart difficulty selection based on performance
-    overall_accuracy = st.session_state.correct_answers / max(st.session_state.total_attempts, 1)
-    
-    if overall_accuracy > 0.8:
-        preferred = [q for q in available if q.difficulty == 3]
-    elif overall_accuracy > 0.6:
-        preferred = [q for q in available if q.difficulty >= 2]
+rerun_bytes = track_rerun_bytes(get_script_run_ctx())
+
+# Metrics: FROG_METRICS=1 times the sections below; FROG_METRICS_PORT also
+# serves them (and the stack sampler) for Prometheus at /metrics
+@st.cache_resource
+def start_metrics_server(port):
+    return instrumentation.start_metrics_server(int(port))
+
+if instrumentation.ENABLED and os.environ.get("FROG_METRICS_PORT"):
+    start_metrics_server(os.environ["FROG_METRICS_PORT"])
+
+# Everything below that is built once per process sits behind a cached
+# loader, and modules only some setups need are imported by their loader
+
+# Question bank: a memory-mapped bank file when FROG_BANK_FILE is set,
+# otherwise the built-in vocabulary. FROG_CALIBRATION re-levels its words
+# with a difficulty table written by analytics.py (this loads a bank file
+# into memory; re-level big bank files offline with analytics.py --bank)
+@st.cache_resource
+def load_question_bank(path, calibration=None):
+    from question_bank import QuestionBank
+    if path:
+        from bank_file import load_bank
+        bank = load_bank(path)
+        if not calibration:
+            return bank
+        questions = [bank[qid] for qid in range(len(bank))]
     else:
-        preferred = [q for q in available if q.difficulty <= 2]
-    
-    if not preferred:
-        preferred = available
-    
-    question = random.choice(preferred)
-    idx = QUESTIONS.index(question)
-    st.session_state.used_questions.add(idx)
-    st.session_state.current_question = question
-    st.session_state.question_start_time = time.time()
-    
-    # Shuffle options
-    options = [question.meaning] + question.distractors
-    random.shuffle(options)
-    st.session_state.options = options
+        from questions import QUESTIONS
+        questions = QUESTIONS
+    if calibration:
+        from question_bank import calibrated, load_calibration
+        questions = calibrated(questions, load_calibration(calibration))
+    return QuestionBank(questions)
+
+# Decks: the vocabulary above is the "default" deck and FROG_DECKS_DIR holds
+# more as <name>.bank files; the FROG_DECK_CACHE most recently used decks
+# stay loaded for all sessions
+DECKS_DIR = os.environ.get("FROG_DECKS_DIR")
+
+@st.cache_resource
+def load_deck_cache(directory, capacity):
+    def loader(name):
+        if name == DEFAULT_DECK:
+            return Deck(DEFAULT_DECK, load_question_bank(os.environ.get("FROG_BANK_FILE"), os.environ.get("FROG_CALIBRATION")))
+        return load_deck(name, directory)
+    return DeckCache(loader, capacity)
+
+DECKS = load_deck_cache(DECKS_DIR, int(os.environ.get("FROG_DECK_CACHE", "32")))
+
+@st.cache_data(ttl=60)
+def available_decks(directory):
+    return deck_names(directory)
+
+# FROG_DISTRACTORS=generated draws wrong options from other words' meanings
+# instead of each question's authored distractors
+GENERATED_DISTRACTORS = os.environ.get("FROG_DISTRACTORS") == "generated"
+
+# The next question is picked and rendered while feedback is shown;
+# FROG_PREFETCH=0 goes back to doing it when Continue is clicked
+PREFETCH = os.environ.get("FROG_PREFETCH", "1") != "0"
+
+# Saved games: FROG_SESSION_STORE=sqlite:///games.db keeps them across
+# restarts and workers, the default only within this process. Game keys in
+# the URL are signed with FROG_SESSION_SECRET; without it each process
+# picks a random secret, so set it for games to survive restarts or workers
+@st.cache_resource
+def load_session_store(url):
+    from session_store import open_session_store
+    return open_session_store(url)
+
+@st.cache_resource
+def load_session_secret(secret):
+    return secret.encode("utf-8") if secret else os.urandom(32)
+
+STORE = load_session_store(os.environ.get("FROG_SESSION_STORE", "memory"))
+SESSION_SECRET = load_session_secret(os.environ.get("FROG_SESSION_SECRET"))
+
+# Answer events for analytics, appended to FROG_ANSWER_LOG when it is set
+@st.cache_resource
+def load_answer_log(path):
+    if not path:
+        return None
+    from answer_log import AnswerLog
+    return AnswerLog(path)
+
+ANSWER_LOG = load_answer_log(os.environ.get("FROG_ANSWER_LOG"))
+
+# Replays: every game's seed and choices, appended to FROG_REPLAY_LOG when it
+# ends (see replay.py); the same buffered writer as the answer log
+REPLAY_LOG = load_answer_log(os.environ.get("FROG_REPLAY_LOG"))
+
+# Leaderboard of finished games, shared through FROG_LEADERBOARD when set
+@st.cache_resource
+def load_leaderboard(path):
+    from leaderboard import Leaderboard
+    return Leaderboard(path)
+
+LEADERBOARD = load_leaderboard(os.environ.get("FROG_LEADERBOARD"))
+
+# Pronunciation audio: FROG_AUDIO=tone|espeak synthesizes clips in the
+# background into FROG_AUDIO_CACHE; a question shows its clip once it is ready
+@st.cache_resource
+def load_audio_service(name, directory):
+    if not name:
+        return None
+    from audio import open_audio_service
+    if not directory:
+        import tempfile
+        directory = os.path.join(tempfile.gettempdir(), "frog-audio")
+    service = open_audio_service(name, directory)
+    instrumentation.register_gauge("audio_queue_depth", lambda: service.queue_depth)
+    instrumentation.register_gauge("audio_hit_rate", lambda: service.hit_rate)
+    return service
+
+AUDIO = load_audio_service(os.environ.get("FROG_AUDIO"), os.environ.get("FROG_AUDIO_CACHE"))
+
+# Race mode: the players of a ?race=<code> room answer the same questions and
+# get each other's scores pushed live; FROG_RACE_BROKER=tcp://host:port shares
+# rooms between worker processes through `python race.py broker`
+@st.cache_resource
+def load_race_rooms(url):
+    from race import RoomRegistry, open_broker
+    return RoomRegistry(open_broker(url))
+
+# Question, feedback and study card HTML, rendered once for all sessions and
+# kept in an LRU of FROG_FRAGMENT_CACHE fragments
+@st.cache_resource
+def load_fragment_cache(capacity):
+    cache = fragments.FragmentCache(capacity)
+    instrumentation.register_gauge("fragment_cache_size", lambda: len(cache))
+    instrumentation.register_gauge("fragment_cache_hit_rate", lambda: cache.hit_rate)
+    return cache
+
+FRAGMENTS = load_fragment_cache(int(os.environ.get("FROG_FRAGMENT_CACHE", "4096")))
+
+@st.cache_data(ttl=5)
+def leaderboard_top(board, n):
+    LEADERBOARD.refresh()
+    return LEADERBOARD.top(board, n)
+
+def session_key():
+    """Stable key of this player's game, kept signed in the ?game= URL parameter"""
+    from session_store import sign_key, verify_key
+    key = verify_key(st.query_params.get("game", ""), SESSION_SECRET)
+    if key is None:
+        key = uuid.uuid4().hex
+        st.query_params["game"] = sign_key(key, SESSION_SECRET)
+    return key
+
+def initialize_game(deck_name=DEFAULT_DECK):
+    """Start a new game for this session"""
+    deck = DECKS.get(deck_name)
+    st.session_state.deck = deck
+    st.session_state.replay_logged = 0
+    st.session_state.engine = GameEngine(deck.bank, distractors=deck.distractors if GENERATED_DISTRACTORS else None, prefetch=PREFETCH)
+
+def restore_game():
+    """Resume this player's saved game, or start a new one"""
+    state = STORE.load(session_key())
+    if state is not None:
+        try:
+            deck = DECKS.get(state.get("deck", DEFAULT_DECK))
+            st.session_state.engine = GameEngine.from_state(deck.bank, state, distractors=deck.distractors if GENERATED_DISTRACTORS else None,
+                                                            prefetch=PREFETCH)
+            st.session_state.deck = deck
+            st.session_state.saved_state = state
+            st.session_state.replay_logged = st.session_state.engine.choices_start
+            return
+        except (KeyError, ValueError):
+            pass
+    initialize_game()
+
+def save_game():
+    """Persist the game once per rerun, and only if it changed"""
+    state = st.session_state.engine.to_state()
+    state["deck"] = st.session_state.deck.name
+    if state != st.session_state.get("saved_state"):
+        STORE.save(session_key(), state)
+        st.session_state.saved_state = state
+
+def deck_picker():
+    """Let the player pick the deck of the next game"""
+    names = available_decks(DECKS_DIR)
+    if len(names) > 1:
+        current = st.session_state.deck.name
+        choice = st.selectbox("📚 Deck", names, index=names.index(current) if current in names else 0, key="deck_choice")
+        if choice != current:
+            try:
+                initialize_game(choice)
+            except ValueError:
+                st.error(f"Deck {choice} is no longer available")
+                return
+            st.rerun()
+
+def question_html(q):
+    """Question box of a question"""
+    return fragments.question_html(FRAGMENTS, q)
+
+def study_html(q):
+    """Card of a question in study mode"""
+    return fragments.study_html(FRAGMENTS, q)
+
+def study_page():
+    """Search and browse the words of the current deck, one page at a time"""
+    deck = st.session_state.deck
+    if not deck.search_ready:
+        # The first visitor starts the build, later ones wait for the same one
+        deck.build_search_index()
+        with st.spinner("Indexing the deck..."):
+            deck.search_index()
+    index = deck.search_index()
+    if index is None:
+        st.error("Search is not available for this deck")
+        return
+
+    col1, col2 = st.columns([3, 1])
+    query = col1.text_input("🔎 Search", key="study_query", placeholder="Word, meaning or example").strip()
+    category = col2.selectbox("Category", ["All"] + index.categories, key="study_category")
+    category = None if category == "All" else category
+    results = index.search(query, category) if query else index.browse(category)
+
+    # A new query or category starts again from the first page
+    if st.session_state.get("study_filter") != (query, category):
+        st.session_state.study_filter = (query, category)
+        st.session_state.study_page = 0
+    pages = results.pages()
+    page = min(st.session_state.study_page, pages - 1)
+    st.caption(f"{len(results):,} word{'' if len(results) == 1 else 's'} · page {page + 1} of {pages}")
+    for _, q in results.page(page):
+        st.markdown(study_html(q), unsafe_allow_html=True)
+
+    col1, _, col3 = st.columns(3)
+    if col1.button("← Previous", disabled=page == 0, use_container_width=True, key="study_previous"):
+        st.session_state.study_page = page - 1
+        st.rerun()
+    if col3.button("Next →", disabled=page + 1 >= pages, use_container_width=True, key="study_next"):
+        st.session_state.study_page = page + 1
+        st.rerun()
+
+@st.cache_resource
+def rerun_push_failures():
+    """Set of reasons pushed reruns failed, to warn about each only once per process"""
+    return set()
+
+def session_rerunner():
+    """Callback that reruns this session from any thread, for pushed updates
+
+    This reaches into Streamlit's private session manager; if that changes,
+    a warning is logged once and players only see others' scores on their
+    own reruns.
+    """
+    from streamlit.runtime import Runtime
+    session_id = get_script_run_ctx().session_id
+    failures = rerun_push_failures()
+
+    def rerun():
+        runtime = Runtime.instance() if Runtime.exists() else None
+        # Not served by a Streamlit server, e.g. AppTest's mock runtime:
+        # mocks pass isinstance but their type is not a Runtime
+        if runtime is None or not issubclass(type(runtime), Runtime):
+            return
+        try:
+            info = runtime._session_mgr.get_active_session_info(session_id)
+            loop = runtime._get_async_objs().eventloop
+        except (AttributeError, RuntimeError) as error:
+            reason = f"{type(error).__name__}: {error}"
+            if reason not in failures:
+                failures.add(reason)
+                logging.getLogger("frog.race").warning("Cannot push race updates to sessions (%s)", reason)
+            return
+        if info is not None:
+            loop.call_soon_threadsafe(info.session.request_rerun, None)
+    return rerun
+
+def markdown_text(text):
+    """Text shown literally inside markdown, e.g. a player's name in a table"""
+    return re.sub(r"([\\`*_{}\[\]()<>#+\-.!|~:])", r"\\\1", text)
+
+def race_link(code):
+    """Link to a race room that carries no other URL parameter, e.g. this player's ?game="""
+    url = (st.context.url or "").split("?")[0]
+    return f"{url}?race={code}"
+
+def race_picker():
+    """Start a race room or join one by its code"""
+    with st.expander("🏁 Race with friends"):
+        code = st.text_input("Room code", key="race_code", max_chars=8).strip().upper()
+        col1, col2 = st.columns(2)
+        if col1.button("Join", disabled=not code, use_container_width=True, key="race_join"):
+            st.query_params["race"] = code
+            st.rerun()
+        if col2.button("New room", use_container_width=True, key="race_new"):
+            from race import new_room_code
+            st.query_params["race"] = new_room_code()
+            st.rerun()
+
+def race_page(code):
+    """The room's questions for this player, then the live scoreboard"""
+    races = load_race_rooms(os.environ.get("FROG_RACE_BROKER", "memory"))
+    deck = st.session_state.deck
+    room = races.room(code, deck, deck.distractors if GENERATED_DISTRACTORS else None)
+    follower = st.session_state.get("race_follower")
+    if follower is None or follower.room is not room:
+        if follower is not None:
+            races.unfollow(follower)
+        follower = st.session_state.race_follower = races.follow(room, session_rerunner())
+    follower.rendering()
+
+    # Racers get their own id: the game key is in this page's URL, which
+    # a friend may have opened
+    player_id = st.session_state.setdefault("race_player", uuid.uuid4().hex[:8])
+    st.markdown(f"### 🏁 Race room {code}")
+    st.caption("Friends join with this code, or with this link")
+    st.code(race_link(code), language=None)
+    name = st.text_input("🐸 Your name", key="race_name", max_chars=20).strip() or f"Frog {player_id[:4]}"
+    player = room.join(player_id, name)
+
+    feedback = st.session_state.pop("race_feedback", None)
+    if feedback:
+        st.toast(feedback)
+    if player.answered < room.rounds:
+        qid, options = room.questions[player.answered]
+        q = deck.bank[qid]
+        if st.session_state.get("race_round") != (code, player.answered):
+            st.session_state.race_round = (code, player.answered)
+            st.session_state.race_started = time.time()
+        st.caption(f"Question {player.answered + 1} of {room.rounds}")
+        st.markdown(question_html(q), unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        for idx, option in enumerate(options):
+            with col1 if idx % 2 == 0 else col2:
+                if st.button(option, use_container_width=True, key=f"race_option_{idx}"):
+                    try:
+                        correct, points = room.answer(player_id, player.answered, option, time.time() - st.session_state.race_started)
+                    except ValueError:
+                        pass
+                    else:
+                        st.session_state.race_feedback = f"✅ +{points} points" if correct else f"❌ '{q.word}' = {q.meaning}"
+                    st.rerun()
+    elif room.finished:
+        st.success("🏝️ Everyone reached the island!")
+    else:
+        st.info("🏝️ You finished! Waiting for the others...")
+
+    st.markdown("### 🏆 Race")
+    rows = "\n".join(f"| {rank} | 🐸 {markdown_text(p.name)}{' (you)' if p.id == player_id else ''} | {p.score} | {p.answered}/{room.rounds} |"
+                     for rank, p in enumerate(room.scoreboard(), 1))
+    st.markdown(f"| # | Player | Score | Answered |\n|---|---|---|---|\n{rows}")
+
+    if st.button("🚪 Leave race", key="race_leave"):
+        races.unfollow(follower)
+        del st.session_state.race_follower
+        del st.query_params["race"]
+        st.rerun()
+    # Answers that came in while rendering were not pushed, show them now
+    if follower.rendered():
+        st.rerun()
+
+def log_replay():
+    """Append the choices made since the last replay line of this session, then drop them from the game"""
+    game = st.session_state.engine
+    logged = st.session_state.get("replay_logged", 0)
+    answers = game.choices_start + len(game.choices)
+    if REPLAY_LOG is None or game.seed is None or answers == logged:
+        return
+    from replay import Replay
+    REPLAY_LOG.append(Replay(session_key(), game.seed, game.choices[logged - game.choices_start:], logged,
+                             st.session_state.deck.name, GENERATED_DISTRACTORS))
+    st.session_state.replay_logged = answers
+    game.drop_choices(answers)
 
 def handle_answer(selected):
     """Process answer with comprehensive feedback"""
-    q = st.session_state.current_question
-    is_correct = (selected == q.meaning)
-    response_time = time.time() - st.session_state.question_start_time
-    
-    st.session_state.total_attempts += 1
-    st.session_state.difficulty_stats[q.difficulty]['total'] += 1
-    
-    if is_correct:
-        st.session_state.correct_answers += 1
-        st.session_state.difficulty_stats[q.difficulty]['correct'] += 1
-        st.session_state.streak += 1
-        st.session_state.best_streak = max(st.session_state.best_streak, st.session_state.streak)
-        
-        # Enhanced scoring
-        base = q.difficulty * 10
-        time_bonus = max(0, int(base * 0.5 * (1 - min(response_time / 15, 1))))
-        streak_bonus = min(st.session_state.streak * 3, 30)
-        difficulty_multiplier = 1 + (q.difficulty - 1) * 0.5
-        
-        total = int((base + time_bonus + streak_bonus) * difficulty_multiplier)
-        st.session_state.score += total
-        st.session_state.level += 1
-        
-        # Category stats
-        if q.category not in st.session_state.category_stats:
-            st.session_state.category_stats[q.category] = {'correct': 0, 'total': 0}
-        st.session_state.category_stats[q.category]['correct'] += 1
-        st.session_state.category_stats[q.category]['total'] += 1
-        
-        # Streak message
-        if st.session_state.streak >= 7:
-            streak_msg = f"🔥🔥🔥 LEGENDARY! {st.session_state.streak} in a row!"
-        elif st.session_state.streak >= 5:
-            streak_msg = f"🔥🔥 ON FIRE! {st.session_state.streak} correct!"
-        elif st.session_state.streak >= 3:
-            streak_msg = f"🔥 Hot streak! {st.session_state.streak} in a row"
+    game = st.session_state.engine
+    with section("answer"):
+        game.answer(selected)
+    if ANSWER_LOG is not None:
+        from answer_log import AnswerEvent
+        ANSWER_LOG.append(AnswerEvent(session_key(), **game.game_history[-1], timestamp=time.time()))
+
+# Hidden metrics page at ?admin=metrics&token=<FROG_ADMIN_TOKEN>, only while
+# metrics are enabled and an admin token is set
+def is_admin():
+    import hmac
+    token = os.environ.get("FROG_ADMIN_TOKEN")
+    return bool(token) and hmac.compare_digest(st.query_params.get("token", "").encode("utf-8"), token.encode("utf-8"))
+
+if instrumentation.ENABLED and st.query_params.get("admin") == "metrics" and is_admin():
+    st.title("Rerun metrics")
+    st.caption("Seconds (bytes for rerun_bytes); quantiles are bucket bounds over the last minute")
+    st.dataframe(instrumentation.summary(), use_container_width=True)
+    sampler = instrumentation.SAMPLER
+    col1, col2, col3 = st.columns(3)
+    if col1.button("Stop profiler" if sampler.running else "Start profiler"):
+        if sampler.running:
+            sampler.stop()
         else:
-            streak_msg = f"Great! Keep going! {st.session_state.streak} in a row"
-        
-        st.session_state.feedback = {
-            'type': 'correct',
-            'message': f"✅ Perfect!",
-            'definition': f"'{q.word}' = {q.meaning}",
-            'example': f"Example: {q.example}",
-            'category': f"📚 {q.category}",
-            'bonus': f"+{total} points | {streak_msg}",
-            'breakdown': f"Base: {base} | Speed: {time_bonus} | Streak: {streak_bonus}"
-        }
-        
-        if st.session_state.level > 10:
-            st.session_state.victory = True
-            st.session_state.game_over = True
-    else:
-        st.session_state.lives -= 1
-        st.session_state.difficulty_stats[q.difficulty]['total'] += 1
-        st.session_state.streak = 0
-        
-        # Category stats
-        if q.category not in st.session_state.category_stats:
-            st.session_state.category_stats[q.category] = {'correct': 0, 'total': 0}
-        st.session_state.category_stats[q.category]['total'] += 1
-        
-        st.session_state.feedback = {
-            'type': 'wrong',
-            'message': f"❌ Oops!",
-            'definition': f"'{q.word}' = {q.meaning}",
-            'example': f"Example: {q.example}",
-            'category': f"📚 {q.category}",
-            'bonus': f"You selected: {selected}",
-            'breakdown': ""
-        }
-        
-        if st.session_state.lives <= 0:
-            st.session_state.game_over = True
+            sampler.start()
+        st.rerun()
+    if col2.button("Clear profile"):
+        sampler.clear()
+    col3.download_button("Folded stacks", sampler.folded(), file_name="frog.folded")
+    st.caption(f"{sampler.samples} samples")
+    if instrumentation.GAUGES:
+        st.json({name: read() for name, read in sorted(instrumentation.GAUGES.items())})
+    with st.expander("Prometheus text"):
+        st.code(instrumentation.prometheus_text(), language=None)
+    st.stop()
 
 # Initialize
-if 'level' not in st.session_state:
-    initialize_game()
+if 'engine' not in st.session_state:
+    with section("restore_game"):
+        restore_game()
+game = st.session_state.engine
 
 # Custom CSS - Ultra Enhanced
-st.markdown("""
-<style>
-    [data-testid="stMainBlockContainer"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 25%, #f093fb 50%, #4a90e2 75%, #2c5282 100%);
-        background-size: 400% 400%;
-        animation: gradient 15s ease infinite;
-        padding: 20px;
-        min-height: 100vh;
-    }
-    
-    @keyframes gradient {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    .header-text {
-        text-align: center;
-        color: white;
-        text-shadow: 4px 4px 8px rgba(0,0,0,0.5);
-        margin-bottom: 20px;
-    }
-    
-    .header-text h1 {
-        font-size: 56px;
-        margin: 0;
-        animation: slideDown 0.8s ease-out;
-    }
-    
-    @keyframes slideDown {
-        from { transform: translateY(-30px); opacity: 0; }
-        to { transform: translateY(0); opacity: 1; }
-    }
-    
-    .stat-box {
-        background: linear-gradient(135deg, rgba(255,255,255,0.95) 0%, rgba(255,255,255,0.85) 100%);
-        padding: 20px;
-        border-radius: 15px;
-        text-align: center;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        border: 2px solid rgba(255,255,255,0.3);
-        transition: all 0.3s ease;
-    }
-    
-    .stat-box:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 35px rgba(0,0,0,0.3);
-    }
-    
-    .stat-value {
-        font-size: 32px;
-        font-weight: bold;
-        color: #2c3e50;
-    }
-    
-    .stat-label {
-        font-size: 13px;
-        color: #7f8c8d;
-        margin-top: 8px;
-        font-weight: 600;
-    }
-    
-    .question-box {
-        background: linear-gradient(135deg, rgba(0,0,0,0.85) 0%, rgba(0,0,0,0.7) 100%);
-        padding: 50px 40px;
-        border-radius: 25px;
-        text-align: center;
-        margin: 40px 0;
-        box-shadow: 0 15px 50px rgba(0,0,0,0.5);
-        border: 3px solid rgba(243, 156, 18, 0.3);
-        animation: fadeInScale 0.6s ease-out;
-    }
-    
-    @keyframes fadeInScale {
-        from { opacity: 0; transform: scale(0.95); }
-        to { opacity: 1; transform: scale(1); }
-    }
-    
-    .question-word {
-        font-size: 64px;
-        color: #f39c12;
-        font-weight: 900;
-        margin-bottom: 20px;
-        text-shadow: 3px 3px 6px rgba(0,0,0,0.6);
-        letter-spacing: 2px;
-    }
-    
-    .pronunciation {
-        font-size: 16px;
-        color: #bdc3c7;
-        font-style: italic;
-        margin-bottom: 15px;
-    }
-    
-    .question-prompt {
-        font-size: 22px;
-        color: #ecf0f1;
-        margin-bottom: 15px;
-        font-weight: 600;
-    }
-    
-    .difficulty-stars {
-        font-size: 24px;
-        color: #f39c12;
-        margin: 15px 0;
-        letter-spacing: 3px;
-    }
-    
-    .stButton button {
-        width: 100% !important;
-        height: 140px !important;
-        background: linear-gradient(135deg, #2ecc71 0%, #27ae60 70%, #1e8449 100%) !important;
-        color: white !important;
-        border: 5px solid #196f3d !important;
-        border-radius: 80px !important;
-        font-size: 20px !important;
-        font-weight: 700 !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3) !important;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.3) !important;
-        transition: all 0.3s cubic-bezier(0.34, 1.56, 0.64, 1) !important;
-        cursor: pointer !important;
-        overflow: hidden !important;
-    }
-    
-    .stButton button:hover {
-        transform: translateY(-12px) scale(1.08) !important;
-        box-shadow: 0 20px 50px rgba(0,0,0,0.4) !important;
-        border-color: #f39c12 !important;
-        background: linear-gradient(135deg, #27ae60 0%, #229954 70%, #186a3b 100%) !important;
-    }
-    
-    .stButton button:active {
-        transform: translateY(-5px) scale(1.02) !important;
-    }
-    
-    .feedback-box {
-        background: white;
-        padding: 50px;
-        border-radius: 25px;
-        text-align: center;
-        margin: 40px 0;
-        box-shadow: 0 15px 60px rgba(0,0,0,0.4);
-        animation: popIn 0.5s cubic-bezier(0.68, -0.55, 0.265, 1.55);
-        border-top: 8px solid;
-    }
-    
-    @keyframes popIn {
-        0% { opacity: 0; transform: scale(0.8); }
-        100% { opacity: 1; transform: scale(1); }
-    }
-    
-    .feedback-correct {
-        border-top-color: #27ae60;
-    }
-    
-    .feedback-wrong {
-        border-top-color: #e74c3c;
-    }
-    
-    .feedback-title {
-        font-size: 44px;
-        font-weight: 900;
-        margin-bottom: 20px;
-    }
-    
-    .feedback-definition {
-        font-size: 20px;
-        color: #2c3e50;
-        padding: 20px;
-        background: linear-gradient(135deg, #ecf0f1 0%, #f8f9fa 100%);
-        border-radius: 15px;
-        margin: 20px 0;
-        font-weight: 600;
-    }
-    
-    .feedback-example {
-        font-size: 16px;
-        color: #5d6d7b;
-        padding: 15px;
-        background: #f8f9fa;
-        border-left: 4px solid #3498db;
-        border-radius: 10px;
-        margin: 15px 0;
-        font-style: italic;
-    }
-    
-    .feedback-category {
-        font-size: 16px;
-        color: #7f8c8d;
-        margin: 10px 0;
-    }
-    
-    .feedback-bonus {
-        font-size: 18px;
-        color: #2c3e50;
-        margin-top: 15px;
-        font-weight: 700;
-    }
-    
-    .feedback-breakdown {
-        font-size: 14px;
-        color: #7f8c8d;
-        margin-top: 10px;
-    }
-    
-    .island {
-        background: linear-gradient(135deg, #8B4513 0%, #A0522D 100%);
-        padding: 25px 50px;
-        border-radius: 50% 50% 0 0;
-        text-align: center;
-        margin: 0 auto 30px;
-        width: fit-content;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.4);
-        border: 3px solid #654321;
-    }
-    
-    .treasure {
-        font-size: 56px;
-        animation: bounce 2s infinite;
-        display: inline-block;
-    }
-    
-    @keyframes bounce {
-        0%, 100% { transform: translateY(0) rotate(0deg); }
-        50% { transform: translateY(-15px) rotate(5deg); }
-    }
-    
-    .progress-container {
-        background: rgba(255,255,255,0.15);
-        border-radius: 25px;
-        padding: 15px;
-        margin: 25px 0;
-        box-shadow: inset 0 4px 15px rgba(0,0,0,0.2);
-    }
-    
-    .stProgress > div > div > div {
-        background: linear-gradient(90deg, #2ecc71, #27ae60) !important;
-        height: 30px !important;
-        border-radius: 15px !important;
-    }
-    
-    .progress-text {
-        text-align: center;
-        color: white;
-        font-size: 18px;
-        font-weight: bold;
-        margin-top: 10px;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .game-over-title {
-        font-size: 56px;
-        font-weight: 900;
-        margin: 30px 0;
-        text-shadow: 3px 3px 6px rgba(0,0,0,0.3);
-    }
-    
-    .stats-grid {
-        display: grid;
-        grid-template-columns: repeat(3, 1fr);
-        gap: 20px;
-        margin: 30px 0;
-    }
-    
-    .difficulty-breakdown {
-        background: rgba(255,255,255,0.1);
-        padding: 25px;
-        border-radius: 15px;
-        margin: 30px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Served once as a browser-cached static file (static/theme.css) when static
+# serving is enabled, otherwise inlined into every rerun
+@st.cache_resource
+def load_theme_css():
+    with open(os.path.join(os.path.dirname(__file__), "static", "theme.css"), encoding="utf-8") as f:
+        return f.read()
+
+with section("css"):
+    if st.get_option("server.enableStaticServing"):
+        st.markdown('<style>@import url("app/static/theme.css");</style>', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>\n{load_theme_css()}</style>", unsafe_allow_html=True)
 
 # Header
 st.markdown('<div class="header-text"><h1>🐸 Frog & Treasure Island 🏝️</h1><p style="font-size: 20px; margin: 5px;">Master vocabulary through adventure!</p></div>', unsafe_allow_html=True)
 
+# Race mode
+race_code = st.query_params.get("race")
+if race_code:
+    with section("race"):
+        race_page(race_code.strip().upper())
+    if rerun_bytes is not None:
+        rerun_bytes.report()
+    st.stop()
+
+# Study mode: look words of the current deck up instead of playing
+if st.toggle("📖 Study words", key="study"):
+    with section("study"):
+        study_page()
+    if rerun_bytes is not None:
+        rerun_bytes.report()
+    st.stop()
+
 # Stats
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown(f'<div class="stat-box"><div class="stat-value">{"❤️" * st.session_state.lives}</div><div class="stat-label">LIVES</div></div>', unsafe_allow_html=True)
-with col2:
-    st.markdown(f'<div class="stat-box"><div class="stat-value">{st.session_state.score}</div><div class="stat-label">SCORE</div></div>', unsafe_allow_html=True)
-with col3:
-    st.markdown(f'<div class="stat-box"><div class="stat-value">{st.session_state.level}/10</div><div class="stat-label">LEVEL</div></div>', unsafe_allow_html=True)
-with col4:
-    st.markdown(f'<div class="stat-box"><div class="stat-value">🔥 {st.session_state.streak}</div><div class="stat-label">STREAK</div></div>', unsafe_allow_html=True)
+with section("stats"):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(f'<div class="stat-box"><div class="stat-value">{"❤️" * game.lives}</div><div class="stat-label">LIVES</div></div>', unsafe_allow_html=True)
+    with col2:
+        st.markdown(f'<div class="stat-box"><div class="stat-value">{game.score}</div><div class="stat-label">SCORE</div></div>', unsafe_allow_html=True)
+    with col3:
+        st.markdown(f'<div class="stat-box"><div class="stat-value">{game.level}/{VICTORY_LEVEL}</div><div class="stat-label">LEVEL</div></div>', unsafe_allow_html=True)
+    with col4:
+        st.markdown(f'<div class="stat-box"><div class="stat-value">🔥 {game.streak}</div><div class="stat-label">STREAK</div></div>', unsafe_allow_html=True)
 
 # Island
 st.markdown('<div class="island"><div class="treasure">💎</div></div>', unsafe_allow_html=True)
 
 # Progress
-progress = (st.session_state.level - 1) / 10
+progress = (game.level - 1) / VICTORY_LEVEL
 st.markdown('<div class="progress-container">', unsafe_allow_html=True)
 st.progress(progress)
 st.markdown(f'<div class="progress-text">🐸 {int(progress * 100)}% to Treasure Island! 🏝️</div>', unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Game Over
-if st.session_state.game_over:
-    if st.session_state.victory:
+if game.game_over:
+    if game.victory:
         st.balloons()
         st.markdown(f'<div class="game-over-title" style="color: gold;">🎉 VICTORY! 🎉</div>', unsafe_allow_html=True)
         st.markdown(f'<div style="text-align: center; color: white; font-size: 28px; margin: 20px;">You conquered the treasure island!</div>', unsafe_allow_html=True)
@@ -504,80 +501,104 @@ if st.session_state.game_over:
         st.markdown(f'<div class="game-over-title" style="color: #e74c3c;">💀 Game Over</div>', unsafe_allow_html=True)
         st.markdown(f'<div style="text-align: center; color: white; font-size: 28px; margin: 20px;">The frog\'s adventure ends...</div>', unsafe_allow_html=True)
     
-    accuracy = (st.session_state.correct_answers / st.session_state.total_attempts * 100) if st.session_state.total_attempts > 0 else 0
-    total_time = time.time() - st.session_state.start_time
+    accuracy = game.accuracy
+    total_time = time.time() - game.start_time
     
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Final Score", st.session_state.score, delta=None)
+        st.metric("Final Score", game.score, delta=None)
     with col2:
         st.metric("Accuracy", f"{accuracy:.1f}%", delta=None)
     with col3:
-        st.metric("Best Streak", st.session_state.best_streak, delta=None)
-    
-    # Difficulty breakdown
-    st.markdown("### 📊 Performance by Difficulty")
-    diff_cols = st.columns(3)
-    for diff in [1, 2, 3]:
-        with diff_cols[diff - 1]:
-            stats = st.session_state.difficulty_stats[diff]
-            if stats['total'] > 0:
-                acc = (stats['correct'] / stats['total'] * 100)
-                st.metric(f"{'⭐' * diff}", f"{acc:.0f}%", f"{stats['correct']}/{stats['total']}")
-    
-    # Category breakdown
-    if st.session_state.category_stats:
-        st.markdown("### 📚 Performance by Category")
-        cat_cols = st.columns(min(len(st.session_state.category_stats), 3))
-        for idx, (category, stats) in enumerate(list(st.session_state.category_stats.items())[:3]):
-            with cat_cols[idx]:
-                cat_acc = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0
-                st.metric(category, f"{cat_acc:.0f}%", f"{stats['correct']}/{stats['total']}")
+        st.metric("Best Streak", game.best_streak, delta=None)
+    
+    with section("game_over_stats"):
+        # Difficulty breakdown
+        st.markdown("### 📊 Performance by Difficulty")
+        difficulties = list(game.bank.difficulty_index)
+        diff_cols = st.columns(len(difficulties))
+        for idx, diff in enumerate(difficulties):
+            with diff_cols[idx]:
+                correct, total = game.difficulty_stats.get(diff)
+                if total > 0:
+                    acc = (correct / total * 100)
+                    st.metric(f"{'⭐' * diff}", f"{acc:.0f}%", f"{correct}/{total}")
+
+        # Category breakdown
+        if game.category_stats:
+            st.markdown("### 📚 Performance by Category")
+            category_stats = list(game.category_stats.items())[:3]
+            cat_cols = st.columns(len(category_stats))
+            for idx, (category, correct, total) in enumerate(category_stats):
+                with cat_cols[idx]:
+                    cat_acc = (correct / total * 100) if total > 0 else 0
+                    st.metric(category, f"{cat_acc:.0f}%", f"{correct}/{total}")
+    
+    # Leaderboard
+    with section("leaderboard"):
+        if not game.results_submitted:
+            from leaderboard import game_result
+            LEADERBOARD.submit(game_result(session_key()[:6], game))
+            game.results_submitted = True
+            log_replay()
+        rank, count = LEADERBOARD.rank(game.score), LEADERBOARD.count()
+        top = leaderboard_top("global", 10)
+    st.markdown("### 🏆 Leaderboard")
+    st.markdown(f"Your rank: **#{rank}** of {count} games")
+    if top:
+        rows = "\n".join(f"| {rank} | 🐸 {entry.player} | {entry.score} |" for rank, entry in enumerate(top, 1))
+        st.markdown(f"| # | Player | Score |\n|---|---|---|\n{rows}")
     
     st.markdown("<br><br>", unsafe_allow_html=True)
+    deck_picker()
     if st.button("🔄 Play Again", use_container_width=True):
-        initialize_game()
+        game.new_game()
         st.rerun()
 
 # Active Game
-elif not st.session_state.game_over:
-    if st.session_state.feedback:
-        fb = st.session_state.feedback
-        fb_class = "feedback-correct" if fb['type'] == 'correct' else "feedback-wrong"
-        
-        st.markdown(f"""
-        <div class="feedback-box {fb_class}">
-            <div class="feedback-title">{fb['message']}</div>
-            <div class="feedback-definition">{fb['definition']}</div>
-            <div class="feedback-example">"{fb['example']}"</div>
-            <div class="feedback-category">{fb['category']}</div>
-            <div class="feedback-bonus">{fb['bonus']}</div>
-            {f'<div class="feedback-breakdown">{fb["breakdown"]}</div>' if fb['breakdown'] else ''}
-        </div>
-        """, unsafe_allow_html=True)
+elif not game.game_over:
+    if game.feedback:
+        st.markdown(fragments.feedback_html(FRAGMENTS, game.feedback), unsafe_allow_html=True)
+
+        # Render the prefetched question into the fragment cache and
+        # synthesize the words due next while the player reads
+        if game.upcoming is not None:
+            question_html(game.bank[game.upcoming[0]])
+        if AUDIO is not None:
+            AUDIO.prefetch(game.likely_next())
         
         if st.button("Continue →", use_container_width=True, key="continue"):
-            st.session_state.feedback = None
-            if not st.session_state.game_over:
-                setup_question()
+            with section("next_question"):
+                game.next_question()
             st.rerun()
     else:
-        q = st.session_state.current_question
+        q = game.current_question
+        if game.total_attempts == 0:
+            deck_picker()
+            race_picker()
         
         # Question
-        st.markdown(f"""
-        <div class="question-box">
-            <div class="question-word">{q.word}</div>
-            <div class="pronunciation">/{q.pronunciation}/</div>
-            <div class="question-prompt">Choose the correct meaning:</div>
-            <div class="difficulty-stars">{"⭐" * q.difficulty}</div>
-            <div style="color: #ecf0f1; font-size: 14px;">Category: {q.category}</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(question_html(q), unsafe_allow_html=True)
+
+        if AUDIO is not None:
+            clip = AUDIO.clip(q)
+            if clip is not None:
+                st.audio(clip, format="audio/wav")
+            else:
+                st.caption("🔊 Pronunciation audio is on its way")
         
         st.markdown('<h3 style="text-align: center; color: white; margin: 40px 0;">🪷 Jump to the correct lily pad! 🪷</h3>', unsafe_allow_html=True)
         
         # Lily pads
         col1, col2 = st.columns(2)
-        for idx, option in enumerate(st.session_state.options):
+        for idx, option in enumerate(game.options):
             with col1 if idx % 2 == 0 else col2:
+                if st.button(option, use_container_width=True, key=f"option_{idx}"):
+                    handle_answer(option)
+                    st.rerun()
+
+with section("save_game"):
+    save_game()
+
+if rerun_bytes is not None:
+    rerun_bytes.report()
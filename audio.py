@@ -0,0 +1,172 @@
+"""Pronunciation audio, synthesized in the background and cached on disk
+
+A synthesizer turns a word and its pronunciation hint into WAV bytes:
+
+    tone    built-in stand-in that beeps one tone per syllable, louder and
+            higher on the stressed (upper-case) one
+    espeak  the offline espeak-ng engine, if it is installed
+
+Any object with a `name` and a synthesize(word, pronunciation) method can
+be plugged in instead. AudioService never synthesizes on the caller's
+thread: clip() returns a cached clip or None and queues the word on a
+worker pool, and prefetch() queues words before they are asked. Clips are
+stored under a hash of the synthesizer name, word and pronunciation, so
+they survive restarts and are shared by every worker using the directory.
+"""
+import hashlib
+import io
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from question_bank import Question
+
+
+class ToneSynthesizer:
+    """Offline placeholder: one short tone per syllable of the pronunciation"""
+
+    name = "tone-1"
+    RATE = 8_000
+
+    def synthesize(self, word: str, pronunciation: str) -> bytes:
+        samples = bytearray()
+        for syllable in (pronunciation or word).split("-"):
+            stressed = syllable.isupper()
+            frequency, seconds, volume = (660, 0.26, 12_000) if stressed else (440, 0.18, 7_000)
+            for i in range(int(self.RATE * seconds)):
+                value = int(volume * math.sin(2 * math.pi * frequency * i / self.RATE))
+                samples += value.to_bytes(2, "little", signed=True)
+            samples += bytes(int(self.RATE * 0.04) * 2)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.RATE)
+            f.writeframes(bytes(samples))
+        return buffer.getvalue()
+
+
+class EspeakSynthesizer:
+    """The word spoken by espeak-ng (or espeak), which must be on the PATH"""
+
+    def __init__(self, voice: str = "en"):
+        self.command = shutil.which("espeak-ng") or shutil.which("espeak")
+        if self.command is None:
+            raise RuntimeError("espeak-ng is not installed")
+        self.name = f"espeak-{voice}"
+        self.voice = voice
+
+    def synthesize(self, word: str, pronunciation: str) -> bytes:
+        return subprocess.run([self.command, "-v", self.voice, "--stdout", word],
+                              capture_output=True, check=True, timeout=30).stdout
+
+
+SYNTHESIZERS = {"tone": ToneSynthesizer, "espeak": EspeakSynthesizer}
+
+
+class AudioService:
+    """Non-blocking access to pronunciation clips
+
+    `workers` threads synthesize queued words; a word is queued at most once
+    while it is pending.
+    """
+
+    def __init__(self, synthesizer, directory: str, workers: int = 2):
+        self.synthesizer = synthesizer
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = self.misses = self.generated = self.failures = 0
+        self._pending: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="audio")
+
+    def key(self, question: Question) -> str:
+        text = "\x1f".join((self.synthesizer.name, question.word, question.pronunciation))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".wav")
+
+    def clip(self, question: Question) -> Optional[bytes]:
+        """The cached clip of a question, or None after queueing it"""
+        key = self.key(question)
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            self._submit(key, question)
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def prefetch(self, questions: Iterable[Question]):
+        """Queue the clips of questions that may be asked soon"""
+        for question in questions:
+            key = self.key(question)
+            if not os.path.exists(self.path(key)):
+                self._submit(key, question)
+
+    def _submit(self, key: str, question: Question):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = self._pool.submit(self._generate, key, question)
+
+    def _generate(self, key: str, question: Question):
+        try:
+            data = self.synthesizer.synthesize(question.word, question.pronunciation)
+            path = self.path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so readers never see a partial clip
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            with self._lock:
+                self.generated += 1
+        except Exception:
+            with self._lock:
+                self.failures += 1
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    @property
+    def queue_depth(self) -> int:
+        """Words queued or being synthesized"""
+        return len(self._pending)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "generated": self.generated,
+                "failures": self.failures, "queue_depth": self.queue_depth}
+
+    def join(self):
+        """Wait until every queued word has been synthesized"""
+        while True:
+            with self._lock:
+                futures = list(self._pending.values())
+            if not futures:
+                return
+            for future in futures:
+                future.result()
+
+
+def open_audio_service(name: str, directory: str, workers: int = 2) -> AudioService:
+    """AudioService with a synthesizer by name: tone or espeak"""
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Unknown synthesizer: {name}")
+    return AudioService(SYNTHESIZERS[name](), directory, workers)
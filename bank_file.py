@@ -0,0 +1,203 @@
+"""Compact, memory-mapped question bank files
+
+Layout (little-endian):
+
+    magic    8 bytes  b"FROGBNK1"
+    count    u32      number of questions
+    index    u32      length of the JSON bucket index that follows
+    buckets  JSON     [[difficulty, category, start, end], ...]
+    padding           up to an 8-byte boundary
+    offsets  u64 * (count + 1)  start of each record in the data section
+    data     UTF-8 records, fields separated by FIELD_SEP
+
+Records are sorted by (difficulty, category), so the bucket index maps
+straight onto the ID ranges used by QuestionBank. Opening a bank only reads
+the header; a Question is decoded when it is drawn, and every process that
+maps the same file shares its pages.
+
+Convert the built-in vocabulary with:  python bank_file.py questions.bank
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterable
+
+from question_bank import Question, QuestionBank
+
+MAGIC = b"FROGBNK1"
+HEADER = struct.Struct("<8sII")
+FIELD_SEP = "\x1f"
+DISTRACTOR_SEP = "\x1e"
+
+
+def encode_question(q: Question) -> bytes:
+    fields = [q.word, q.meaning, DISTRACTOR_SEP.join(q.distractors), str(q.difficulty), q.category, q.example, q.pronunciation]
+    return FIELD_SEP.join(fields).encode("utf-8")
+
+
+def decode_question(record: bytes) -> Question:
+    word, meaning, distractors, difficulty, category, example, pronunciation = record.decode("utf-8").split(FIELD_SEP)
+    distractors = distractors.split(DISTRACTOR_SEP) if distractors else []
+    return Question(word, meaning, distractors, int(difficulty), category, example, pronunciation)
+
+
+def write_bank(path, questions: Iterable[Question]):
+    """Write questions to a bank file, sorted by difficulty and category"""
+    buckets = {}
+    for q in questions:
+        buckets.setdefault((q.difficulty, q.category), []).append(encode_question(q))
+
+    index, offsets, position, start = [], [0], 0, 0
+    for (difficulty, category) in sorted(buckets):
+        records = buckets[(difficulty, category)]
+        index.append([difficulty, category, start, start + len(records)])
+        start += len(records)
+        for record in records:
+            position += len(record)
+            offsets.append(position)
+
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    header = HEADER.pack(MAGIC, start, len(index_bytes)) + index_bytes
+    header += b"\0" * (-len(header) % 8)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        for key in sorted(buckets):
+            f.writelines(buckets[key])
+
+
+class BankWriter:
+    """Streams records into a bank file without keeping them in memory
+
+    Records are appended to a temporary spill file next to `path` in any
+    order; close() writes the bank with the records grouped by difficulty
+    and category, keeping their order within a group. Memory grows by
+    about 20 bytes per record, whatever its size.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._spill = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+        self._keys = {}
+        self._key_ids = array("I")
+        self._starts = array("Q", [0])
+
+    def add(self, q: Question):
+        self.add_record(q.difficulty, q.category, encode_question(q))
+
+    def add_record(self, difficulty: int, category: str, record: bytes):
+        """Add a question already encoded with encode_question"""
+        key = self._keys.setdefault((difficulty, category), len(self._keys))
+        self._spill.write(record)
+        self._key_ids.append(key)
+        self._starts.append(self._starts[-1] + len(record))
+        self.count += 1
+
+    def close(self):
+        """Write the bank file and drop the spill file"""
+        keys = sorted(self._keys)
+        rank = array("I", [0]) * len(keys)
+        for position, key in enumerate(keys):
+            rank[self._keys[key]] = position
+
+        # Counting sort of the record numbers by group
+        sizes = [0] * len(keys)
+        for key_id in self._key_ids:
+            sizes[rank[key_id]] += 1
+        index, firsts, start = [], [], 0
+        for (difficulty, category), size in zip(keys, sizes):
+            index.append([difficulty, category, start, start + size])
+            firsts.append(start)
+            start += size
+        order = array("Q", [0]) * self.count
+        for record, key_id in enumerate(self._key_ids):
+            group = rank[key_id]
+            order[firsts[group]] = record
+            firsts[group] += 1
+        del self._key_ids
+
+        offsets, position = array("Q", [0]), 0
+        for record in order:
+            position += self._starts[record + 1] - self._starts[record]
+            offsets.append(position)
+
+        if sys.byteorder != "little":
+            offsets.byteswap()
+
+        index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        header = HEADER.pack(MAGIC, self.count, len(index_bytes)) + index_bytes
+        header += b"\0" * (-len(header) % 8)
+
+        self._spill.flush()
+        with open(self.path, "wb") as f:
+            f.write(header)
+            f.write(offsets.tobytes())
+            if self.count and self._starts[-1]:
+                with mmap.mmap(self._spill.fileno(), 0, access=mmap.ACCESS_READ) as spill:
+                    for record in order:
+                        f.write(spill[self._starts[record]:self._starts[record + 1]])
+        self._spill.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._spill.close()
+
+
+class MappedQuestions:
+    """Read-only sequence of Questions decoded lazily from a bank file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._count, index_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a question bank file")
+
+        index_end = HEADER.size + index_len
+        self.buckets = json.loads(self._mmap[HEADER.size:index_end])
+        offsets_start = index_end + (-index_end % 8)
+        self._data_start = offsets_start + (self._count + 1) * 8
+        self._offsets = memoryview(self._mmap)[offsets_start:self._data_start].cast("Q")
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the bucket index and the records in ID order, straight from the mapped pages"""
+        return hashlib.blake2b(memoryview(self._mmap)[HEADER.size:], digest_size=16).hexdigest()
+
+    def __getitem__(self, qid: int) -> Question:
+        if not 0 <= qid < self._count:
+            raise IndexError(qid)
+        start = self._data_start + self._offsets[qid]
+        end = self._data_start + self._offsets[qid + 1]
+        return decode_question(self._mmap[start:end])
+
+
+def load_bank(path) -> QuestionBank:
+    """Open a bank file as a QuestionBank without decoding its questions"""
+    questions = MappedQuestions(path)
+    ranges = {(difficulty, category): (start, end) for difficulty, category, start, end in questions.buckets}
+    return QuestionBank(questions, ranges)
+
+
+if __name__ == "__main__":
+    from questions import QUESTIONS
+
+    out = sys.argv[1] if len(sys.argv) > 1 else "questions.bank"
+    write_bank(out, QUESTIONS)
+    print(f"Wrote {len(QUESTIONS)} questions to {out}")
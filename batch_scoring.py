@@ -0,0 +1,103 @@
+"""Vectorized scoring and statistics for replaying answer logs with NumPy
+
+score_games() takes the answers of many games as flat arrays and gives the
+same points, streaks, scores and per-difficulty / per-category counts as
+playing them one by one through GameEngine.answer.
+"""
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+
+@dataclass
+class BatchScores:
+    # Per answer
+    points: np.ndarray
+    streak: np.ndarray
+    # Per game
+    score: np.ndarray
+    best_streak: np.ndarray
+    correct_answers: np.ndarray
+    total_attempts: np.ndarray
+    # Per game and difficulty / category column
+    difficulty_correct: np.ndarray
+    difficulty_total: np.ndarray
+    category_correct: np.ndarray
+    category_total: np.ndarray
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        """Overall accuracy per game in percent"""
+        return np.divide(self.correct_answers * 100, self.total_attempts,
+                         out=np.zeros(len(self.score)), where=self.total_attempts > 0)
+
+
+def answer_points(difficulty, response_time, streak) -> np.ndarray:
+    """Vectorized engine.score_answer total for correct answers"""
+    difficulty = np.asarray(difficulty, dtype=np.int64)
+    base = difficulty * 10
+    time_bonus = np.maximum(0, (base * 0.5 * (1 - np.minimum(np.asarray(response_time, dtype=np.float64) / 15, 1))).astype(np.int64))
+    streak_bonus = np.minimum(np.asarray(streak, dtype=np.int64) * 3, 30)
+    difficulty_multiplier = 1 + (difficulty - 1) * 0.5
+    return ((base + time_bonus + streak_bonus) * difficulty_multiplier).astype(np.int64)
+
+
+def score_games(game, difficulty, response_time, correct, category=None,
+                difficulties: Sequence[int] = (1, 2, 3), n_categories: int = 0) -> BatchScores:
+    """Score the answers of many games at once
+
+    All arrays have one entry per answer, in answer order; answers of one
+    game must be contiguous. `game` holds game numbers 0..G-1 and `category`
+    integer category codes below `n_categories` (e.g. bank.category_index).
+    As in GameEngine.answer, a wrong answer counts twice towards the total
+    of its difficulty.
+    """
+    game = np.asarray(game, dtype=np.int64)
+    difficulty = np.asarray(difficulty, dtype=np.int64)
+    correct = np.asarray(correct, dtype=bool)
+    n_games = int(game.max()) + 1 if len(game) else 0
+
+    # Streak: correct answers since the last wrong answer or game start
+    is_start = np.ones(len(game), dtype=bool)
+    is_start[1:] = game[1:] != game[:-1]
+    hits = correct.astype(np.int64)
+    cumulative = np.cumsum(hits)
+    reset = np.where(~correct | is_start, cumulative - hits, 0)
+    streak = cumulative - np.maximum.accumulate(reset) if len(game) else cumulative
+
+    points = np.where(correct, answer_points(difficulty, response_time, streak), 0)
+
+    score = np.bincount(game, weights=points, minlength=n_games).astype(np.int64)
+    correct_answers = np.bincount(game, weights=hits, minlength=n_games).astype(np.int64)
+    total_attempts = np.bincount(game, minlength=n_games)
+    best_streak = np.zeros(n_games, dtype=np.int64)
+    starts = np.flatnonzero(is_start)
+    if len(starts):
+        best_streak[game[starts]] = np.maximum.reduceat(streak, starts)
+
+    keys = np.asarray(sorted(difficulties))
+    column = np.searchsorted(keys, difficulty)
+    cell = game * len(keys) + column
+    difficulty_correct = np.bincount(cell, weights=hits, minlength=n_games * len(keys))
+    difficulty_total = np.bincount(cell, weights=2 - hits, minlength=n_games * len(keys))
+
+    if category is not None:
+        cell = game * n_categories + np.asarray(category, dtype=np.int64)
+        category_correct = np.bincount(cell, weights=hits, minlength=n_games * n_categories)
+        category_total = np.bincount(cell, minlength=n_games * n_categories)
+    else:
+        category_correct = category_total = np.zeros(n_games * n_categories)
+
+    return BatchScores(
+        points=points,
+        streak=streak,
+        score=score,
+        best_streak=best_streak,
+        correct_answers=correct_answers,
+        total_attempts=total_attempts,
+        difficulty_correct=difficulty_correct.astype(np.int64).reshape(n_games, len(keys)),
+        difficulty_total=difficulty_total.astype(np.int64).reshape(n_games, len(keys)),
+        category_correct=category_correct.astype(np.int64).reshape(n_games, n_categories),
+        category_total=category_total.astype(np.int64).reshape(n_games, n_categories),
+    )
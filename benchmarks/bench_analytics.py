@@ -0,0 +1,111 @@
+"""Throughput, memory and accuracy of the answer-log analytics
+
+Writes a synthetic answer log from a Rasch model: players of normally
+distributed ability answer words of known difficulty, and, as in the
+game, each player mostly sees words near their own level. The
+hand-assigned levels are noisy tertiles of the true difficulty. The
+benchmark then runs analytics.analyze on logs of two sizes and reports:
+
+- answers per second with 1 worker and with every core,
+- peak resident memory of the analysis (in a fresh process, workers
+  included), which should not grow with the log size,
+- rank correlation with the true difficulties of the IRT estimate, of the
+  raw error rate and of the hand-assigned levels.
+
+Usage: python benchmarks/bench_analytics.py [answers]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import CATEGORIES
+from analytics import analyze
+
+WORDS = 2_000
+ANSWERS_PER_SESSION = 40
+
+
+def write_log(path, answers, seed=0):
+    rng = np.random.default_rng(seed)
+    true_difficulty = rng.normal(0, 1.2, WORDS)
+    noisy = true_difficulty + rng.normal(0, 0.8, WORDS)
+    assigned = 1 + np.searchsorted(np.quantile(noisy, [1 / 3, 2 / 3]), noisy)
+    by_difficulty = np.argsort(true_difficulty)
+    abilities = rng.normal(0, 1, answers // ANSWERS_PER_SESSION + 1)
+    sorted_difficulty = true_difficulty[by_difficulty]
+
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, answers, 100_000):
+            n = min(100_000, answers - start)
+            session = (start + np.arange(n)) // ANSWERS_PER_SESSION
+            ability = abilities[session]
+            picks = np.searchsorted(sorted_difficulty, ability + rng.normal(0, 0.8, n)).clip(0, WORDS - 1)
+            word = by_difficulty[picks]
+            correct = rng.random(n) < 1 / (1 + np.exp(true_difficulty[word] - ability))
+            response_time = np.exp(1.5 + 0.3 * true_difficulty[word] + rng.normal(0, 0.4, n))
+            f.write("".join(
+                f'{{"session":"s{s}","word":"Word{w}","difficulty":{assigned[w]},"category":"{CATEGORIES[w % 10]}",'
+                f'"correct":{"true" if c else "false"},"response_time":{t:.3f},"points":0,"timestamp":0}}\n'
+                for s, w, c, t in zip(session.tolist(), word.tolist(), correct.tolist(), response_time.tolist())))
+    return true_difficulty, assigned
+
+
+def rank_correlation(a, b):
+    ranks_a, ranks_b = np.argsort(np.argsort(a)), np.argsort(np.argsort(b))
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def child(path, workers, output):
+    start = time.perf_counter()
+    table = analyze([path], workers)
+    elapsed = time.perf_counter() - start
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    print(f"{table['answers'] / elapsed:.0f} {peak_rss_mb():.0f}")
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (answers // 4, answers):
+            path = os.path.join(tmp, f"answers{size}.jsonl")
+            true_difficulty, assigned = write_log(path, size)
+            print(f"{size:,} answers, {WORDS} words, log {os.path.getsize(path) / 2**20:.0f} MB")
+            output = os.path.join(tmp, "calibration.json")
+            for workers in sorted({1, cores}):
+                result = subprocess.run([sys.executable, __file__, "--child", path, str(workers), output],
+                                        capture_output=True, text=True, check=True)
+                rate, rss = result.stdout.split()
+                print(f"  {workers:>2} workers: {int(rate):>10,} answers/s, peak RSS {rss} MB")
+            with open(output, encoding="utf-8") as f:
+                table = json.load(f)
+
+            rows = [table["words"].get(f"Word{w}") for w in range(WORDS)]
+            seen = np.array([row is not None and row["calibrated"] for row in rows])
+            truth = true_difficulty[seen]
+            irt = np.array([row["irt"] for row, ok in zip(rows, seen) if ok])
+            error_rate = np.array([1 - row["accuracy"] for row, ok in zip(rows, seen) if ok])
+            print(f"  rank correlation with the true difficulty over {seen.sum()} calibrated words: "
+                  f"IRT {rank_correlation(irt, truth):.3f}, error rate {rank_correlation(error_rate, truth):.3f}, "
+                  f"assigned level {rank_correlation(assigned[seen] + np.linspace(0, 0.01, seen.sum()), truth):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Answer log: request-path append latency and streaming read throughput
+
+Compares AnswerLog.append with opening the file and writing each event
+synchronously, then streams the log back and reports peak memory.
+
+Usage: python benchmarks/bench_answer_log.py [events]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+
+import common  # noqa: F401  (puts the app modules on sys.path)
+
+from answer_log import AnswerEvent, AnswerLog, read_answer_log
+
+
+def make_event(i):
+    return AnswerEvent(f"session-{i % 1000}", f"Word{i % 50_000}", i % 3 + 1, "Speed", i % 4 != 0, 3.5, 27, 1_700_000_000 + i)
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.jsonl")
+
+        log = AnswerLog(path)
+        start = time.perf_counter()
+        for i in range(events):
+            log.append(make_event(i))
+        append_us = (time.perf_counter() - start) / events * 1e6
+        log.close()
+
+        sync_path = os.path.join(tmp, "sync.jsonl")
+        sync_events = min(events, 20_000)
+        start = time.perf_counter()
+        for i in range(sync_events):
+            with open(sync_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(make_event(i))) + "\n")
+        sync_us = (time.perf_counter() - start) / sync_events * 1e6
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        count = sum(1 for _ in read_answer_log(path))
+        read_s = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"append (buffered): {append_us:.2f} us/event")
+        print(f"append (sync):     {sync_us:.2f} us/event")
+        print(f"read: {count} events, {count / read_s:,.0f} events/s, "
+              f"{os.path.getsize(path) / 2**20:.1f} MB file, peak {peak / 2**10:.0f} KB traced memory")
+
+
+if __name__ == "__main__":
+    main()
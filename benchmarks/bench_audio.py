@@ -0,0 +1,83 @@
+"""Pronunciation audio: time spent on the UI thread and cache hit rate
+
+A player answers TURNS questions of a spaced-repetition game against a
+synthesizer that takes SYNTH_DELAY per word (a stand-in for a real TTS
+engine), spending THINK seconds on each feedback screen. Compares:
+
+- inline: the clip is synthesized when its question is shown,
+- background: AudioService.clip() with the due words prefetched while
+  feedback is shown,
+
+and reports the time taken on the UI thread per question, the hit rate of
+the questions shown and the deepest generation queue seen.
+
+Usage: python benchmarks/bench_audio.py
+"""
+import random
+import statistics
+import tempfile
+import time
+
+from common import synthetic_questions
+from audio import AudioService, ToneSynthesizer
+from engine import GameEngine
+from question_bank import QuestionBank
+
+TURNS = 300
+SYNTH_DELAY = 0.03
+THINK = 0.02
+
+
+class SlowSynthesizer(ToneSynthesizer):
+    def synthesize(self, word, pronunciation):
+        time.sleep(SYNTH_DELAY)
+        return super().synthesize(word, pronunciation)
+
+
+class InlineService(AudioService):
+    """Synthesizes a missing clip before returning it"""
+
+    def clip(self, question):
+        data = super().clip(question)
+        if data is None:
+            self.join()
+            with open(self.path(self.key(question)), "rb") as f:
+                data = f.read()
+        return data
+
+
+def play(bank, service_class, prefetch):
+    with tempfile.TemporaryDirectory() as tmp:
+        service = service_class(SlowSynthesizer(), tmp, workers=2)
+        engine = GameEngine(bank, rng=random.Random(0), clock=lambda: 0.0)
+        rng = random.Random(1)
+        lookups, deepest = [], 0
+        for _ in range(TURNS):
+            start = time.perf_counter()
+            service.clip(engine.current_question)
+            lookups.append(time.perf_counter() - start)
+            engine.answer(engine.current_question.meaning if rng.random() < 0.7 else "", 4.0)
+            if prefetch:
+                service.prefetch(engine.likely_next())
+            deepest = max(deepest, service.queue_depth)
+            time.sleep(THINK)
+            engine.next_question()
+            if engine.game_over:
+                engine.new_game()
+        service.join()
+        return service, lookups, deepest
+
+
+def main():
+    bank = QuestionBank(synthetic_questions(60))
+    print(f"{TURNS} turns on a {len(bank)}-word bank, {SYNTH_DELAY * 1000:.0f} ms per clip, "
+          f"{THINK * 1000:.0f} ms per feedback screen")
+    print(f"{'mode':>10} {'hit rate':>9} {'mean UI':>10} {'max UI':>10} {'max queue':>10} {'clips':>6}")
+    for label, service_class, prefetch in (("inline", InlineService, False), ("background", AudioService, True)):
+        service, lookups, deepest = play(bank, service_class, prefetch)
+        print(f"{label:>10} {service.hit_rate:>9.1%} {statistics.mean(lookups) * 1e3:>7.3f} ms "
+              f"{max(lookups) * 1e3:>7.3f} ms {deepest:>10} {service.generated:>6}")
+
+
+if __name__ == "__main__":
+    main()
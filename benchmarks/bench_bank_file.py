@@ -0,0 +1,49 @@
+"""Resident memory of a 1M-question bank: bank file vs. in-memory objects
+
+Each variant is measured in a fresh child process so the numbers are not
+polluted by building the bank file.
+
+Usage: python benchmarks/bench_bank_file.py [count]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import iter_synthetic_questions, rss_mb
+from bank_file import load_bank, write_bank
+from question_bank import QuestionBank, QuestionPool
+
+
+def child(mode, count, path):
+    anon, shared = rss_mb("RssAnon"), rss_mb("RssFile")
+    start = time.perf_counter()
+    if mode == "mapped":
+        bank = load_bank(path)
+    else:
+        bank = QuestionBank(list(iter_synthetic_questions(count)))
+    load_s = time.perf_counter() - start
+
+    pool = QuestionPool(bank)
+    for _ in range(1_000):
+        bank[pool.draw([1, 2, 3])]
+    print(f"{mode:>8} {load_s:>10.3f} {rss_mb('RssAnon') - anon:>15.1f} {rss_mb('RssFile') - shared:>16.1f}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.bank")
+        write_bank(path, iter_synthetic_questions(count))
+        print(f"{count} questions, bank file {os.path.getsize(path) / 2**20:.1f} MB")
+        print(f"{'variant':>8} {'load (s)':>10} {'private MB':>15} {'shared file MB':>16}")
+        for mode in ("mapped", "objects"):
+            subprocess.run([sys.executable, __file__, "--child", mode, str(count), path], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+    else:
+        main()
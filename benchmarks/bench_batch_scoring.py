@@ -0,0 +1,93 @@
+"""Vectorized batch scoring vs. looping GameEngine.answer over answer logs
+
+Plays synthetic games to build an answer log, replays it one answer at a
+time through the engine (the scalar path), scores it with
+batch_scoring.score_games, checks both agree exactly and compares speed.
+
+Usage: python benchmarks/bench_batch_scoring.py [games]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from common import synthetic_questions
+from batch_scoring import score_games
+from engine import GameEngine
+from question_bank import QuestionBank
+from simulate import PlayerModel
+
+
+def record_games(bank, games, seed=0):
+    """Play games and return their answer log as flat arrays"""
+    rng = random.Random(seed)
+    player = PlayerModel({1: 0.9, 2: 0.8, 3: 0.7})
+    engine = GameEngine(bank, rng=rng, clock=lambda: 0.0)
+    log = {"game": [], "question": [], "selected": [], "response_time": []}
+    for g in range(games):
+        engine.new_game()
+        while not engine.game_over:
+            selected, response_time = player.answer(engine, rng)
+            log["game"].append(g)
+            log["question"].append(engine.current_question)
+            log["selected"].append(selected)
+            log["response_time"].append(response_time)
+            engine.answer(selected, response_time)
+            engine.next_question()
+    return log
+
+
+def replay_scalar(bank, log):
+    """Feed every logged answer through GameEngine.answer"""
+    engine = GameEngine(bank, clock=lambda: 0.0)
+    results, current = [], None
+    for game, question, selected, response_time in zip(log["game"], log["question"], log["selected"], log["response_time"]):
+        if game != current:
+            if current is not None:
+                results.append(engine)
+                engine = GameEngine(bank, clock=lambda: 0.0)
+            current = game
+        engine.current_question = question
+        engine.answer(selected, response_time)
+    results.append(engine)
+    return results
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    bank = QuestionBank(synthetic_questions(10_000))
+    log = record_games(bank, games)
+    print(f"{games} games, {len(log['game'])} answers")
+
+    start = time.perf_counter()
+    engines = replay_scalar(bank, log)
+    scalar_s = time.perf_counter() - start
+
+    questions = log["question"]
+    arrays = dict(
+        game=np.array(log["game"]),
+        difficulty=np.array([q.difficulty for q in questions]),
+        response_time=np.array(log["response_time"]),
+        correct=np.array([s == q.meaning for s, q in zip(log["selected"], questions)]),
+        category=np.array([bank.category_index[q.category] for q in questions]),
+    )
+    start = time.perf_counter()
+    batch = score_games(**arrays, n_categories=len(bank.category_index))
+    batch_s = time.perf_counter() - start
+
+    keys = sorted(bank.difficulty_index)
+    categories = sorted(bank.category_index, key=bank.category_index.get)
+    for g, engine in enumerate(engines):
+        assert batch.score[g] == engine.score, (g, batch.score[g], engine.score)
+        assert batch.best_streak[g] == engine.best_streak
+        assert batch.correct_answers[g] == engine.correct_answers
+        assert batch.total_attempts[g] == engine.total_attempts
+        assert [tuple(x) for x in zip(batch.difficulty_correct[g], batch.difficulty_total[g])] == [engine.difficulty_stats.get(d) for d in keys]
+        assert [tuple(x) for x in zip(batch.category_correct[g], batch.category_total[g])] == [engine.category_stats.get(c) for c in categories]
+    print("batch results match the scalar path exactly")
+    print(f"scalar replay: {scalar_s:.3f}s  batch: {batch_s:.3f}s  speed-up: {scalar_s / batch_s:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
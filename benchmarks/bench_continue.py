@@ -0,0 +1,80 @@
+"""Latency of the Continue click with and without prefetching the next question
+
+- engine: GameEngine.next_question() on a large bank with generated
+  distractors, i.e. the work left for the Continue rerun,
+- app: the whole Continue rerun of app.py under AppTest (FROG_PREFETCH=0
+  and the default).
+
+Usage: python benchmarks/bench_continue.py
+"""
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from common import synthetic_questions
+from distractors import DistractorEngine
+from engine import GameEngine
+from question_bank import QuestionBank
+
+TURNS = 20_000
+APP_TURNS = 40
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+def engine_latency(bank, prefetch):
+    engine = GameEngine(bank, rng=random.Random(0), clock=lambda: 0.0, distractors=DistractorEngine(bank),
+                        prefetch=prefetch)
+    rng = random.Random(1)
+    times = []
+    for _ in range(TURNS):
+        engine.answer(engine.current_question.meaning if rng.random() < 0.8 else "", 4.0)
+        start = time.perf_counter()
+        engine.next_question()
+        times.append(time.perf_counter() - start)
+        if engine.game_over:
+            engine.new_game()
+    return times
+
+
+def app_latency(prefetch):
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["FROG_PREFETCH"] = "1" if prefetch else "0"
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    times = []
+    while len(times) < APP_TURNS:
+        game = at.session_state.engine
+        if game.game_over:
+            at.button[-1].click().run()
+            continue
+        at.button(key=f"option_{game.options.index(game.current_question.meaning)}").click().run()
+        if game.game_over:
+            continue
+        start = time.perf_counter()
+        at.button(key="continue").click().run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times, unit="us"):
+    scale = 1e6 if unit == "us" else 1e3
+    print(f"  {label:>11}: median {statistics.median(times) * scale:6.1f} {unit}, "
+          f"p99 {sorted(times)[int(len(times) * 0.99)] * scale:6.1f} {unit}")
+
+
+def main():
+    bank = QuestionBank(synthetic_questions(200_000))
+    print(f"next_question() on a {len(bank)}-word bank with generated distractors")
+    for label, prefetch in (("on Continue", False), ("prefetched", True)):
+        report(label, engine_latency(bank, prefetch))
+
+    print(f"\nContinue rerun of app.py under AppTest, {APP_TURNS} clicks")
+    for label, prefetch in (("on Continue", False), ("prefetched", True)):
+        report(label, app_latency(prefetch), "ms")
+
+
+if __name__ == "__main__":
+    main()
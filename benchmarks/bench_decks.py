@@ -0,0 +1,72 @@
+"""First-load and warm-draw latency of decks served through a DeckCache
+
+Writes `decks` bank files of `words` questions each, then measures:
+
+- first load: DeckCache.get of a deck nobody has used yet, plus starting
+  a game on it (the first question draw),
+- warm draw: DeckCache.get of a cached deck plus one question draw,
+- a skewed (Zipf-like) mix of players over all decks with a cache smaller
+  than the deck count: hit rate, loads and resident memory.
+
+Usage: python benchmarks/bench_decks.py [decks] [words]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from common import iter_synthetic_questions, rss_mb
+from bank_file import write_bank
+from decks import DeckCache, load_deck
+from engine import GameEngine
+
+CAPACITY = 32
+REQUESTS = 20_000
+
+
+def main():
+    n_decks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f"deck{i:03d}" for i in range(n_decks)]
+        for seed, name in enumerate(names):
+            write_bank(os.path.join(tmp, name + ".bank"), iter_synthetic_questions(words, seed))
+        print(f"{n_decks} decks of {words} words, cache of {CAPACITY} decks")
+
+        cache = DeckCache(lambda name: load_deck(name, tmp), CAPACITY)
+        first, engines = [], {}
+        for name in names[:CAPACITY]:
+            start = time.perf_counter()
+            deck = cache.get(name)
+            engines[name] = GameEngine(deck.bank, rng=random.Random(0))
+            first.append(time.perf_counter() - start)
+
+        warm = []
+        rng = random.Random(1)
+        for _ in range(REQUESTS):
+            name = names[rng.randrange(min(CAPACITY, n_decks))]
+            start = time.perf_counter()
+            cache.get(name)
+            engines[name].setup_question()
+            warm.append(time.perf_counter() - start)
+        engines.clear()
+
+        print(f"  first load: median {statistics.median(first) * 1e3:.2f} ms, max {max(first) * 1e3:.2f} ms")
+        print(f"  warm draw:  median {statistics.median(warm) * 1e6:.1f} us, "
+              f"p99 {sorted(warm)[int(len(warm) * 0.99)] * 1e6:.1f} us")
+
+        cache = DeckCache(lambda name: load_deck(name, tmp), CAPACITY)
+        weights = [1 / (rank + 1) for rank in range(n_decks)]
+        before = rss_mb()
+        start = time.perf_counter()
+        for name in rng.choices(names, weights, k=REQUESTS):
+            GameEngine(cache.get(name).bank, rng=rng)
+        elapsed = time.perf_counter() - start
+        print(f"  skewed mix: {REQUESTS / elapsed:,.0f} games/s, hit rate {cache.hits / REQUESTS:.1%}, "
+              f"{cache.loads} loads, {len(cache)} decks cached, +{rss_mb() - before:.1f} MB RSS")
+
+
+if __name__ == "__main__":
+    main()
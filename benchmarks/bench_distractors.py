@@ -0,0 +1,56 @@
+"""Option-generation latency of the distractor engine on a 100k-word bank
+
+Usage: python benchmarks/bench_distractors.py [words]
+"""
+import random
+import sys
+import time
+
+from common import per_call_us, synthetic_questions
+from distractors import DistractorEngine
+from question_bank import QuestionBank
+
+
+def main():
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bank = QuestionBank(synthetic_questions(words))
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    engine = DistractorEngine(bank)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    def authored():
+        q = bank[rng.randrange(words)]
+        options = [q.meaning] + q.distractors
+        rng.shuffle(options)
+
+    def generated():
+        qid = rng.randrange(words)
+        options = [bank[qid].meaning] + engine.distractors(qid, rng)
+        rng.shuffle(options)
+
+    samples = 50_000
+    authored_us = per_call_us(authored, samples)
+    cold_us = per_call_us(generated, samples)
+    # Warm: a working set of recently asked questions that fits the cache
+    hot = [rng.randrange(words) for _ in range(2_000)]
+    for qid in hot:
+        for variant in range(8):
+            engine._variant(qid, variant)
+
+    def warm():
+        qid = hot[rng.randrange(len(hot))]
+        options = [bank[qid].meaning] + engine.distractors(qid, rng)
+        rng.shuffle(options)
+
+    warm_us = per_call_us(warm, samples)
+    print(f"{words} words, pools built in {build_ms:.1f} ms")
+    print(f"authored options:        {authored_us:.2f} us")
+    print(f"generated, mostly cold:  {cold_us:.2f} us")
+    print(f"generated, warm cache:   {warm_us:.2f} us")
+    print(engine.cache_info())
+
+
+if __name__ == "__main__":
+    main()
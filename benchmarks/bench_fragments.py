@@ -0,0 +1,112 @@
+"""Question and feedback HTML per rerun: f-strings vs. templates vs. the shared fragment cache
+
+Plays synthetic sessions to record the screens their reruns show (the
+question box, then the feedback box of each answer), then renders the
+whole sequence with the unescaped f-strings app.py used to build, with
+the precompiled templates alone, and through a FragmentCache that starts
+cold or is already warm from earlier sessions.
+
+Usage: python benchmarks/bench_fragments.py [sessions] [bank size, 0 for the built-in questions]
+"""
+import random
+import sys
+import time
+
+from common import synthetic_questions
+import fragments
+from engine import GameEngine
+from question_bank import QuestionBank
+from questions import QUESTIONS
+from simulate import PlayerModel
+
+
+def record_screens(bank, sessions, seed=0):
+    """(question, feedback) shown by each rerun of `sessions` one-game sessions, feedback None on question screens"""
+    rng = random.Random(seed)
+    player = PlayerModel({1: 0.9, 2: 0.8, 3: 0.7})
+    screens = []
+    for _ in range(sessions):
+        engine = GameEngine(bank, rng=rng, clock=lambda: 0.0)
+        while not engine.game_over:
+            screens.append((engine.current_question, None))
+            engine.answer(*player.answer(engine, rng))
+            screens.append((engine.current_question, engine.feedback))
+            engine.next_question()
+    return screens
+
+
+def fstring_html(q, fb):
+    """The markup app.py built before the templates, without escaping"""
+    if fb is None:
+        return f"""
+        <div class="question-box">
+            <div class="question-word">{q.word}</div>
+            <div class="pronunciation">/{q.pronunciation}/</div>
+            <div class="question-prompt">Choose the correct meaning:</div>
+            <div class="difficulty-stars">{"⭐" * q.difficulty}</div>
+            <div style="color: #ecf0f1; font-size: 14px;">Category: {q.category}</div>
+        </div>
+        """
+    fb_class = "feedback-correct" if fb['type'] == 'correct' else "feedback-wrong"
+    return f"""
+        <div class="feedback-box {fb_class}">
+            <div class="feedback-title">{fb['message']}</div>
+            <div class="feedback-definition">{fb['definition']}</div>
+            <div class="feedback-example">"{fb['example']}"</div>
+            <div class="feedback-category">{fb['category']}</div>
+            <div class="feedback-bonus">{fb['bonus']}</div>
+            {f'<div class="feedback-breakdown">{fb["breakdown"]}</div>' if fb['breakdown'] else ''}
+        </div>
+        """
+
+
+def template_html(q, fb):
+    if fb is None:
+        return fragments.QUESTION.render(q.word, q.pronunciation, "⭐" * q.difficulty, q.category)
+    breakdown = fragments.BREAKDOWN.render(fb["breakdown"]) if fb["breakdown"] else ""
+    return fragments.FEEDBACK.render(fb["type"], fb["message"], fb["definition"], fb["example"], fb["category"],
+                                     fb["bonus"], breakdown)
+
+
+def cached_html(cache):
+    def render(q, fb):
+        return fragments.question_html(cache, q) if fb is None else fragments.feedback_html(cache, fb)
+    return render
+
+
+def per_rerun_us(render, screens):
+    start = time.perf_counter()
+    for q, fb in screens:
+        render(q, fb)
+    return (time.perf_counter() - start) / len(screens) * 1e6
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    bank = QuestionBank(synthetic_questions(size) if size else QUESTIONS)
+    screens = record_screens(bank, sessions)
+    print(f"{sessions} sessions on {len(bank)} words, {len(screens)} reruns")
+
+    print(f"{'f-string (unescaped)':>22}: {per_rerun_us(fstring_html, screens):6.2f} µs/rerun")
+    print(f"{'template, no cache':>22}: {per_rerun_us(template_html, screens):6.2f} µs/rerun")
+
+    # Cold: every session's first sight of a fragment renders it; warm: the
+    # same reruns again once earlier sessions have filled the cache
+    cache = fragments.FragmentCache()
+    cold = per_rerun_us(cached_html(cache), screens)
+    print(f"{'cache, cold':>22}: {cold:6.2f} µs/rerun  hit rate {cache.hit_rate:.1%}, {len(cache)} fragments")
+    cache.hits = cache.misses = 0
+    warm = per_rerun_us(cached_html(cache), screens)
+    print(f"{'cache, warm':>22}: {warm:6.2f} µs/rerun  hit rate {cache.hit_rate:.1%}")
+
+    questions = [(q, fb) for q, fb in screens if fb is None]
+    feedback = [(q, fb) for q, fb in screens if fb is not None]
+    for label, subset in (("question boxes", questions), ("feedback boxes", feedback)):
+        cache = fragments.FragmentCache()
+        per_rerun_us(cached_html(cache), subset)
+        print(f"{label:>22}: hit rate {cache.hit_rate:.1%} on the first pass, {len(cache)} distinct")
+
+
+if __name__ == "__main__":
+    main()
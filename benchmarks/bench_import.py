@@ -0,0 +1,92 @@
+"""Throughput and memory of the bulk importer
+
+Writes the same synthetic vocabulary as CSV and as JSON Lines, with about
+2% invalid rows (missing fields, bad difficulty, too few distractors,
+broken lines) and 2% repeated words, then imports each file with 1 worker
+and with every core in a fresh process and reports rows per second and
+peak resident memory (workers included).
+
+Usage: python benchmarks/bench_import.py [rows]
+"""
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import iter_synthetic_questions
+from bank_file import load_bank
+from importer import import_files
+
+
+def rows(n, seed=0):
+    rng = random.Random(seed)
+    for i, q in enumerate(iter_synthetic_questions(n, seed)):
+        row = {"word": q.word, "meaning": q.meaning, "distractors": q.distractors, "difficulty": q.difficulty,
+               "category": q.category, "example": q.example, "pronunciation": q.pronunciation}
+        roll = rng.random()
+        if roll < 0.02:
+            row["word"] = f"Word{rng.randrange(max(i, 1))}"
+        elif roll < 0.025:
+            row["meaning"] = ""
+        elif roll < 0.03:
+            row["difficulty"] = 7
+        elif roll < 0.035:
+            row["distractors"] = q.distractors[:1]
+        elif roll < 0.04:
+            row["example"] = 'A line\nbreak and "quotes"'
+            row["pronunciation"] = ""
+        yield row
+
+
+def write_inputs(directory, n):
+    csv_path, jsonl_path = os.path.join(directory, "words.csv"), os.path.join(directory, "words.jsonl")
+    with open(csv_path, "w", encoding="utf-8", newline="") as c, open(jsonl_path, "w", encoding="utf-8") as j:
+        writer = csv.DictWriter(c, ["word", "meaning", "distractors", "difficulty", "category", "example", "pronunciation"])
+        writer.writeheader()
+        for row in rows(n):
+            j.write(json.dumps(row) + "\n")
+            writer.writerow(dict(row, distractors="|".join(row["distractors"])))
+    return csv_path, jsonl_path
+
+
+def peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def child(path, workers, output):
+    report = import_files([path], output, output + ".errors.jsonl", workers)
+    print(f"{report.rows_per_second:.0f} {peak_rss_mb():.0f} {report.imported} {report.rejected} {report.duplicates}")
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        paths = write_inputs(tmp, n)
+        print(f"{n:,} rows written in {time.perf_counter() - start:.1f} s")
+        output = os.path.join(tmp, "out.bank")
+        for path in paths:
+            print(f"{os.path.basename(path)} ({os.path.getsize(path) / 2**20:.0f} MB)")
+            for workers in sorted({1, cores}):
+                result = subprocess.run([sys.executable, __file__, "--child", path, str(workers), output],
+                                        capture_output=True, text=True, check=True)
+                rate, rss, imported, rejected, duplicates = result.stdout.split()
+                print(f"  {workers:>2} workers: {int(rate):>9,} rows/s, peak RSS {rss} MB, "
+                      f"{int(imported):,} imported, {int(rejected):,} rejected ({int(duplicates):,} duplicates)")
+            assert len(load_bank(output)) == int(imported)
+
+
+if __name__ == "__main__":
+    main()
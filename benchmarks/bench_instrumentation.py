@@ -0,0 +1,67 @@
+"""Cost of the rerun instrumentation
+
+- section(): an empty block timed with metrics disabled (the default) and
+  enabled, against the bare block.
+- StackSampler: answer/next_question throughput of the game engine while
+  the sampler runs in the background, against no sampler.
+
+Usage: python benchmarks/bench_instrumentation.py
+"""
+import random
+import time
+
+from common import per_call_us, synthetic_questions
+
+import instrumentation
+from engine import GameEngine
+from instrumentation import SAMPLER, section
+from question_bank import QuestionBank
+
+REPEAT = 500_000
+TURNS = 50_000
+
+
+def bare():
+    pass
+
+
+def timed():
+    with section("bench"):
+        pass
+
+
+def turns_per_second(engine, rng):
+    start = time.perf_counter()
+    for _ in range(TURNS):
+        engine.answer(engine.current_question.meaning if rng.random() < 0.8 else "", 4.0)
+        engine.next_question()
+        if engine.game_over:
+            engine.new_game()
+    return TURNS / (time.perf_counter() - start)
+
+
+def main():
+    print("section() around an empty block")
+    print(f"  {'bare':>9}: {per_call_us(bare, REPEAT):.3f} us")
+    for enabled in (False, True):
+        instrumentation.ENABLED = enabled
+        label = "enabled" if enabled else "disabled"
+        print(f"  {label:>9}: {per_call_us(timed, REPEAT):.3f} us")
+    metric = instrumentation.METRICS["bench"]
+    print(f"  recorded {metric.count} observations, p99 <= {metric.quantile(0.99) * 1e6:.0f} us")
+
+    bank = QuestionBank(synthetic_questions(10_000))
+    engine = GameEngine(bank, rng=random.Random(0), clock=lambda: 0.0)
+    print(f"\nGame turns per second with the {SAMPLER.interval * 1000:.0f} ms stack sampler")
+    base = turns_per_second(engine, random.Random(1))
+    SAMPLER.start()
+    sampled = turns_per_second(engine, random.Random(1))
+    SAMPLER.stop()
+    print(f"  {'off':>9}: {base:,.0f}")
+    print(f"  {'on':>9}: {sampled:,.0f} ({(1 - sampled / base) * 100:.1f}% slower, {SAMPLER.samples} samples)")
+    hottest = SAMPLER.stacks.most_common(1)[0][0].split(";")[-1]
+    print(f"  hottest frame: {hottest}")
+
+
+if __name__ == "__main__":
+    main()
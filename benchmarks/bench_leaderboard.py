@@ -0,0 +1,88 @@
+"""Leaderboard load test: concurrent submissions with rank and top-N reads
+
+Loads a board with many prior games, then runs submitter and reader
+threads side by side and reports throughput and read latencies.
+
+Usage: python benchmarks/bench_leaderboard.py [prior_games]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import common  # noqa: F401  (puts the app modules on sys.path)
+from leaderboard import GameResult, Leaderboard
+
+CATEGORIES = ["Speed", "Sound", "Time", "Nature", "Behavior"]
+
+
+def random_result(rng):
+    return GameResult(
+        f"p{rng.randrange(100_000)}", rng.randrange(1500), 80.0, rng.randrange(10),
+        difficulty_scores={str(rng.randint(1, 3)): rng.randrange(500)},
+        category_scores={rng.choice(CATEGORIES): rng.randrange(300)},
+    )
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[int(len(samples) * p)] * 1e6
+
+
+def load_test(board, label, writers=4, readers=4, duration=2.0):
+    stop = time.perf_counter() + duration
+    submitted, rank_times, top_times = [0], [], []
+
+    def write(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            board.submit(random_result(rng))
+            submitted[0] += 1
+
+    def read(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            board.rank(rng.randrange(1500))
+            rank_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            board.top("global", 10)
+            top_times.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read, args=(100 + i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"{label}: {submitted[0] / duration:,.0f} submits/s, {len(rank_times) / duration:,.0f} reads/s | "
+          f"rank p50 {percentile(rank_times, 0.5):.1f} us p99 {percentile(rank_times, 0.99):.1f} us | "
+          f"top10 p50 {percentile(top_times, 0.5):.1f} us p99 {percentile(top_times, 0.99):.1f} us")
+
+
+def main():
+    prior = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+
+    board = Leaderboard()
+    start = time.perf_counter()
+    for _ in range(prior):
+        board.submit(random_result(rng))
+    print(f"loaded {prior:,} games in memory in {time.perf_counter() - start:.1f}s")
+    load_test(board, "memory")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leaderboard.jsonl")
+        writer = Leaderboard(path)
+        for _ in range(prior // 10):
+            writer.submit(random_result(rng))
+        start = time.perf_counter()
+        board = Leaderboard(path)
+        print(f"replayed {prior // 10:,} games from file in {time.perf_counter() - start:.1f}s")
+        load_test(board, "file  ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Load test: drive app.py with many simulated players through AppTest
+
+Every player is its own AppTest session that plays full games: answer
+clicks (handle_answer), Continue, and Play Again. `--concurrency` sessions
+are alive at once and take turns doing one rerun each, so every rerun runs
+next to that many live sessions. AppTest is not thread-safe, so reruns are
+serialized; run several copies of the harness to add CPU contention.
+
+The report has rerun latency percentiles, CPU time per rerun and memory
+per live session, as JSON so runs can be compared between commits.
+
+Usage: python benchmarks/bench_load.py --players 200 --concurrency 16 --output load.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from common import rss_mb
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+
+
+class Player:
+    def __init__(self, seed, accuracy, games):
+        self.rng = random.Random(seed)
+        self.accuracy = accuracy
+        self.games_left = games
+        self.latencies = []
+        self.cpu = []
+        self.app = None
+
+    def run(self, action):
+        wall, cpu = time.perf_counter(), time.process_time()
+        action.run()
+        self.cpu.append(time.process_time() - cpu)
+        self.latencies.append(time.perf_counter() - wall)
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].message)
+
+    def step(self):
+        """Do one rerun; returns False once all games are played"""
+        if self.app is None:
+            self.app = AppTest.from_file(APP, default_timeout=60)
+            self.run(self.app)
+            return True
+
+        game = self.app.session_state.engine
+        options = [b for b in self.app.button if b.key and b.key.startswith("option_")]
+        if options:
+            right = [b for b in options if b.label == game.current_question.meaning]
+            wrong = [b for b in options if b not in right]
+            pick = right[0] if right and (self.rng.random() < self.accuracy or not wrong) else self.rng.choice(wrong)
+            self.run(pick.click())
+        elif any(b.key == "continue" for b in self.app.button):
+            self.run(self.app.button(key="continue").click())
+        else:
+            self.games_left -= 1
+            if self.games_left <= 0:
+                self.app = None
+                return False
+            play_again = [b for b in self.app.button if "Play Again" in b.label]
+            self.run(play_again[0].click())
+        return True
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(APP)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8, help="sessions alive at once")
+    parser.add_argument("--games", type=int, default=1, help="games per player")
+    parser.add_argument("--accuracy", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args()
+
+    pending = [Player(args.seed + i, args.accuracy, args.games) for i in range(args.players)]
+    finished, active = [], []
+    rss_before, rss_peak = rss_mb(), 0.0
+    start = time.perf_counter()
+    while pending or active:
+        while pending and len(active) < args.concurrency:
+            active.append(pending.pop(0))
+        for player in list(active):
+            if not player.step():
+                active.remove(player)
+                finished.append(player)
+        rss_peak = max(rss_peak, rss_mb())
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(t for p in finished for t in p.latencies)
+    cpu = [t for p in finished for t in p.cpu]
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "reruns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "reruns_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1e3, 3),
+            "p50": round(percentile(latencies, 0.50) * 1e3, 3),
+            "p95": round(percentile(latencies, 0.95) * 1e3, 3),
+            "p99": round(percentile(latencies, 0.99) * 1e3, 3),
+            "max": round(latencies[-1] * 1e3, 3),
+        },
+        "cpu_ms_per_rerun": round(statistics.mean(cpu) * 1e3, 3),
+        "memory_kb_per_session": round((rss_peak - rss_before) * 1024 / min(args.players, args.concurrency), 1),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Draw latency of the indexed question pool vs. the old list scan
+
+Usage: python benchmarks/bench_question_bank.py
+"""
+import random
+
+from common import per_call_us, synthetic_questions
+from question_bank import QuestionBank, QuestionPool
+
+SIZES = [1_000, 10_000, 100_000, 500_000]
+DRAWS = 2_000
+
+
+def legacy_draw(questions, used):
+    """The original setup_question selection: filter, choose, list.index"""
+    available = [q for idx, q in enumerate(questions) if idx not in used]
+    preferred = [q for q in available if q.difficulty <= 2] or available
+    question = random.choice(preferred)
+    used.add(questions.index(question))
+
+
+def main():
+    print(f"{'questions':>10} {'pool draw (us)':>15} {'legacy draw (us)':>17}")
+    for size in SIZES:
+        questions = synthetic_questions(size)
+        pool = QuestionPool(QuestionBank(questions))
+        pool_us = per_call_us(lambda: pool.draw([1, 2]), DRAWS)
+
+        used = set()
+        legacy_us = per_call_us(lambda: legacy_draw(questions, used), max(3, 200_000 // size))
+        print(f"{size:>10} {pool_us:>15.2f} {legacy_us:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Fan-out latency of race room updates
+
+Rooms of 100 to 1000 subscribers get a stream of score updates and every
+subscriber records how long each update took from publish() to its
+callback:
+
+- hub: the in-process AsyncioHub,
+- broker: four BrokerClients (standing in for four worker processes,
+  each holding a quarter of the room's sessions) relaying through a
+  `race.py broker` process,
+- followers: the AsyncioHub with Follower subscriptions, counting how
+  many wake-ups (reruns) a burst of updates costs each session.
+
+Usage: python benchmarks/bench_race.py [updates]
+"""
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from pathlib import Path
+
+import common  # noqa: F401  (puts the app modules on sys.path)
+from race import AsyncioHub, BrokerClient, Follower
+
+ROOMS = (100, 500, 1000)
+WORKERS = 4
+PORT = 8799
+RACE = Path(__file__).resolve().parent.parent / "race.py"
+
+
+def measure(publisher, hubs, size, updates):
+    """Publish `updates` messages to a room of `size` subscribers spread over `hubs`"""
+    latencies = []
+    done = threading.Event()
+    expected = size * updates
+    channel = f"bench/{size}"
+
+    def on_update(message):
+        latencies.append(time.perf_counter() - message["sent"])
+        if len(latencies) == expected:
+            done.set()
+
+    subscriptions = [(hubs[i % len(hubs)], hubs[i % len(hubs)].subscribe(channel, on_update)) for i in range(size)]
+    time.sleep(0.2)
+    start = time.perf_counter()
+    for i in range(updates):
+        publisher.publish(channel, {"player": i, "sent": time.perf_counter()})
+        time.sleep(0.001)
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    for hub, subscription in subscriptions:
+        hub.unsubscribe(subscription)
+    latencies.sort()
+    return (statistics.median(latencies) * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3,
+            len(latencies) / elapsed, len(latencies) == expected)
+
+
+def report(name, size, result):
+    median, p99, rate, complete = result
+    print(f"  {name:>8} {size:>5} players: median {median:6.2f} ms, p99 {p99:7.2f} ms, "
+          f"{rate:>9,.0f} deliveries/s{'' if complete else ' (incomplete)'}")
+
+
+class BenchRoom:
+    """The part of a Room a Follower uses"""
+
+    def __init__(self, broker, channel):
+        self.broker, self.channel = broker, channel
+
+
+def followers(size, updates):
+    """Wake-ups per session for a burst of `updates` updates, each rerun rendering the room 20 ms later"""
+    hub = AsyncioHub()
+    room = BenchRoom(hub, "bench/followers")
+    wakes = []
+
+    def rerun(follower):
+        follower.rendering()
+        follower.rendered()
+
+    def session():
+        follower = None
+
+        def wake():
+            wakes.append(1)
+            threading.Timer(0.02, rerun, (follower,)).start()
+        follower = Follower(room, wake)
+        return follower
+
+    sessions = [session() for _ in range(size)]
+    time.sleep(0.2)
+    for i in range(updates):
+        hub.publish(room.channel, {"player": i})
+        time.sleep(0.001)
+    time.sleep(0.5)
+    for follower in sessions:
+        follower.close()
+    return len(wakes) / size
+
+
+def wait_for_port(port):
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("broker did not start")
+
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"{updates} updates per room, 1 ms apart")
+    hub = AsyncioHub()
+    for size in ROOMS:
+        report("hub", size, measure(hub, [hub], size, updates))
+
+    broker = subprocess.Popen([sys.executable, str(RACE), "broker", "--port", str(PORT)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(PORT)
+        clients = [BrokerClient("127.0.0.1", PORT) for _ in range(WORKERS)]
+        for size in ROOMS:
+            report("broker", size, measure(clients[0], clients, size, updates))
+    finally:
+        broker.terminate()
+
+    for size in ROOMS:
+        print(f"  followers {size:>4} players: {followers(size, updates):.1f} wake-ups per session for {updates} updates")
+
+
+if __name__ == "__main__":
+    main()
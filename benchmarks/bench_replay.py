@@ -0,0 +1,87 @@
+"""Replay throughput and log size of seeded sessions
+
+Plays sessions of several games each with simulated players on seeded
+engines, writes them as a replay log (seed + choices per session) and an
+answer-event log for comparison, then replays the log with 1 worker and
+with every core and checks that every game comes back with the same
+questions and score.
+
+Usage: python benchmarks/bench_replay.py [sessions]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+from common import synthetic_questions
+from answer_log import AnswerEvent
+from bank_file import write_bank
+from engine import GameEngine
+from replay import Replay, read_replays, replay_all
+from simulate import PlayerModel
+
+GAMES_PER_SESSION = 5
+
+
+def play_sessions(bank, sessions, seed=0):
+    """(replay, [(score, qids) per game]) of each session, and its answer events"""
+    rng = random.Random(seed)
+    player = PlayerModel({1: 0.9, 2: 0.75, 3: 0.6})
+    played, events = [], []
+    for s in range(sessions):
+        engine = GameEngine(bank, clock=lambda: 0.0, seed=rng.getrandbits(63))
+        games = []
+        for g in range(GAMES_PER_SESSION):
+            if g:
+                engine.new_game()
+            qids = [engine.current_qid]
+            while not engine.game_over:
+                selected, response_time = player.answer(engine, rng)
+                engine.answer(selected, response_time)
+                engine.next_question()
+                if not engine.game_over:
+                    qids.append(engine.current_qid)
+            games.append((engine.score, tuple(qids)))
+            events += [AnswerEvent(f"s{s}", **answer, timestamp=0.0) for answer in engine.game_history]
+        played.append((Replay(f"s{s}", engine.seed, list(engine.choices)), games))
+    return played, events
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        bank_path = os.path.join(tmp, "questions.bank")
+        write_bank(bank_path, synthetic_questions(10_000))
+        from bank_file import load_bank
+        bank = load_bank(bank_path)
+
+        start = time.perf_counter()
+        played, events = play_sessions(bank, sessions)
+        games = sessions * GAMES_PER_SESSION
+        print(f"{sessions:,} sessions, {games:,} games, {len(events):,} answers played "
+              f"in {time.perf_counter() - start:.1f} s")
+
+        replay_log = os.path.join(tmp, "replays.jsonl")
+        with open(replay_log, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(asdict(replay), separators=(",", ":")) + "\n" for replay, _ in played)
+        event_bytes = sum(len(json.dumps(asdict(e), separators=(",", ":"))) + 1 for e in events)
+        replay_bytes = os.path.getsize(replay_log)
+        print(f"log size: replays {replay_bytes / len(events):.1f} bytes/answer, "
+              f"answer events {event_bytes / len(events):.1f} bytes/answer")
+
+        replays = read_replays(replay_log)
+        for workers in sorted({1, cores}):
+            start = time.perf_counter()
+            results = replay_all(replays, workers, bank_path, chunk_size=250)
+            elapsed = time.perf_counter() - start
+            for (_, expected), replayed in zip(played, results):
+                assert [(g.score, g.qids) for g in replayed] == expected
+            print(f"  {workers:>2} workers: {games / elapsed:>9,.0f} games/s, every game identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Bytes sent to the browser per rerun, inlined stylesheet vs. static file
+
+Plays a few answers through Streamlit's AppTest with FROG_METRICS=1 and
+collects the per-rerun byte counts logged by instrumentation.py.
+
+Usage: python benchmarks/bench_rerun_bytes.py
+"""
+import logging
+import os
+from pathlib import Path
+
+os.environ["FROG_METRICS"] = "1"
+
+import common  # noqa: F401  (puts the app modules on sys.path)
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+CLICKS = 12
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def emit(self, record):
+        self.sizes.append(record.args[0])
+
+
+def play(static_serving):
+    config.set_option("server.enableStaticServing", static_serving)
+    handler = Collect()
+    logging.getLogger("frog.metrics").addHandler(handler)
+    try:
+        at = AppTest.from_file(APP, default_timeout=30).run()
+        for i in range(CLICKS):
+            options = [b for b in at.button if b.key and b.key.startswith("option_")]
+            if options:
+                options[i % len(options)].click().run()
+            elif any(b.key == "continue" for b in at.button):
+                at.button(key="continue").click().run()
+            else:
+                at.button[0].click().run()
+    finally:
+        logging.getLogger("frog.metrics").removeHandler(handler)
+    return handler.sizes
+
+
+def main():
+    for label, static_serving in (("inline CSS", False), ("static CSS", True)):
+        sizes = play(static_serving)
+        print(f"{label:>10}: {len(sizes)} reruns, {sum(sizes) / len(sizes):,.0f} bytes/rerun on average")
+
+
+if __name__ == "__main__":
+    main()
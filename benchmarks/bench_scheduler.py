@@ -0,0 +1,95 @@
+"""Spaced-repetition scheduler vs. the random accuracy-threshold selector
+
+Learning curve: a simulated learner with exponential forgetting plays
+with each selector. A seen word is recalled with probability
+exp(-turns since last seen / stability). Stability starts at 8 turns,
+grows 2.5x on every successful recall and resets on a miss. Unrecalled
+words are guessed among the 4 options.
+
+Selection cost: average setup_question time on a large bank after a long
+answer history.
+
+Usage: python benchmarks/bench_scheduler.py
+"""
+import math
+import random
+import time
+
+from common import synthetic_questions
+from engine import GameEngine
+from question_bank import QuestionBank
+
+TURNS = 4_000
+WINDOW = 500
+
+
+class Learner:
+    def __init__(self, rng):
+        self.rng = rng
+        self.memory = {}  # qid -> [last turn seen, stability]
+
+    def recall_probability(self, qid, turn):
+        if qid not in self.memory:
+            return 0.0
+        last, stability = self.memory[qid]
+        return math.exp(-(turn - last) / stability)
+
+    def answer(self, engine, turn):
+        qid, q = engine.current_qid, engine.current_question
+        recalled = self.rng.random() < self.recall_probability(qid, turn)
+        selected = q.meaning if recalled else self.rng.choice(engine.options)
+        _, stability = self.memory.get(qid, (turn, 8.0))
+        # The feedback screen always shows the meaning
+        self.memory[qid] = [turn, stability * 2.5 if recalled else 8.0]
+        return selected, 3.0 if recalled else 12.0
+
+
+def learning_curve(bank, spaced_repetition, seed=0):
+    rng = random.Random(seed)
+    engine = GameEngine(bank, rng=rng, clock=lambda: 0.0, spaced_repetition=spaced_repetition)
+    learner = Learner(random.Random(seed + 1))
+    windows, correct = [], 0
+    for turn in range(1, TURNS + 1):
+        selected, response_time = learner.answer(engine, turn)
+        correct += engine.answer(selected, response_time)
+        engine.next_question()
+        if engine.game_over:
+            engine.new_game()
+        if turn % WINDOW == 0:
+            windows.append(correct / WINDOW)
+            correct = 0
+    recall = [learner.recall_probability(qid, TURNS) for qid in learner.memory]
+    return windows, sum(recall) / len(recall), sum(p > 0.9 for p in recall)
+
+
+def selection_cost(bank, spaced_repetition, history=50_000, samples=5_000):
+    engine = GameEngine(bank, rng=random.Random(0), clock=lambda: 0.0, spaced_repetition=spaced_repetition)
+    rng = random.Random(1)
+    for _ in range(history):
+        engine.answer(engine.current_question.meaning if rng.random() < 0.7 else "", 4.0)
+        engine.next_question()
+        if engine.game_over:
+            engine.new_game()
+    start = time.perf_counter()
+    for _ in range(samples):
+        engine.setup_question()
+        engine.answer(engine.current_question.meaning, 4.0)
+    return (time.perf_counter() - start) / samples * 1e6
+
+
+def main():
+    bank = QuestionBank(synthetic_questions(500))
+    print(f"Learning curve, accuracy per {WINDOW} turns on a {len(bank)}-word bank")
+    for label, spaced in (("random", False), ("spaced", True)):
+        windows, mean_recall, mastered = learning_curve(bank, spaced)
+        curve = " ".join(f"{a:.2f}" for a in windows)
+        print(f"  {label:>7}: {curve} | end recall {mean_recall:.2f}, {mastered} words > 90%")
+
+    big = QuestionBank(synthetic_questions(100_000))
+    print(f"\nSelection cost on a {len(big)}-word bank after 50k answers")
+    for label, spaced in (("random", False), ("spaced", True)):
+        print(f"  {label:>7}: {selection_cost(big, spaced):.1f} us per question (incl. answer)")
+
+
+if __name__ == "__main__":
+    main()
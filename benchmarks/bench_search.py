@@ -0,0 +1,91 @@
+"""Build time, memory and query latency of the word search index
+
+Builds a SearchIndex over made-up vocabularies (pronounceable words,
+meanings and examples drawn from a small English lexicon) and times:
+
+- prefix queries of 1 to 4 letters (type-ahead),
+- misspelled words (one letter changed, dropped or doubled),
+- words that only occur in meanings or examples,
+- decoding the first page of the results.
+
+Usage: python benchmarks/bench_search.py [questions]
+"""
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from common import CATEGORIES
+from question_bank import Question, QuestionBank
+from search import SearchIndex
+
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ka", "le", "mi", "no", "pu", "ra", "se", "ti", "vo", "zu",
+             "bra", "cle", "dri", "flo", "gru", "str", "qua", "phe", "tho", "nix", "lor", "mun", "tel"]
+LEXICON = ("quiet bright sudden gentle ancient hidden fierce humble eager hollow narrow vivid brave calm "
+           "river stone light shadow voice storm garden window journey promise silence memory feeling "
+           "move hold carry break gather scatter follow wander shine whisper remember forget").split()
+QUERIES = 300
+
+
+def vocabulary(n, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    for word in sorted(words):
+        meaning = " ".join(rng.choice(LEXICON) for _ in range(rng.randint(2, 5)))
+        example = f"The {rng.choice(LEXICON)} was {word} and {' '.join(rng.choice(LEXICON) for _ in range(4))}."
+        yield Question(word.capitalize(), meaning, ["a", "b", "c"], rng.randint(1, 3), rng.choice(CATEGORIES), example,
+                       word.upper())
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    return rng.choice([word[:i] + rng.choice("aeioustr") + word[i + 1:], word[:i] + word[i + 1:], word[:i] + word[i] + word[i:]])
+
+
+def timed(index, queries):
+    times, hits = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results = index.search(query)
+        results.page(0)
+        times.append(time.perf_counter() - start)
+        hits.append(len(results))
+    times.sort()
+    return statistics.median(times) * 1e3, times[int(len(times) * 0.99)] * 1e3, statistics.median(hits)
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [10_000, 100_000]
+    rng = random.Random(1)
+    for n in sizes:
+        bank = QuestionBank(list(vocabulary(n)))
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = SearchIndex(bank)
+        build = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{n:,} questions: index built in {build:.2f} s, peak {peak / 2**20:.0f} MB while building")
+
+        words = [bank[rng.randrange(n)].word for _ in range(QUERIES)]
+        found = 0
+        for word in words[:100]:
+            query = typo(word, rng)
+            found += any(bank[qid].word == word for qid, _ in index.search(query).page(0))
+        print(f"  misspelled word on the first page: {found}%")
+        for name, queries in [
+            ("prefix, 1 letter", [w[:1] for w in words]),
+            ("prefix, 2 letters", [w[:2] for w in words]),
+            ("prefix, 4 letters", [w[:4] for w in words]),
+            ("misspelled word", [typo(w, rng) for w in words]),
+            ("meaning/example word", [rng.choice(LEXICON) for _ in words]),
+        ]:
+            median, p99, hits = timed(index, queries)
+            print(f"  {name:>22}: median {median:6.2f} ms, p99 {p99:6.2f} ms, {hits:,.0f} results")
+
+
+if __name__ == "__main__":
+    main()
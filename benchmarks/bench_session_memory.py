@@ -0,0 +1,80 @@
+"""Per-session memory: old set/dict session state vs. bitset + counter arrays
+
+Simulates 10k sessions that have each answered 15 questions and measures
+the allocated memory with tracemalloc. Also compares the old dict-backed
+Question dataclass with the slotted one.
+
+Usage: python benchmarks/bench_session_memory.py
+"""
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+from common import synthetic_questions
+from question_bank import AnswerStats, Question, QuestionBank, QuestionPool
+
+SESSIONS = 10_000
+ANSWERS = 15
+
+
+@dataclass
+class LegacyQuestion:
+    word: str
+    meaning: str
+    distractors: List[str]
+    difficulty: int
+    category: str
+    example: str = ""
+    pronunciation: str = ""
+
+
+def legacy_session(bank, rng):
+    used, category_stats = set(), {}
+    difficulty_stats = {1: {'correct': 0, 'total': 0}, 2: {'correct': 0, 'total': 0}, 3: {'correct': 0, 'total': 0}}
+    for _ in range(ANSWERS):
+        qid = rng.randrange(len(bank))
+        q = bank[qid]
+        used.add(qid)
+        difficulty_stats[q.difficulty]['total'] += 1
+        category_stats.setdefault(q.category, {'correct': 0, 'total': 0})['total'] += 1
+    return used, difficulty_stats, category_stats
+
+
+def compact_session(bank, rng):
+    pool = QuestionPool(bank)
+    difficulty_stats = AnswerStats(bank.difficulty_index)
+    category_stats = AnswerStats(bank.category_index)
+    for _ in range(ANSWERS):
+        q = bank[pool.draw([1, 2, 3], rng)]
+        difficulty_stats.add(q.difficulty, total=1)
+        category_stats.add(q.category, total=1)
+    return pool, difficulty_stats, category_stats
+
+
+def measure(build):
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    print(f"{'bank size':>10} {'legacy B/session':>17} {'compact B/session':>18}")
+    for bank_size in (31, 1_000, 10_000):
+        bank = QuestionBank(synthetic_questions(bank_size))
+        rng = random.Random(0)
+        legacy = measure(lambda: [legacy_session(bank, rng) for _ in range(SESSIONS)])
+        compact = measure(lambda: [compact_session(bank, rng) for _ in range(SESSIONS)])
+        print(f"{bank_size:>10} {legacy / SESSIONS:>17.0f} {compact / SESSIONS:>18.0f}")
+
+    fields = [(q.word, q.meaning, q.distractors, q.difficulty, q.category, q.example, q.pronunciation) for q in synthetic_questions(100_000)]
+    legacy = measure(lambda: [LegacyQuestion(*f) for f in fields])
+    slotted = measure(lambda: [Question(*f) for f in fields])
+    print(f"\nQuestion object overhead: dataclass {legacy / len(fields):.0f} B, slotted {slotted / len(fields):.0f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-rerun persistence latency of the session stores under concurrency
+
+Each thread plays one session: every "rerun" answers a question, takes a
+state snapshot and saves it, like save_game() in app.py.
+
+Usage: python benchmarks/bench_session_store.py
+"""
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from common import synthetic_questions
+from engine import GameEngine
+from question_bank import QuestionBank
+from session_store import open_session_store
+
+RERUNS = 200
+
+
+def run_session(store, bank, key, latencies):
+    rng = random.Random(key)
+    engine = GameEngine(bank, rng=rng)
+    for _ in range(RERUNS):
+        if engine.game_over:
+            engine.new_game()
+        engine.answer(engine.current_question.meaning if rng.random() < 0.8 else "", 3.0)
+        engine.next_question()
+        start = time.perf_counter()
+        store.save(key, engine.to_state())
+        latencies.append(time.perf_counter() - start)
+
+
+def measure(store, bank, sessions):
+    latencies = []
+    threads = [threading.Thread(target=run_session, args=(store, bank, f"session-{i}", latencies)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return statistics.median(latencies) * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3
+
+
+def main():
+    bank = QuestionBank(synthetic_questions(10_000))
+    print(f"{'store':>8} {'sessions':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for url in ("memory", f"sqlite:///{os.path.join(tmp, 'games.db')}"):
+            store = open_session_store(url)
+            for sessions in (1, 8, 32):
+                p50, p99 = measure(store, bank, sessions)
+                print(f"{url.split(':')[0]:>8} {sessions:>9} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
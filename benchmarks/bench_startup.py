@@ -0,0 +1,77 @@
+"""Startup and rerun cost of app.py
+
+- imports: `python -X importtime app.py` (bare mode) in a fresh process,
+  summed per top-level module; Streamlit itself is reported separately,
+- first run: the first AppTest run in a fresh process, which pays for the
+  imports and every cached loader,
+- rerun: later reruns of the same session, which should only pay for the
+  script itself.
+
+--baseline rewrites benchmarks/importtime_baseline.txt with the raw
+importtime output, to diff against after changing imports.
+
+Usage: python benchmarks/bench_startup.py [--baseline]
+"""
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+BASELINE = Path(__file__).resolve().parent / "importtime_baseline.txt"
+RERUNS = 30
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime():
+    """(module, cumulative us) of every top-level import, and the raw output"""
+    result = subprocess.run([sys.executable, "-X", "importtime", str(APP)], cwd=ROOT, capture_output=True, text=True)
+    lines = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+    modules = []
+    for line in lines:
+        match = LINE.match(line)
+        if match and len(match[3]) == 1:
+            modules.append((match[4], int(match[2])))
+    return modules, "\n".join(lines) + "\n"
+
+
+def app_timings():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=30)
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    reruns = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - start)
+    print(f"first run {first * 1e3:.1f} ms, rerun median {statistics.median(reruns) * 1e3:.1f} ms")
+
+
+def main():
+    if sys.argv[1:] == ["--child"]:
+        app_timings()
+        return
+
+    modules, raw = importtime()
+    streamlit_us = sum(us for name, us in modules if name.split(".")[0] == "streamlit")
+    own = sorted(((us, name) for name, us in modules if (ROOT / f"{name}.py").exists()), reverse=True)
+    print(f"imports: streamlit {streamlit_us / 1e3:.1f} ms, app modules {sum(us for us, _ in own) / 1e3:.1f} ms")
+    for us, name in own:
+        print(f"  {name:>16} {us / 1e3:6.2f} ms")
+    if sys.argv[1:] == ["--baseline"]:
+        BASELINE.write_text(raw)
+        print(f"wrote {BASELINE.name}")
+
+    # AppTest in a fresh process, so nothing is imported or cached yet
+    child = subprocess.run([sys.executable, __file__, "--child"], capture_output=True, text=True)
+    print(child.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
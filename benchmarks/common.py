@@ -0,0 +1,52 @@
+"""Shared helpers for the benchmark scripts"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Benchmarks run as plain scripts, so make the app modules importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from question_bank import Question
+
+CATEGORIES = ["Emotions", "Speed", "Light", "Size", "Sound", "Time", "Nature", "Behavior", "Clarity", "Knowledge"]
+
+
+def iter_synthetic_questions(n, seed=0):
+    """Yield `n` distinct made-up questions spread over all difficulties"""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield Question(
+            f"Word{i}",
+            f"Meaning of word {i}",
+            [f"Wrong {i}a", f"Wrong {i}b", f"Wrong {i}c"],
+            rng.randint(1, 3),
+            rng.choice(CATEGORIES),
+            f"An example using word {i}.",
+            f"WERD-{i}",
+        )
+
+
+def synthetic_questions(n, seed=0):
+    return list(iter_synthetic_questions(n, seed))
+
+
+def rss_mb(field="VmRSS"):
+    """Resident memory of this process in MB from /proc/self/status (Linux)
+
+    Use field="RssAnon" for private memory and "RssFile" for shared,
+    file-backed pages such as a memory-mapped bank.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def per_call_us(fn, repeat):
+    """Average wall time of `fn()` in microseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
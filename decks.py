@@ -0,0 +1,153 @@
+"""Named question decks, loaded on first use and shared by all sessions
+
+A deck is a bank file <name>.bank in the decks directory (FROG_DECKS_DIR),
+e.g. one per language, exam or curriculum; the built-in vocabulary is the
+"default" deck. DeckCache keeps the most recently used decks loaded for
+every session of the process and evicts the least recently used one when
+it is full. A deck evicted while games still use it stays alive through
+those games and is taken back into the cache, not loaded a second time.
+
+A deck's word search index is built by a background thread the first
+time someone studies the deck, once for all its sessions.
+"""
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
+
+from question_bank import QuestionBank
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECK = "default"
+DECK_SUFFIX = ".bank"
+
+
+class Deck:
+    def __init__(self, name: str, bank: QuestionBank):
+        self.name = name
+        self.bank = bank
+        self._search = None
+        self._search_ready = threading.Event()
+        self._search_thread = None
+        self._search_lock = threading.Lock()
+
+    @property
+    def difficulties(self) -> List[int]:
+        return list(self.bank.difficulty_index)
+
+    @cached_property
+    def distractors(self):
+        """Generated wrong options (a DistractorEngine), built the first time a game asks for them"""
+        from distractors import DistractorEngine
+        return DistractorEngine(self.bank)
+
+    def build_search_index(self):
+        """Start building the word search index in a background thread, once"""
+        with self._search_lock:
+            if self._search_thread is None:
+                self._search_thread = threading.Thread(target=self._build_search_index, name=f"search-index-{self.name}",
+                                                       daemon=True)
+                self._search_thread.start()
+
+    def _build_search_index(self):
+        try:
+            from search import SearchIndex
+            self._search = SearchIndex(self.bank)
+        except Exception:
+            logger.exception("Cannot build the search index of deck %s", self.name)
+        finally:
+            self._search_ready.set()
+
+    @property
+    def search_ready(self) -> bool:
+        return self._search_ready.is_set()
+
+    def search_index(self, timeout: Optional[float] = None):
+        """Word search index (a SearchIndex), waiting up to `timeout` for its build
+
+        Starts the build if nobody studied the deck yet. None if the index
+        is not ready in time or could not be built.
+        """
+        self.build_search_index()
+        self._search_ready.wait(timeout)
+        return self._search
+
+
+def deck_names(directory: str) -> List[str]:
+    """The default deck followed by the decks in `directory`, sorted by name"""
+    names = []
+    if directory and os.path.isdir(directory):
+        names = sorted(f[:-len(DECK_SUFFIX)] for f in os.listdir(directory) if f.endswith(DECK_SUFFIX))
+    return [DEFAULT_DECK] + [name for name in names if name != DEFAULT_DECK]
+
+
+def load_deck(name: str, directory: str) -> Deck:
+    """Open <directory>/<name>.bank, or raise ValueError for an unknown deck"""
+    if not directory or os.path.basename(name) != name or name.startswith("."):
+        raise ValueError(f"Unknown deck: {name}")
+    path = os.path.join(directory, name + DECK_SUFFIX)
+    if not os.path.isfile(path):
+        raise ValueError(f"Unknown deck: {name}")
+    from bank_file import load_bank
+    return Deck(name, load_bank(path))
+
+
+class DeckCache:
+    """Process-wide LRU cache of loaded decks
+
+    `loader(name)` loads a deck on a miss. A deck is loaded by one thread
+    at a time while other decks stay available to everyone else.
+    """
+
+    def __init__(self, loader: Callable[[str], Deck], capacity: int = 32):
+        self.loader = loader
+        self.capacity = capacity
+        self.hits = self.loads = self.revived = 0
+        self._lru: "OrderedDict[str, Deck]" = OrderedDict()
+        # Every loaded deck still referenced by a game, cached or not
+        self._alive: "weakref.WeakValueDictionary[str, Deck]" = weakref.WeakValueDictionary()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def _insert(self, name: str, deck: Deck):
+        self._lru[name] = deck
+        self._alive[name] = deck
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, name: str):
+        deck = self._lru.get(name)
+        if deck is not None:
+            self._lru.move_to_end(name)
+            self.hits += 1
+            return deck
+        deck = self._alive.get(name)
+        if deck is not None:
+            self._insert(name, deck)
+            self.revived += 1
+        return deck
+
+    def get(self, name: str) -> Deck:
+        with self._lock:
+            deck = self._lookup(name)
+            if deck is not None:
+                return deck
+            loading = self._loading.setdefault(name, threading.Lock())
+        with loading:
+            with self._lock:
+                deck = self._lookup(name)
+            if deck is None:
+                deck = self.loader(name)
+                with self._lock:
+                    self._insert(name, deck)
+                    self.loads += 1
+            with self._lock:
+                self._loading.pop(name, None)
+        return deck
@@ -0,0 +1,58 @@
+"""Generated answer options from other words' meanings
+
+Instead of the hand-authored distractors of a Question, wrong options are
+meanings of other words from the same difficulty and category, which are
+the most plausible mix-ups. Because the bank is sorted by (difficulty,
+category) each candidate pool is just an ID range, computed once per bank.
+Each question has a fixed number of option-set variants that are generated
+deterministically and kept in an LRU cache, so building options is O(1)
+and repeated questions still vary.
+"""
+import random
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from question_bank import QuestionBank
+
+VARIANTS = 8
+
+
+class DistractorEngine:
+    def __init__(self, bank: QuestionBank, count: int = 3, cache_size: int = 65_536):
+        self.bank = bank
+        self.count = count
+        everything = range(len(bank))
+        # (difficulty, category) -> candidate ranges, narrowest first; a range
+        # is only used if it holds enough other words
+        self.pools: Dict[Tuple[int, str], Tuple[range, ...]] = {}
+        for (difficulty, category), (start, end) in bank.category_ranges.items():
+            ranges = [range(start, end), bank.ids(difficulty), everything]
+            self.pools[(difficulty, category)] = tuple(r for r in ranges if len(r) > count) or (everything,)
+        self._variant = lru_cache(maxsize=cache_size)(self._generate)
+
+    def distractors(self, qid: int, rng=random) -> List[str]:
+        """Wrong options for a question, from one of its cached variants"""
+        return list(self._variant(qid, rng.randrange(VARIANTS)))
+
+    def _generate(self, qid: int, variant: int) -> Tuple[str, ...]:
+        question = self.bank[qid]
+        rng = random.Random(qid * VARIANTS + variant)
+        chosen = []
+        for pool in self.pools[(question.difficulty, question.category)]:
+            for _ in range(self.count * 4):
+                other = pool[rng.randrange(len(pool))]
+                meaning = self.bank[other].meaning
+                if other != qid and meaning != question.meaning and meaning not in chosen:
+                    chosen.append(meaning)
+                    if len(chosen) == self.count:
+                        return tuple(chosen)
+        # Tiny banks: fall back to the authored distractors
+        for meaning in question.distractors:
+            if len(chosen) == self.count:
+                break
+            if meaning not in chosen:
+                chosen.append(meaning)
+        return tuple(chosen)
+
+    def cache_info(self):
+        return self._variant.cache_info()
@@ -0,0 +1,325 @@
+"""Headless game engine: scoring, adaptive difficulty and lives
+
+GameEngine holds the whole state of one game and has no Streamlit
+dependency, so app.py is a thin view over it and simulate.py can play
+games in bulk.
+"""
+import copy
+import random
+import secrets
+import time
+from typing import List, Sequence, Tuple
+
+from question_bank import AnswerStats, Question, QuestionBank, QuestionPool
+from scheduler import ReviewScheduler
+
+START_LIVES = 3
+VICTORY_LEVEL = 10
+
+
+def preferred_difficulties(correct_answers: int, total_attempts: int, levels: Sequence[int] = (1, 2, 3)) -> List[int]:
+    """Smart difficulty selection based on performance
+
+    `levels` are the sorted difficulties of the deck: the hardest one above
+    80% accuracy, the upper half above 60%, otherwise the lower half.
+    """
+    overall_accuracy = correct_answers / max(total_attempts, 1)
+    levels = list(levels)
+
+    if overall_accuracy > 0.8:
+        return levels[-1:]
+    elif overall_accuracy > 0.6:
+        return levels[len(levels) // 2:]
+    else:
+        return levels[:max(1, (len(levels) + 1) // 2)]
+
+
+def score_answer(difficulty: int, response_time: float, streak: int) -> Tuple[int, int, int, int]:
+    """(base, time_bonus, streak_bonus, total) points for a correct answer
+
+    `streak` already includes this answer.
+    """
+    base = difficulty * 10
+    time_bonus = max(0, int(base * 0.5 * (1 - min(response_time / 15, 1))))
+    streak_bonus = min(streak * 3, 30)
+    difficulty_multiplier = 1 + (difficulty - 1) * 0.5
+
+    total = int((base + time_bonus + streak_bonus) * difficulty_multiplier)
+    return base, time_bonus, streak_bonus, total
+
+
+def streak_message(streak: int) -> str:
+    if streak >= 7:
+        return f"🔥🔥🔥 LEGENDARY! {streak} in a row!"
+    elif streak >= 5:
+        return f"🔥🔥 ON FIRE! {streak} correct!"
+    elif streak >= 3:
+        return f"🔥 Hot streak! {streak} in a row"
+    else:
+        return f"Great! Keep going! {streak} in a row"
+
+
+class GameEngine:
+    """State and rules of a player's games
+
+    With `spaced_repetition` (the default) a ReviewScheduler remembers every
+    word the player has answered across games and brings due words back;
+    unseen words are drawn at a difficulty matching the player's accuracy.
+    Without it every game draws random unused words, as the game used to.
+
+    Wrong options come from `distractors` (a DistractorEngine) when given,
+    otherwise from each question's authored distractors.
+
+    With `prefetch` (the default) answer() already picks the next question
+    and its options, so next_question() only swaps them in. The pick is the
+    one next_question() would make: the accuracy, due turns and used words
+    it depends on do not change between an answer and the next question.
+
+    Question selection and option shuffling are driven by `rng` when given
+    (e.g. one generator shared by a batch of simulated games). Otherwise
+    the engine is seeded: every draw gets its own generator derived from
+    `seed` (a random one by default) and the number of draws so far, and
+    every answer is recorded in `choices` as (option index, response
+    time). The seed and the choices are all replay.py needs to rebuild the
+    games, and a saved game only carries two numbers of RNG state. Once
+    the choices are logged, drop_choices forgets them; `choices_start` is
+    the number of answers before the first one still kept.
+    `clock` measures response times.
+    """
+
+    def __init__(self, bank: QuestionBank, rng=None, clock=time.time, spaced_repetition=True, distractors=None,
+                 prefetch=True, seed: int = None):
+        self.bank = bank
+        self.rng = rng
+        self.seed = None if rng is not None else seed if seed is not None else secrets.randbits(63)
+        self.draws = 0
+        self.choices: List[Tuple[int, float]] = []
+        self.choices_start = 0
+        self.clock = clock
+        self.distractors = distractors
+        self.prefetch = prefetch
+        # (qid, options) of the next question, picked while feedback is shown
+        self.upcoming = None
+        self.question_pool = QuestionPool(bank)
+        self.scheduler = ReviewScheduler() if spaced_repetition else None
+        self.new_game()
+
+    def new_game(self):
+        """Initialize comprehensive game state"""
+        self.level = 1
+        self.lives = START_LIVES
+        self.score = 0
+        self.streak = 0
+        self.best_streak = 0
+        self.total_attempts = 0
+        self.correct_answers = 0
+        if self.scheduler is None:
+            self.question_pool.reset()
+            self.upcoming = None
+        self.game_over = False
+        self.victory = False
+        self.results_submitted = False
+        self.feedback = None
+        self.game_history = []
+        self.category_stats = AnswerStats(self.bank.category_index)
+        self.difficulty_stats = AnswerStats(self.bank.difficulty_index)
+        self.start_time = self.clock()
+        self.setup_question()
+
+    def setup_question(self):
+        """Show the next question, prepared in advance if it was prefetched"""
+        qid, options = self.upcoming if self.upcoming is not None else self.choose_question()
+        self.upcoming = None
+        self.current_qid = qid
+        self.current_question: Question = self.bank[qid]
+        self.options: List[str] = options
+        self.question_start_time = self.clock()
+
+    def drop_choices(self, end: int):
+        """Forget the choices of the answers before number `end`, e.g. once they are logged"""
+        drop = end - self.choices_start
+        if drop > 0:
+            del self.choices[:drop]
+            self.choices_start = end
+
+    def draw_rng(self):
+        """Generator for the next draw: the shared `rng`, or a fresh one derived from the seed"""
+        if self.seed is None:
+            return self.rng
+        self.draws += 1
+        return random.Random(self.seed << 32 | self.draws)
+
+    def choose_question(self) -> Tuple[int, List[str]]:
+        """Pick a question and shuffle its options: due reviews first, then unseen words by skill"""
+        rng = self.draw_rng()
+        qid = None
+        if self.scheduler is not None:
+            qid = self.scheduler.pop_due()
+            if qid is None and not self.question_pool.available():
+                qid = self.scheduler.pop_next()
+        if qid is None:
+            preferred = preferred_difficulties(self.correct_answers, self.total_attempts, self.bank.difficulty_index)
+            qid = self.question_pool.draw(preferred, rng)
+        question = self.bank[qid]
+
+        # Shuffle options
+        if self.distractors is not None:
+            options = [question.meaning] + self.distractors.distractors(qid, rng)
+        else:
+            options = [question.meaning] + question.distractors
+        rng.shuffle(options)
+        return qid, options
+
+    def answer(self, selected: str, response_time: float = None) -> bool:
+        """Process answer with comprehensive feedback
+
+        `response_time` defaults to the time since the question was set up.
+        Returns whether the answer was correct.
+        """
+        q = self.current_question
+        is_correct = (selected == q.meaning)
+        if response_time is None:
+            response_time = self.clock() - self.question_start_time
+        if self.seed is not None:
+            self.choices.append((self.options.index(selected) if selected in self.options else -1, response_time))
+
+        self.total_attempts += 1
+        self.difficulty_stats.add(q.difficulty, total=1)
+
+        if is_correct:
+            self.correct_answers += 1
+            self.difficulty_stats.add(q.difficulty, correct=1)
+            self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+
+            # Enhanced scoring
+            base, time_bonus, streak_bonus, total = score_answer(q.difficulty, response_time, self.streak)
+            self.score += total
+            self.level += 1
+
+            # Category stats
+            self.category_stats.add(q.category, correct=1, total=1)
+
+            self.feedback = {
+                'type': 'correct',
+                'message': "✅ Perfect!",
+                'definition': f"'{q.word}' = {q.meaning}",
+                'example': f"Example: {q.example}",
+                'category': f"📚 {q.category}",
+                'bonus': f"+{total} points | {streak_message(self.streak)}",
+                'breakdown': f"Base: {base} | Speed: {time_bonus} | Streak: {streak_bonus}"
+            }
+
+            if self.level > VICTORY_LEVEL:
+                self.victory = True
+                self.game_over = True
+        else:
+            total = 0
+            self.lives -= 1
+            self.difficulty_stats.add(q.difficulty, total=1)
+            self.streak = 0
+
+            # Category stats
+            self.category_stats.add(q.category, total=1)
+
+            self.feedback = {
+                'type': 'wrong',
+                'message': "❌ Oops!",
+                'definition': f"'{q.word}' = {q.meaning}",
+                'example': f"Example: {q.example}",
+                'category': f"📚 {q.category}",
+                'bonus': f"You selected: {selected}",
+                'breakdown': ""
+            }
+
+            if self.lives <= 0:
+                self.game_over = True
+
+        if self.scheduler is not None:
+            self.scheduler.review(self.current_qid, is_correct, response_time)
+
+        self.game_history.append({
+            'word': q.word,
+            'difficulty': q.difficulty,
+            'category': q.category,
+            'correct': is_correct,
+            'response_time': response_time,
+            'points': total,
+        })
+        if self.prefetch and not self.game_over and self.upcoming is None:
+            self.upcoming = self.choose_question()
+        return is_correct
+
+    def likely_next(self, n: int = 3) -> List[Question]:
+        """Questions the next draws will probably ask: the prefetched one, then the earliest due reviews"""
+        likely = [self.bank[self.upcoming[0]]] if self.upcoming is not None else []
+        if self.scheduler is not None:
+            likely += [self.bank[qid] for qid in self.scheduler.upcoming(n - len(likely))]
+        return likely
+
+    def next_question(self):
+        """Dismiss the feedback and move on to the next question"""
+        self.feedback = None
+        if not self.game_over:
+            self.setup_question()
+
+    # Plain game state, restored by from_state against the same bank
+    STATE_FIELDS = ("level", "lives", "score", "streak", "best_streak", "total_attempts", "correct_answers",
+                    "game_over", "victory", "results_submitted", "feedback", "game_history", "start_time", "current_qid",
+                    "question_start_time", "options")
+
+    def to_state(self) -> dict:
+        """JSON-serializable snapshot of the game"""
+        state = copy.deepcopy({name: getattr(self, name) for name in self.STATE_FIELDS})
+        state["bank_size"] = len(self.bank)
+        state["bank"] = self.bank.fingerprint
+        state["seed"], state["draws"] = self.seed, self.draws
+        state["choices"] = [list(choice) for choice in self.choices]
+        state["choices_start"] = self.choices_start
+        state["upcoming"] = [self.upcoming[0], list(self.upcoming[1])] if self.upcoming is not None else None
+        state["question_pool"] = self.question_pool.to_state()
+        state["scheduler"] = self.scheduler.to_state() if self.scheduler is not None else None
+        state["category_stats"] = self.category_stats.to_state()
+        state["difficulty_stats"] = self.difficulty_stats.to_state()
+        return state
+
+    @classmethod
+    def from_state(cls, bank: QuestionBank, state: dict, rng=None, clock=time.time, distractors=None,
+                   prefetch=True) -> "GameEngine":
+        """Rebuild a game saved with to_state, or raise ValueError if it was saved against another bank
+
+        A seeded game stays seeded unless an `rng` is given.
+        """
+        if state.get("bank_size") != len(bank) or state.get("bank") != bank.fingerprint:
+            raise ValueError("saved game does not match the question bank")
+        engine = cls.__new__(cls)
+        engine.bank, engine.rng, engine.clock, engine.distractors = bank, rng, clock, distractors
+        # Games saved before seeding was added go on with the global generator
+        engine.seed = state.get("seed") if rng is None else None
+        if rng is None and engine.seed is None:
+            engine.rng = random
+        engine.draws = state.get("draws", 0)
+        engine.choices = [tuple(choice) for choice in state.get("choices", ())] if engine.seed is not None else []
+        engine.choices_start = state.get("choices_start", 0) if engine.seed is not None else 0
+        engine.prefetch = prefetch
+        upcoming = state.get("upcoming")
+        engine.upcoming = (upcoming[0], upcoming[1]) if upcoming is not None else None
+        for name in cls.STATE_FIELDS:
+            setattr(engine, name, state[name])
+        engine.current_question = bank[engine.current_qid]
+        engine.question_pool = QuestionPool(bank)
+        engine.question_pool.load_state(state["question_pool"])
+        engine.scheduler = None
+        if state.get("scheduler") is not None:
+            engine.scheduler = ReviewScheduler()
+            engine.scheduler.load_state(state["scheduler"])
+        engine.category_stats = AnswerStats(bank.category_index)
+        engine.category_stats.load_state(state["category_stats"])
+        engine.difficulty_stats = AnswerStats(bank.difficulty_index)
+        engine.difficulty_stats.load_state(state["difficulty_stats"])
+        return engine
+
+    @property
+    def accuracy(self) -> float:
+        """Overall accuracy in percent"""
+        return (self.correct_answers / self.total_attempts * 100) if self.total_attempts > 0 else 0
@@ -0,0 +1,120 @@
+"""HTML fragments of the game screens, precompiled and cached across sessions
+
+A Template is parsed once into its literal text and field names, and
+rendering only joins the literals with the HTML-escaped field values,
+given in field order. A field written {name:html} takes markup that is
+already escaped, e.g. an optional part rendered from another template.
+
+FragmentCache memoizes rendered fragments by template and field values
+in a bounded LRU shared by every session of the process. Every player who
+gets a word sees the same question box, and on a small deck most
+feedback boxes repeat too, so most reruns only look a fragment up.
+"""
+import html
+import threading
+from collections import OrderedDict
+from string import Formatter
+from typing import Tuple
+
+
+class Template:
+    def __init__(self, source: str):
+        parts = list(Formatter().parse(source))
+        self._literals = [literal for literal, _, _, _ in parts]
+        self.fields: Tuple[str, ...] = tuple(field for _, field, _, _ in parts if field is not None)
+        self._escaped = tuple(spec != "html" for _, field, spec, _ in parts if field is not None)
+        if len(self.fields) == len(self._literals):
+            self._literals.append("")
+
+    def render(self, *values) -> str:
+        out = [self._literals[0]]
+        for value, escape, literal in zip(values, self._escaped, self._literals[1:]):
+            out.append(html.escape(str(value)) if escape else value)
+            out.append(literal)
+        return "".join(out)
+
+
+QUESTION = Template("""
+        <div class="question-box">
+            <div class="question-word">{word}</div>
+            <div class="pronunciation">/{pronunciation}/</div>
+            <div class="question-prompt">Choose the correct meaning:</div>
+            <div class="difficulty-stars">{stars}</div>
+            <div style="color: #ecf0f1; font-size: 14px;">Category: {category}</div>
+        </div>
+        """)
+
+FEEDBACK = Template("""
+        <div class="feedback-box feedback-{type}">
+            <div class="feedback-title">{message}</div>
+            <div class="feedback-definition">{definition}</div>
+            <div class="feedback-example">"{example}"</div>
+            <div class="feedback-category">{category}</div>
+            <div class="feedback-bonus">{bonus}</div>{breakdown:html}
+        </div>
+        """)
+
+# Score breakdown of a right answer, wrong answers have none
+BREAKDOWN = Template("""<div class="feedback-breakdown">{breakdown}</div>""")
+
+STUDY_CARD = Template("""
+        <div class="study-card">
+            <span class="study-word">{word}</span>
+            <span class="study-meta">/{pronunciation}/ · {stars} · {category}</span>
+            <div class="study-meaning">{meaning}</div>
+            <div class="study-example">{example}</div>
+        </div>
+        """)
+
+
+class FragmentCache:
+    """Process-wide LRU of rendered fragments, keyed by template and field values
+
+    The values are passed in the template's field order and must be hashable.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.hits = self.misses = 0
+        self._fragments: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def render(self, template: Template, *values) -> str:
+        key = (template, *values)
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        fragment = template.render(*values)
+        with self._lock:
+            self._fragments[key] = fragment
+            if len(self._fragments) > self.capacity:
+                self._fragments.popitem(last=False)
+        return fragment
+
+
+def question_html(cache: FragmentCache, q) -> str:
+    """Question box of a question"""
+    return cache.render(QUESTION, q.word, q.pronunciation, "⭐" * q.difficulty, q.category)
+
+
+def feedback_html(cache: FragmentCache, feedback: dict) -> str:
+    """Feedback box of an answer, from GameEngine.feedback"""
+    breakdown = BREAKDOWN.render(feedback["breakdown"]) if feedback["breakdown"] else ""
+    return cache.render(FEEDBACK, feedback["type"], feedback["message"], feedback["definition"], feedback["example"],
+                        feedback["category"], feedback["bonus"], breakdown)
+
+
+def study_html(cache: FragmentCache, q) -> str:
+    """Card of a question in study mode"""
+    return cache.render(STUDY_CARD, q.word, q.pronunciation, "⭐" * q.difficulty, q.category, q.meaning, q.example)
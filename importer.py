@@ -0,0 +1,260 @@
+"""Bulk import of vocabulary files into a question bank file
+
+Input files are CSV with a header row or JSON Lines (.jsonl, .ndjson,
+.json), with the fields
+
+    word, meaning, distractors, difficulty, category, example, pronunciation
+
+where `distractors` is a JSON list or, in CSV, a "|"-separated string.
+Every row is normalized (Unicode NFC, surrounding and repeated whitespace
+removed, repeated distractors dropped) and validated:
+
+- word, meaning, category and pronunciation are present,
+- difficulty is a whole number among --levels (1, 2, 3 by default),
+- there are at least --min-distractors distractors, none equal to the
+  meaning,
+- no field holds the bank file's separator characters,
+- the word is new: a hash index of case-folded words keeps the first row
+  of every word and rejects the rest.
+
+Rows are read in chunks that a process pool validates and encodes, with
+a bounded number of chunks in flight; valid records stream into a
+BankWriter, rejected rows into a JSON Lines report with their file and
+row number (data rows count from 1, the CSV header aside). Memory stays bounded
+by the chunk size plus the hash index and about 20 bytes per imported row.
+
+Usage: python importer.py words.csv [more.jsonl ...] -o vocabulary.bank --errors rejected.jsonl --workers 8
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import time
+import unicodedata
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bank_file import DISTRACTOR_SEP, FIELD_SEP, BankWriter, encode_question
+from question_bank import Question
+
+LEVELS = (1, 2, 3)
+MIN_DISTRACTORS = 3
+CHUNK_ROWS = 20_000
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+def clean(value) -> str:
+    """NFC text with surrounding and repeated whitespace removed"""
+    text = " ".join(str(value if value is not None else "").split())
+    if FIELD_SEP in text or DISTRACTOR_SEP in text:
+        raise InvalidRow("control character in a field")
+    return unicodedata.normalize("NFC", text)
+
+
+def word_key(word: str) -> int:
+    """64-bit hash of the case-folded word, the deduplication key"""
+    return int.from_bytes(hashlib.blake2b(word.casefold().encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def normalize(row: Dict, levels: Sequence[int] = LEVELS, min_distractors: int = MIN_DISTRACTORS) -> Question:
+    """Question from a raw row, or raise InvalidRow"""
+    word, meaning, category = clean(row.get("word")), clean(row.get("meaning")), clean(row.get("category"))
+    pronunciation = clean(row.get("pronunciation"))
+    for name, value in (("word", word), ("meaning", meaning), ("category", category), ("pronunciation", pronunciation)):
+        if not value:
+            raise InvalidRow(f"missing {name}")
+
+    raw_difficulty = row.get("difficulty")
+    try:
+        difficulty = float(raw_difficulty)
+    except (TypeError, ValueError):
+        raise InvalidRow("difficulty is not a number") from None
+    if not math.isfinite(difficulty):
+        raise InvalidRow("difficulty is not a number")
+    if difficulty != int(difficulty) or int(difficulty) not in levels:
+        raise InvalidRow("difficulty out of range")
+
+    raw = row.get("distractors") or []
+    if isinstance(raw, str):
+        raw = raw.split("|")
+    elif not isinstance(raw, list):
+        raise InvalidRow("distractors are not a list")
+    distractors, seen = [], {meaning.casefold()}
+    for value in raw:
+        value = clean(value)
+        if value.casefold() == meaning.casefold():
+            raise InvalidRow("distractor equals the meaning")
+        if value and value.casefold() not in seen:
+            seen.add(value.casefold())
+            distractors.append(value)
+    if len(distractors) < min_distractors:
+        raise InvalidRow("too few distractors")
+
+    return Question(word, meaning, distractors, int(difficulty), category, clean(row.get("example")), pronunciation)
+
+
+def parse_rows(fmt: str, header: Optional[List[str]], text: str) -> Iterator[Tuple[Optional[Dict], str]]:
+    """(row dict or None if unparsable, raw text) for each row of a chunk"""
+    if fmt == "csv":
+        # Report the source lines of a row, a quoted field may span several
+        lines = io.StringIO(text).readlines()
+        reader, start = csv.reader(lines), 0
+        for values in reader:
+            raw, start = "".join(lines[start:reader.line_num]).rstrip("\r\n"), reader.line_num
+            if not values or values == [""]:
+                continue
+            if len(values) != len(header):
+                yield None, raw
+            else:
+                yield dict(zip(header, values)), raw
+    else:
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else None, line
+
+
+def validate_chunk(fmt: str, header: Optional[List[str]], text: str, levels: Sequence[int], min_distractors: int):
+    """Valid rows as (row number in chunk, word key, difficulty, category, record), rejected ones and the row count"""
+    valid, rejected, number = [], [], -1
+    for number, (row, raw) in enumerate(parse_rows(fmt, header, text)):
+        try:
+            if row is None:
+                raise InvalidRow("unparsable row")
+            q = normalize(row, levels, min_distractors)
+        except InvalidRow as error:
+            rejected.append((number, str(error), raw))
+            continue
+        valid.append((number, word_key(q.word), q.difficulty, q.category, encode_question(q)))
+    return valid, rejected, number + 1
+
+
+def read_chunks(path: str, rows: int = CHUNK_ROWS) -> Iterator[Tuple[str, Optional[List[str]], str]]:
+    """(format, CSV header, text) chunks of about `rows` lines
+
+    A CSV chunk only ends where the number of quote characters read so far
+    is even, so quoted fields with line breaks are never cut.
+    """
+    fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header = None
+        if fmt == "csv":
+            header = [clean(name).lower() for name in next(csv.reader([f.readline()]), [])]
+            missing = [name for name in ("word", "meaning", "difficulty", "category") if name not in header]
+            if missing:
+                raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+        lines, quotes = [], 0
+        for line in f:
+            lines.append(line)
+            if fmt == "csv":
+                quotes += line.count('"')
+            if len(lines) >= rows and quotes % 2 == 0:
+                yield fmt, header, "".join(lines)
+                lines = []
+        if lines:
+            yield fmt, header, "".join(lines)
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    errors: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+
+    @property
+    def rejected(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def import_files(paths: Sequence[str], output: str, errors: Optional[str] = None, workers: int = None,
+                 levels: Sequence[int] = LEVELS, min_distractors: int = MIN_DISTRACTORS) -> ImportReport:
+    """Validate, deduplicate and write the rows of `paths` to the bank file `output`"""
+    workers = workers or os.cpu_count() or 1
+    report = ImportReport()
+    seen = set()
+    start = time.perf_counter()
+    error_file = open(errors, "w", encoding="utf-8") if errors else None
+
+    rows_before = Counter()
+
+    def collect(path, future):
+        valid, rejected, count = future.result()
+        first_row = rows_before[path] + 1
+        rows_before[path] += count
+        for number, error, raw in rejected:
+            report.errors[error] += 1
+            if error_file:
+                error_file.write(json.dumps({"file": path, "row": first_row + number, "error": error, "data": raw},
+                                            ensure_ascii=False) + "\n")
+        for number, key, difficulty, category, record in valid:
+            if key in seen:
+                report.errors["duplicate word"] += 1
+                report.duplicates += 1
+                if error_file:
+                    error_file.write(json.dumps({"file": path, "row": first_row + number, "error": "duplicate word",
+                                                 "data": record.split(FIELD_SEP.encode())[0].decode("utf-8")},
+                                                ensure_ascii=False) + "\n")
+                continue
+            seen.add(key)
+            writer.add_record(difficulty, category, record)
+            report.imported += 1
+
+    try:
+        with BankWriter(output) as writer, ProcessPoolExecutor(workers) as pool:
+            # Chunks are submitted in order and collected in order, so the
+            # first row of a word always wins, with a bounded number in flight
+            pending = deque()
+            for path in paths:
+                for fmt, header, text in read_chunks(path):
+                    pending.append((path, pool.submit(validate_chunk, fmt, header, text, levels, min_distractors)))
+                    while len(pending) > workers * 2:
+                        collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+    finally:
+        if error_file:
+            error_file.close()
+
+    report.rows = report.imported + report.rejected
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="CSV or JSON Lines vocabulary files")
+    parser.add_argument("-o", "--output", default="questions.bank", help="bank file to write")
+    parser.add_argument("--errors", help="write rejected rows to this JSON Lines file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--levels", default="1,2,3", help="allowed difficulty values")
+    parser.add_argument("--min-distractors", type=int, default=MIN_DISTRACTORS)
+    args = parser.parse_args()
+
+    levels = tuple(int(level) for level in args.levels.split(","))
+    report = import_files(args.inputs, args.output, args.errors, args.workers, levels, args.min_distractors)
+    print(f"{report.rows:,} rows in {report.seconds:.1f} s ({report.rows_per_second:,.0f} rows/s), "
+          f"{report.imported:,} imported to {args.output}, {report.rejected:,} rejected")
+    for error, count in report.errors.most_common():
+        print(f"  {count:>10,}  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Opt-in rerun instrumentation, enabled with FROG_METRICS=1
+
+- section(name) times a block of the script into a rolling histogram; when
+  metrics are disabled it returns a shared no-op context manager.
+- track_rerun_bytes counts the bytes Streamlit sends per rerun and times
+  the whole rerun.
+- register_gauge exposes a current value such as a queue depth.
+- prometheus_text renders every histogram and gauge in the Prometheus text
+  format, served by start_metrics_server on FROG_METRICS_PORT at /metrics.
+- StackSampler samples the stacks of all threads of the live server and
+  produces folded stacks for flame graphs, served at /profile and
+  started/stopped with a POST to /profile/start and /profile/stop.
+"""
+import bisect
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+logger = logging.getLogger("frog.metrics")
+
+ENABLED = os.environ.get("FROG_METRICS", "") not in ("", "0")
+
+if ENABLED:
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+
+# Upper bounds of the histogram buckets, in seconds and in bytes
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 1_000_000)
+
+
+class RollingHistogram:
+    """Bucketed histogram with lifetime totals and a rolling time window
+
+    The window is split into `slots` sub-histograms that are recycled as
+    time passes, so quantile() reflects roughly the last `window` seconds
+    while the totals exported to Prometheus only ever grow.
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS, window: float = 60.0, slots: int = 6):
+        self.buckets = tuple(buckets)
+        self.slot_seconds = window / slots
+        self.count = 0
+        self.sum = 0.0
+        self.totals = [0] * (len(self.buckets) + 1)
+        self._slots = [[0] * (len(self.buckets) + 1) for _ in range(slots)]
+        self._slot_ids = [-1] * slots
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        slot_id = int(time.monotonic() / self.slot_seconds)
+        slot = slot_id % len(self._slots)
+        with self._lock:
+            if self._slot_ids[slot] != slot_id:
+                self._slots[slot] = [0] * (len(self.buckets) + 1)
+                self._slot_ids[slot] = slot_id
+            self._slots[slot][i] += 1
+            self.totals[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def recent(self) -> List[int]:
+        """Bucket counts over the rolling window"""
+        oldest = int(time.monotonic() / self.slot_seconds) - len(self._slots) + 1
+        with self._lock:
+            live = [counts for counts, slot_id in zip(self._slots, self._slot_ids) if slot_id >= oldest]
+        if not live:
+            return [0] * (len(self.buckets) + 1)
+        return [sum(column) for column in zip(*live)]
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound of the q-quantile over the rolling window"""
+        counts = self.recent()
+        target, seen = q * sum(counts), 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+
+METRICS: Dict[str, RollingHistogram] = {}
+_metrics_lock = threading.Lock()
+
+
+def histogram(name: str, buckets=SECONDS_BUCKETS) -> RollingHistogram:
+    """The histogram called `name`, created on first use"""
+    metric = METRICS.get(name)
+    if metric is None:
+        with _metrics_lock:
+            metric = METRICS.setdefault(name, RollingHistogram(buckets))
+    return metric
+
+
+GAUGES: Dict[str, Callable[[], float]] = {}
+
+
+def register_gauge(name: str, read: Callable[[], float]):
+    """Export the value returned by `read()` as the `name` gauge"""
+    GAUGES[name] = read
+
+
+class _Section:
+    __slots__ = ("metric", "start")
+
+    def __init__(self, metric: RollingHistogram):
+        self.metric = metric
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metric.observe(time.perf_counter() - self.start)
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+def section(name: str):
+    """Time a block into the `name` histogram: `with section("css"): ...`"""
+    if not ENABLED:
+        return _DISABLED
+    return _Section(histogram(name))
+
+
+def prometheus_text() -> str:
+    """All histograms and gauges in the Prometheus text exposition format"""
+    lines = []
+    for name, read in sorted(GAUGES.items()):
+        lines.append(f"# TYPE frog_{name} gauge")
+        lines.append(f"frog_{name} {read()}")
+    for name, metric in sorted(METRICS.items()):
+        metric_name = f"frog_{name}"
+        lines.append(f"# TYPE {metric_name} histogram")
+        cumulative = 0
+        for bound, count in zip(metric.buckets + (float("inf"),), metric.totals):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{metric_name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{metric_name}_sum {metric.sum}")
+        lines.append(f"{metric_name}_count {metric.count}")
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> List[dict]:
+    """Count, mean and rolling p50/p95/p99 of every histogram"""
+    rows = []
+    for name, metric in sorted(METRICS.items()):
+        rows.append({
+            "metric": name,
+            "count": metric.count,
+            "mean": metric.sum / metric.count if metric.count else 0.0,
+            "p50": metric.quantile(0.50),
+            "p95": metric.quantile(0.95),
+            "p99": metric.quantile(0.99),
+        })
+    return rows
+
+
+class RerunBytes:
+    """Size of the ForwardMsgs Streamlit sends to the browser for one rerun"""
+
+    __slots__ = ("messages", "bytes", "reported", "started")
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.reported = False
+        self.started = time.perf_counter()
+
+    def add(self, msg):
+        self.messages += 1
+        self.bytes += msg.ByteSize()
+
+    def report(self):
+        if not self.reported:
+            self.reported = True
+            histogram("rerun_seconds").observe(time.perf_counter() - self.started)
+            histogram("rerun_bytes", BYTES_BUCKETS).observe(self.bytes)
+            logger.info("rerun sent %d bytes in %d messages", self.bytes, self.messages)
+
+
+def track_rerun_bytes(ctx):
+    """Start counting the bytes sent by the current rerun
+
+    Call at the top of the script with the ScriptRunContext and call
+    report() on the result at the end. The first call wraps the context's
+    enqueue function; a rerun cut short by st.rerun is reported when the
+    next one starts.
+    """
+    if not ENABLED or ctx is None:
+        return None
+
+    previous = getattr(ctx, "_frog_rerun_bytes", None)
+    if previous is None:
+        enqueue = ctx._enqueue
+
+        def counting_enqueue(msg):
+            ctx._frog_rerun_bytes.add(msg)
+            enqueue(msg)
+
+        ctx._enqueue = counting_enqueue
+    else:
+        previous.report()
+
+    ctx._frog_rerun_bytes = RerunBytes()
+    return ctx._frog_rerun_bytes
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread into folded-stack counts
+
+    Unlike cProfile this sees all script threads of the running server and
+    costs nothing while stopped. folded() returns one "frame;frame count"
+    line per distinct stack, the input of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def clear(self):
+        self.stacks.clear()
+        self.samples = 0
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+SAMPLER = StackSampler()
+
+
+def _metrics_response(method: str, path: str):
+    """Body of a metrics server response, or None for an unknown request
+
+    Reads are GETs; starting and stopping the profiler changes state, so
+    those only answer POSTs.
+    """
+    if method == "GET":
+        if path == "/metrics":
+            return prometheus_text()
+        if path == "/profile":
+            return SAMPLER.folded()
+    elif method == "POST":
+        if path == "/profile/start":
+            SAMPLER.start()
+            return "profiling started\n"
+        if path == "/profile/stop":
+            SAMPLER.stop()
+            return f"profiling stopped after {SAMPLER.samples} samples\n"
+    return None
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serve GET /metrics and /profile, POST /profile/start|stop from a daemon thread"""
+    # Only needed with FROG_METRICS_PORT, keep it out of every app start
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_POST(self):
+            self._respond("POST")
+
+        def _respond(self, method):
+            body = _metrics_response(method, self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
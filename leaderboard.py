@@ -0,0 +1,188 @@
+"""Leaderboards over finished games
+
+Every finished game is one submission. It is ranked on the global board
+by its score, and on one board per difficulty and per category by the
+points it earned there. Each board keeps:
+
+- a min-heap of its top K entries, updated incrementally on submit, and
+- a Fenwick tree of submission counts per score, so the rank of any
+  score is an O(log max_score) prefix sum however many games were played.
+
+Submissions are appended to a JSON Lines file. refresh() tails that file,
+so several worker processes can share one leaderboard file.
+"""
+import heapq
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, NamedTuple, Optional
+
+TOP_K = 100
+
+
+class FenwickTree:
+    """Counts per non-negative integer key with O(log n) prefix sums"""
+
+    def __init__(self, size: int = 1024):
+        self._tree = [0] * (size + 1)
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def _grow(self, key: int):
+        counts = [self.prefix(i) - self.prefix(i - 1) for i in range(len(self))]
+        size = len(self)
+        while size <= key:
+            size *= 2
+        self._tree = [0] * (size + 1)
+        for i, count in enumerate(counts):
+            if count:
+                self.add(i, count)
+
+    def add(self, key: int, delta: int = 1):
+        if key >= len(self):
+            self._grow(key)
+        i = key + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, key: int) -> int:
+        """Total count of keys 0..key"""
+        i = min(key, len(self) - 1) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class Ranked(NamedTuple):
+    player: str
+    score: int
+    timestamp: float
+
+
+class Board:
+    """Incremental top-K and rank index of the scores on one board"""
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self.count = 0
+        self._counts = FenwickTree()
+        # (score, -sequence, player, timestamp): on equal scores the earlier
+        # submission ranks higher
+        self._top: List[tuple] = []
+        self._sorted: Optional[List[Ranked]] = None
+
+    def add(self, player: str, score: int, timestamp: float):
+        score = max(0, int(score))
+        self._counts.add(score)
+        self.count += 1
+        item = (score, -self.count, player, timestamp)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, item)
+        elif item > self._top[0]:
+            heapq.heapreplace(self._top, item)
+        else:
+            return
+        self._sorted = None
+
+    def top(self, n: int = 10) -> List[Ranked]:
+        if self._sorted is None:
+            self._sorted = [Ranked(player, score, ts) for score, _, player, ts in sorted(self._top, reverse=True)]
+        return self._sorted[:n]
+
+    def rank(self, score: int) -> int:
+        """1-based rank a game with this score has (ties share the best rank)"""
+        return self.count - self._counts.prefix(max(0, int(score))) + 1
+
+
+@dataclass
+class GameResult:
+    player: str
+    score: int
+    accuracy: float
+    best_streak: int
+    timestamp: float = field(default_factory=time.time)
+    difficulty_scores: Dict[str, int] = field(default_factory=dict)
+    category_scores: Dict[str, int] = field(default_factory=dict)
+
+
+def game_result(player: str, engine) -> GameResult:
+    """Summarize a finished GameEngine game for submission"""
+    difficulty_scores, category_scores = {}, {}
+    for answer in engine.game_history:
+        key = str(answer['difficulty'])
+        difficulty_scores[key] = difficulty_scores.get(key, 0) + answer['points']
+        category_scores[answer['category']] = category_scores.get(answer['category'], 0) + answer['points']
+    return GameResult(player, engine.score, round(engine.accuracy, 1), engine.best_streak,
+                      difficulty_scores=difficulty_scores, category_scores=category_scores)
+
+
+class Leaderboard:
+    """Global, per-difficulty and per-category boards, optionally file-backed
+
+    Board names are "global", "difficulty:<n>" and "category:<name>".
+    """
+
+    def __init__(self, path: str = None, top_k: int = TOP_K):
+        self.path = path
+        self.top_k = top_k
+        self.boards: Dict[str, Board] = {"global": Board(top_k)}
+        self._lock = threading.Lock()
+        self._offset = 0
+        if path:
+            self.refresh()
+
+    def _board(self, name: str) -> Board:
+        board = self.boards.get(name)
+        if board is None:
+            board = self.boards[name] = Board(self.top_k)
+        return board
+
+    def _apply(self, result: GameResult):
+        self.boards["global"].add(result.player, result.score, result.timestamp)
+        for difficulty, points in result.difficulty_scores.items():
+            self._board(f"difficulty:{difficulty}").add(result.player, points, result.timestamp)
+        for category, points in result.category_scores.items():
+            self._board(f"category:{category}").add(result.player, points, result.timestamp)
+
+    def submit(self, result: GameResult):
+        if not self.path:
+            with self._lock:
+                self._apply(result)
+            return
+        line = json.dumps(asdict(result), separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        self.refresh()
+
+    def refresh(self):
+        """Apply submissions appended to the file since the last refresh"""
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self._apply(GameResult(**json.loads(line)))
+            self._offset += end
+
+    def top(self, board: str = "global", n: int = 10) -> List[Ranked]:
+        with self._lock:
+            return self.boards[board].top(n) if board in self.boards else []
+
+    def rank(self, score: int, board: str = "global") -> int:
+        with self._lock:
+            return self.boards[board].rank(score) if board in self.boards else 1
+
+    def count(self, board: str = "global") -> int:
+        return self.boards[board].count if board in self.boards else 0
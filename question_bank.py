@@ -0,0 +1,222 @@
+import hashlib
+import json
+import random
+import sys
+from array import array
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Question data with enhanced metadata
+@dataclass(slots=True)
+class Question:
+    word: str
+    meaning: str
+    distractors: List[str]
+    difficulty: int
+    category: str
+    example: str = ""
+    pronunciation: str = ""
+
+    def __post_init__(self):
+        # Categories repeat across the whole bank, share one string per name
+        self.category = sys.intern(self.category)
+
+
+class QuestionBank:
+    """Question bank indexed by difficulty and category
+
+    Questions are stored sorted by (difficulty, category), so every difficulty
+    and every (difficulty, category) pair is a contiguous range of question IDs.
+    A question ID is simply its position in the bank.
+
+    `questions` may be any sequence; when `category_ranges` is given it must
+    already be sorted and the ranges are used as-is (see bank_file.load_bank).
+    A sequence with a `fingerprint` attribute supplies the bank's own.
+    """
+
+    def __init__(self, questions: Sequence[Question], category_ranges: Optional[Dict[Tuple[int, str], Tuple[int, int]]] = None):
+        if category_ranges is None:
+            questions = sorted(questions, key=lambda q: (q.difficulty, q.category))
+            category_ranges = {}
+            for qid, q in enumerate(questions):
+                start, _ = category_ranges.get((q.difficulty, q.category), (qid, qid))
+                category_ranges[(q.difficulty, q.category)] = (start, qid + 1)
+
+        self.questions = questions
+        self.category_ranges = category_ranges
+        self.difficulty_ranges: Dict[int, Tuple[int, int]] = {}
+        for (difficulty, _), (start, end) in sorted(category_ranges.items(), key=lambda item: item[1]):
+            first, _ = self.difficulty_ranges.get(difficulty, (start, end))
+            self.difficulty_ranges[difficulty] = (first, end)
+
+        # Key -> slot maps shared by every session's AnswerStats
+        self.difficulty_index = {d: i for i, d in enumerate(sorted(self.difficulty_ranges))}
+        self.category_index = {c: i for i, c in enumerate(sorted({c for _, c in category_ranges}))}
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the questions in ID order, computed once
+
+        Saved games carry it, so a game is only restored on the bank whose
+        IDs it refers to, not on a re-levelled or edited bank of the same size.
+        """
+        if self._fingerprint is None:
+            fingerprint = getattr(self.questions, "fingerprint", None)
+            if fingerprint is None:
+                digest = hashlib.blake2b(digest_size=16)
+                for q in self.questions:
+                    digest.update(f"{q.word}\x1f{q.meaning}\x1f{q.difficulty}\x1e".encode("utf-8"))
+                fingerprint = digest.hexdigest()
+            self._fingerprint = fingerprint
+        return self._fingerprint
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, qid: int) -> Question:
+        return self.questions[qid]
+
+    def ids(self, difficulty: int, category: Optional[str] = None) -> range:
+        """IDs of all questions with the given difficulty (and category)"""
+        if category is None:
+            start, end = self.difficulty_ranges.get(difficulty, (0, 0))
+        else:
+            start, end = self.category_ranges.get((difficulty, category), (0, 0))
+        return range(start, end)
+
+
+def load_calibration(path: str) -> Dict[str, int]:
+    """Calibrated difficulty per word from a table written by analytics.py"""
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    return {word: row["difficulty"] for word, row in table["words"].items() if row["calibrated"]}
+
+
+def calibrated(questions: Iterable[Question], difficulties: Dict[str, int]) -> List[Question]:
+    """Questions with their difficulty replaced by the calibrated one, where there is one"""
+    return [replace(q, difficulty=difficulties[q.word]) if difficulties.get(q.word, q.difficulty) != q.difficulty else q
+            for q in questions]
+
+
+class QuestionPool:
+    """Per-session view of the unused questions of a bank
+
+    Each difficulty range is drawn without replacement with a lazy
+    Fisher-Yates shuffle: the first `remaining` slots of the range are the
+    unused IDs and only slots that were swapped are stored, so a draw is O(1)
+    and memory grows with the number of questions asked, not the bank size.
+    The unused count of each difficulty is kept in a fixed-size array.
+    """
+
+    def __init__(self, bank: QuestionBank):
+        self.bank = bank
+        self.reset()
+
+    def reset(self):
+        """Mark every question as unused again"""
+        ranges = self.bank.difficulty_ranges
+        self._remaining = array("I", (ranges[d][1] - ranges[d][0] for d in self.bank.difficulty_index))
+        self._swaps: Dict[int, int] = {}
+        self.used_count = 0
+
+    def to_state(self) -> dict:
+        return {"swaps": list(self._swaps.items()), "remaining": list(self._remaining), "used_count": self.used_count}
+
+    def load_state(self, state: dict):
+        if "swaps" not in state:
+            # Saved by the old bitset pool, start the pool over
+            self.reset()
+            return
+        self._swaps = dict(state["swaps"])
+        self._remaining = array("I", state["remaining"])
+        self.used_count = state["used_count"]
+
+    def available(self, difficulties: Optional[Sequence[int]] = None) -> int:
+        """Number of unused questions, optionally limited to some difficulties"""
+        if difficulties is None:
+            return len(self.bank) - self.used_count
+        index = self.bank.difficulty_index
+        return sum(self._remaining[index[d]] for d in difficulties if d in index)
+
+    def draw(self, difficulties: Sequence[int], rng=random) -> int:
+        """Draw an unused question ID, preferring the given difficulties"""
+        if not self.available():
+            self.reset()
+
+        index = self.bank.difficulty_index
+        candidates = [d for d in difficulties if d in index and self._remaining[index[d]]]
+        if not candidates:
+            candidates = [d for d in index if self._remaining[index[d]]]
+
+        # Pick a difficulty weighted by how many unused questions it holds,
+        # so every unused candidate question is equally likely
+        pick = rng.randrange(sum(self._remaining[index[d]] for d in candidates))
+        for difficulty in candidates:
+            left = self._remaining[index[difficulty]]
+            if pick < left:
+                break
+            pick -= left
+
+        # Swap the picked slot with the last unused one of the range
+        start, _ = self.bank.difficulty_ranges[difficulty]
+        slot, last = start + pick, start + left - 1
+        qid = self._swaps.get(slot, slot)
+        if slot == last:
+            self._swaps.pop(last, None)
+        else:
+            self._swaps[slot] = self._swaps.pop(last, last)
+        self._remaining[index[difficulty]] = left - 1
+        self.used_count += 1
+        return qid
+
+
+class AnswerStats:
+    """Correct/total answer counters stored as two fixed-size int arrays
+
+    `index` maps each key (a difficulty or category) to its array slot and
+    is shared by all sessions, see QuestionBank.difficulty_index. `order`
+    lists the answered slots in the order they were first answered.
+    """
+
+    __slots__ = ("index", "correct", "total", "order")
+
+    def __init__(self, index: Dict):
+        self.index = index
+        self.correct = array("I", [0]) * len(index)
+        self.total = array("I", [0]) * len(index)
+        self.order = array("I")
+
+    def add(self, key, correct: int = 0, total: int = 0):
+        slot = self.index[key]
+        if total and not self.total[slot]:
+            self.order.append(slot)
+        self.correct[slot] += correct
+        self.total[slot] += total
+
+    def to_state(self) -> dict:
+        return {"correct": list(self.correct), "total": list(self.total), "order": list(self.order)}
+
+    def load_state(self, state: dict):
+        self.correct = array("I", state["correct"])
+        self.total = array("I", state["total"])
+        order = state.get("order")
+        if order is None:
+            order = (slot for slot, total in enumerate(self.total) if total)
+        self.order = array("I", order)
+
+    def get(self, key) -> Tuple[int, int]:
+        """(correct, total) for a key, (0, 0) if it was never answered"""
+        slot = self.index.get(key)
+        if slot is None:
+            return 0, 0
+        return self.correct[slot], self.total[slot]
+
+    def items(self) -> Iterator[Tuple[object, int, int]]:
+        """(key, correct, total) for every answered key, in first-answered order"""
+        keys = list(self.index)
+        for slot in self.order:
+            yield keys[slot], self.correct[slot], self.total[slot]
+
+    def __bool__(self):
+        return any(self.total)
@@ -0,0 +1,41 @@
+from question_bank import Question
+
+# Question data with enhanced metadata
+QUESTIONS = [
+    # Easy - Level 1
+    Question("Happy", "Feeling joy or pleasure", ["Sad", "Angry", "Tired"], 1, "Emotions", "She felt happy on her birthday.", "HAP-ee"),
+    Question("Quick", "Moving fast or speedy", ["Slow", "Lazy", "Sluggish"], 1, "Speed", "He made a quick decision.", "KWIK"),
+    Question("Bright", "Full of light or shining", ["Dark", "Dim", "Dull"], 1, "Light", "The bright sun warmed the day.", "BRITE"),
+    Question("Small", "Little in size", ["Large", "Huge", "Giant"], 1, "Size", "She has a small puppy.", "SMAWL"),
+    Question("Loud", "Making much noise", ["Quiet", "Silent", "Soft"], 1, "Sound", "The loud music filled the room.", "LOWD"),
+    Question("Hot", "High temperature", ["Cold", "Cool", "Chilly"], 1, "Temperature", "The hot coffee warmed his hands.", "HAHT"),
+    Question("Fast", "High speed movement", ["Slow", "Sluggish", "Dawdling"], 1, "Speed", "The fast runner won the race.", "FAST"),
+    Question("Strong", "Having great power", ["Weak", "Frail", "Feeble"], 1, "Strength", "She has a strong grip.", "STRONG"),
+    
+    # Medium - Level 2
+    Question("Ephemeral", "Short-lived or temporary", ["Eternal", "Permanent", "Lasting"], 2, "Time", "Butterfly life is ephemeral.", "ef-EM-er-ul"),
+    Question("Ubiquitous", "Present everywhere", ["Rare", "Unique", "Absent"], 2, "Presence", "Smartphones are ubiquitous today.", "yoo-BIK-wi-tus"),
+    Question("Serendipity", "Finding good things by luck", ["Misfortune", "Bad luck", "Disaster"], 2, "Fortune", "Meeting her was pure serendipity.", "ser-un-DIP-i-tee"),
+    Question("Ameliorate", "To improve or make better", ["Worsen", "Destroy", "Damage"], 2, "Change", "Education can ameliorate poverty.", "uh-MEEL-yuh-rayt"),
+    Question("Cacophony", "Harsh mix of sounds", ["Harmony", "Music", "Melody"], 2, "Sound", "The cacophony of car horns.", "kuh-KAH-fuh-nee"),
+    Question("Sanguine", "Optimistic and positive", ["Pessimistic", "Gloomy", "Sad"], 2, "Attitude", "He remained sanguine despite losses.", "SAN-gwin"),
+    Question("Zealous", "Very eager and enthusiastic", ["Apathetic", "Lazy", "Indifferent"], 2, "Emotion", "She was zealous about her work.", "ZEL-us"),
+    Question("Enigmatic", "Mysterious and puzzling", ["Clear", "Obvious", "Plain"], 2, "Mystery", "His smile was enigmatic.", "en-ig-MAT-ik"),
+    Question("Resilient", "Quick to recover strength", ["Fragile", "Weak", "Delicate"], 2, "Strength", "She is resilient despite hardships.", "ri-ZIL-yunt"),
+    Question("Pragmatic", "Dealing with things in practical way", ["Idealistic", "Theoretical", "Abstract"], 2, "Nature", "He took a pragmatic approach.", "prag-MAT-ik"),
+    Question("Eloquent", "Fluent and expressive speaker", ["Inarticulate", "Stammering", "Mute"], 2, "Speech", "Her eloquent speech moved everyone.", "EL-uh-kwunt"),
+    Question("Meticulous", "Very careful and precise", ["Careless", "Sloppy", "Reckless"], 2, "Behavior", "She did meticulous research.", "muh-TIK-yuh-lus"),
+    Question("Ambiguous", "Open to more than one interpretation", ["Clear", "Definite", "Precise"], 2, "Clarity", "His answer was ambiguous.", "am-BIG-yuh-us"),
+    
+    # Hard - Level 3
+    Question("Perspicacious", "Having keen insight and judgment", ["Foolish", "Naive", "Gullible"], 3, "Intelligence", "Her perspicacious observation was brilliant.", "per-spi-KAY-shus"),
+    Question("Esoteric", "For specialists only; mysterious", ["Common", "Popular", "Universal"], 3, "Knowledge", "That's too esoteric for most people.", "es-uh-TER-ik"),
+    Question("Perfidious", "Deceitful and untrustworthy", ["Loyal", "Trustworthy", "Faithful"], 3, "Character", "His perfidious actions betrayed them.", "per-FID-ee-us"),
+    Question("Obsequious", "Excessively obedient to authority", ["Defiant", "Bold", "Assertive"], 3, "Behavior", "The obsequious servant bowed repeatedly.", "ub-SEE-kwee-us"),
+    Question("Recalcitrant", "Stubbornly resisting authority", ["Compliant", "Obedient", "Agreeable"], 3, "Attitude", "The recalcitrant child refused to obey.", "ri-KAL-si-trunt"),
+    Question("Munificent", "Extremely generous or lavish", ["Stingy", "Miserly", "Selfish"], 3, "Generosity", "His munificent donation saved the charity.", "myoo-NIF-uh-sunt"),
+    Question("Pellucid", "Crystal clear in meaning or style", ["Obscure", "Confusing", "Vague"], 3, "Clarity", "Her pellucid explanation was perfect.", "puh-LOO-sid"),
+    Question("Phlegmatic", "Calm, unemotional temperament", ["Excitable", "Passionate", "Emotional"], 3, "Temperament", "He remained phlegmatic during the crisis.", "fleg-MAT-ik"),
+    Question("Erudite", "Scholarly and knowledgeable", ["Ignorant", "Uneducated", "Naive"], 3, "Knowledge", "The erudite professor impressed all.", "ER-uh-dite"),
+    Question("Surreptitious", "Secret and stealthy manner", ["Open", "Obvious", "Public"], 3, "Behavior", "He made surreptitious glances at her.", "sur-uh-TISH-us"),
+]
@@ -0,0 +1,447 @@
+"""Race mode: rooms of players answering the same questions
+
+Every room draws its question sequence from a seed derived from its deck
+and code, so all its players (in any worker process) get the same
+questions and options. Players answer at their own pace; each answer
+publishes the player's new progress to the room's channel and every
+subscriber of the room gets it pushed, nobody polls.
+
+The pub/sub side is a Broker:
+
+    memory          AsyncioHub, an asyncio event loop in a background thread
+                    that fans messages out to the callbacks of one process
+    tcp://host:port BrokerClient, the same hub relaying through a broker
+                    process (`python race.py broker`) to every worker
+
+A message published with a key is retained per (channel, key) and
+replayed to later subscribers, so a room created in another process, or
+a player joining late, starts from the current scores. A real broker
+(e.g. Redis pub/sub plus a hash per room) can replace the stand-in by
+implementing the same three methods.
+
+Room replicas apply each player's progress last-write-wins by the number
+of answered questions, so they converge whatever the delivery order.
+"""
+import argparse
+import asyncio
+import hashlib
+import inspect
+import itertools
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from engine import score_answer
+from question_bank import QuestionBank, QuestionPool
+
+ROUNDS = 10
+ROOM_TTL = 3600
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+logger = logging.getLogger(__name__)
+
+
+def new_room_code(length: int = 5) -> str:
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(length))
+
+
+def race_questions(bank: QuestionBank, seed: int, rounds: int = ROUNDS, distractors=None) -> List[Tuple[int, List[str]]]:
+    """(qid, options) of every round, the same for every caller with the same seed
+
+    The difficulty climbs from the easiest to the hardest level of the
+    deck over the race.
+    """
+    rng = random.Random(seed)
+    pool = QuestionPool(bank)
+    levels = list(bank.difficulty_index)
+    sequence = []
+    for round_ in range(rounds):
+        qid = pool.draw([levels[round_ * len(levels) // rounds]], rng)
+        question = bank[qid]
+        if distractors is not None:
+            options = [question.meaning] + distractors.distractors(qid, rng)
+        else:
+            options = [question.meaning] + question.distractors
+        rng.shuffle(options)
+        sequence.append((qid, options))
+    return sequence
+
+
+class Subscription(NamedTuple):
+    channel: str
+    id: int
+    callback: Callable
+
+
+class Broker(ABC):
+    """Interface of a pub/sub broker
+
+    Callbacks run on the broker's own thread in subscription order and
+    must not block; a coroutine function is scheduled as a task instead.
+    """
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> Subscription:
+        """Call `callback` with every message of `channel`, retained ones first"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to a subscription"""
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict, key: Optional[str] = None):
+        """Send a message to the subscribers of `channel`, retained per `key` if given"""
+
+
+class AsyncioHub(Broker):
+    """In-process broker on an asyncio event loop in a daemon thread
+
+    publish() only hands the message to the loop, so publishing threads
+    never wait for the fan-out.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.delivered = 0
+        self._channels: Dict[str, Dict[int, Callable]] = {}
+        self._retained: Dict[str, Dict[str, dict]] = {}
+        self._ids = itertools.count()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="race-hub", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, channel, callback):
+        subscription = Subscription(channel, next(self._ids), callback)
+        self.loop.call_soon_threadsafe(self._add, subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.loop.call_soon_threadsafe(self._remove, subscription)
+
+    def publish(self, channel, message, key=None):
+        self.loop.call_soon_threadsafe(self._fan_out, channel, message, key)
+
+    def subscribers(self, channel: str) -> int:
+        return len(self._channels.get(channel, ()))
+
+    def _add(self, subscription: Subscription):
+        self._channels.setdefault(subscription.channel, {})[subscription.id] = subscription.callback
+        for message in list(self._retained.get(subscription.channel, {}).values()):
+            self._deliver(subscription.callback, message)
+
+    def _remove(self, subscription: Subscription):
+        callbacks = self._channels.get(subscription.channel)
+        if callbacks is not None:
+            callbacks.pop(subscription.id, None)
+            if not callbacks:
+                del self._channels[subscription.channel]
+                self._retained.pop(subscription.channel, None)
+
+    def _fan_out(self, channel: str, message: dict, key: Optional[str]):
+        if key is not None and channel in self._channels:
+            self._retained.setdefault(channel, {})[key] = message
+        for callback in list(self._channels.get(channel, {}).values()):
+            self._deliver(callback, message)
+
+    def _deliver(self, callback: Callable, message: dict):
+        try:
+            if inspect.iscoroutinefunction(callback):
+                self.loop.create_task(callback(message))
+            else:
+                callback(message)
+            self.delivered += 1
+        except Exception:
+            logger.exception("race subscriber failed")
+
+
+class BrokerClient(AsyncioHub):
+    """AsyncioHub whose messages go through a broker process
+
+    The hub subscribes to a channel at the broker when it gets its first
+    local subscriber, and fans every message the broker sends out locally,
+    including its own. Messages are JSON lines over TCP.
+    """
+
+    def __init__(self, host: str, port: int):
+        super().__init__()
+        self._writer = None
+        asyncio.run_coroutine_threadsafe(self._connect(host, port), self.loop).result(timeout=10)
+
+    async def _connect(self, host, port):
+        reader, self._writer = await asyncio.open_connection(host, port)
+        self.loop.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader):
+        async for line in reader:
+            data = json.loads(line)
+            self._fan_out(data["channel"], data["message"], data.get("key"))
+        logger.error("race broker connection closed")
+
+    def _send(self, data: dict):
+        self._writer.write(json.dumps(data, separators=(",", ":")).encode() + b"\n")
+
+    def _add(self, subscription):
+        if subscription.channel not in self._channels:
+            self._send({"op": "sub", "channel": subscription.channel})
+        super()._add(subscription)
+
+    def _remove(self, subscription):
+        super()._remove(subscription)
+        if subscription.channel not in self._channels:
+            self._send({"op": "unsub", "channel": subscription.channel})
+
+    def publish(self, channel, message, key=None):
+        self.loop.call_soon_threadsafe(self._send, {"op": "pub", "channel": channel, "message": message, "key": key})
+
+
+async def serve_broker(host: str = "127.0.0.1", port: int = 8765):
+    """Relay messages between the BrokerClients of all worker processes"""
+    channels: Dict[str, set] = {}
+    retained: Dict[str, Dict[str, bytes]] = {}
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed = set()
+        try:
+            async for line in reader:
+                data = json.loads(line)
+                channel = data["channel"]
+                if data["op"] == "sub":
+                    subscribed.add(channel)
+                    channels.setdefault(channel, set()).add(writer)
+                    for message in retained.get(channel, {}).values():
+                        writer.write(message)
+                elif data["op"] == "unsub":
+                    subscribed.discard(channel)
+                    channels.get(channel, set()).discard(writer)
+                elif data["op"] == "pub":
+                    if data.get("key") is not None:
+                        retained.setdefault(channel, {})[data["key"]] = line
+                    for subscriber in channels.get(channel, ()):
+                        subscriber.write(line)
+        finally:
+            for channel in subscribed:
+                channels[channel].discard(writer)
+                if not channels[channel]:
+                    del channels[channel]
+                    retained.pop(channel, None)
+            writer.close()
+
+    server = await asyncio.start_server(client, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def open_broker(url: str) -> Broker:
+    """Create a broker from a URL: memory or tcp://<host>:<port>"""
+    if not url or url == "memory":
+        return AsyncioHub()
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return BrokerClient(host, int(port))
+    raise ValueError(f"Unknown race broker: {url}")
+
+
+@dataclass
+class RacePlayer:
+    id: str
+    name: str
+    score: int = 0
+    answered: int = 0
+    correct: int = 0
+    streak: int = 0
+    updated: float = 0.0
+
+
+class Room:
+    """Local replica of a race room, kept up to date by its channel"""
+
+    def __init__(self, code: str, deck, broker: Broker, rounds: int = ROUNDS, distractors=None):
+        self.code = code
+        self.deck = deck
+        self.broker = broker
+        self.channel = f"race/{deck.name}/{code}"
+        seed = int.from_bytes(hashlib.blake2b(self.channel.encode(), digest_size=8).digest(), "little")
+        self.questions = race_questions(deck.bank, seed, rounds, distractors)
+        self.players: Dict[str, RacePlayer] = {}
+        # Bumped on every change, so views can tell whether they are current
+        self.version = 0
+        self.last_used = time.time()
+        self._lock = threading.Lock()
+        self._subscription = broker.subscribe(self.channel, self._apply)
+
+    @property
+    def rounds(self) -> int:
+        return len(self.questions)
+
+    def _apply(self, message: dict):
+        player = RacePlayer(**message)
+        with self._lock:
+            current = self.players.get(player.id)
+            if current is None or (player.answered, player.updated) >= (current.answered, current.updated):
+                self.players[player.id] = player
+                self.version += 1
+
+    def _publish(self, player: RacePlayer):
+        message = asdict(player)
+        self._apply(message)
+        self.broker.publish(self.channel, message, key=player.id)
+
+    def join(self, player_id: str, name: str) -> RacePlayer:
+        """Add a player, or rename one who already joined"""
+        self.last_used = time.time()
+        with self._lock:
+            player = self.players.get(player_id)
+        if player is None or player.name != name:
+            player = replace(player, name=name) if player else RacePlayer(player_id, name)
+            player.updated = time.time()
+            self._publish(player)
+        return player
+
+    def player(self, player_id: str) -> Optional[RacePlayer]:
+        with self._lock:
+            return self.players.get(player_id)
+
+    def answer(self, player_id: str, round_: int, selected: str, response_time: float) -> Tuple[bool, int]:
+        """(correct, points) of a player's answer to round `round_`
+
+        Raises ValueError for a round the player is not at, e.g. after a
+        double click.
+        """
+        self.last_used = time.time()
+        with self._lock:
+            player = replace(self.players[player_id])
+        if round_ != player.answered or round_ >= self.rounds:
+            raise ValueError(f"{player.name} is not at round {round_}")
+        question = self.deck.bank[self.questions[round_][0]]
+        correct = selected == question.meaning
+        points = 0
+        player.answered += 1
+        if correct:
+            player.correct += 1
+            player.streak += 1
+            points = score_answer(question.difficulty, response_time, player.streak)[3]
+            player.score += points
+        else:
+            player.streak = 0
+        player.updated = time.time()
+        self._publish(player)
+        return correct, points
+
+    def scoreboard(self) -> List[RacePlayer]:
+        """Players by score, then by progress, then by who got there first"""
+        with self._lock:
+            players = list(self.players.values())
+        return sorted(players, key=lambda p: (-p.score, -p.answered, p.updated))
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return bool(self.players) and all(p.answered >= self.rounds for p in self.players.values())
+
+    def close(self):
+        self.broker.unsubscribe(self._subscription)
+
+
+class Follower:
+    """One viewer's subscription to a room, calling `wake` when it changes
+
+    Updates that arrive while a wake-up is pending or while the viewer is
+    rendering are folded into one: the viewer calls rendering() before it
+    reads the room and rendered() after, which tells it whether it missed
+    something and should render again. A burst of answers costs each
+    viewer one rerun, not one per answer.
+    """
+
+    def __init__(self, room: Room, wake: Callable[[], None]):
+        self.room = room
+        self.wake = wake
+        self.busy = False
+        self.pending = False
+        # Subscribed after the room itself, so the room has applied an
+        # update by the time its followers hear about it
+        self._subscription = room.broker.subscribe(room.channel, self._on_update)
+
+    def _on_update(self, message: dict):
+        if self.pending:
+            return
+        self.pending = True
+        if not self.busy:
+            self.wake()
+
+    def rendering(self):
+        self.busy = True
+        self.pending = False
+
+    def rendered(self) -> bool:
+        self.busy = False
+        return self.pending
+
+    def close(self):
+        self.room.broker.unsubscribe(self._subscription)
+
+
+class RoomRegistry:
+    """Process-local race rooms by deck and code
+
+    Rooms idle for `ttl` seconds are dropped, with their followers.
+    """
+
+    def __init__(self, broker: Broker, ttl: float = ROOM_TTL):
+        self.broker = broker
+        self.ttl = ttl
+        self._rooms: Dict[Tuple[str, str], Room] = {}
+        self._followers: Dict[Tuple[str, str], List[Follower]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def room(self, code: str, deck, distractors=None) -> Room:
+        """The room `code` of a deck, created on first use"""
+        now = time.time()
+        with self._lock:
+            for key, room in list(self._rooms.items()):
+                if now - room.last_used > self.ttl:
+                    self._close(key)
+            room = self._rooms.get((deck.name, code))
+            if room is None:
+                room = self._rooms[(deck.name, code)] = Room(code, deck, self.broker, distractors=distractors)
+            room.last_used = now
+            return room
+
+    def follow(self, room: Room, wake: Callable[[], None]) -> Follower:
+        follower = Follower(room, wake)
+        with self._lock:
+            self._followers.setdefault((room.deck.name, room.code), []).append(follower)
+        return follower
+
+    def unfollow(self, follower: Follower):
+        follower.close()
+        with self._lock:
+            followers = self._followers.get((follower.room.deck.name, follower.room.code), [])
+            if follower in followers:
+                followers.remove(follower)
+
+    def _close(self, key: Tuple[str, str]):
+        for follower in self._followers.pop(key, []):
+            follower.close()
+        self._rooms.pop(key).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race mode broker relaying room updates between worker processes")
+    parser.add_argument("command", choices=["broker"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    print(f"Race broker on tcp://{args.host}:{args.port}")
+    asyncio.run(serve_broker(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Replays of seeded game sessions
+
+A seeded GameEngine records each answer as (option index, response time)
+in `choices`. The seed and the choices rebuild the whole session:
+every question, the order of its options, every score and the review
+schedule carried from one game to the next. So a session's answers can be
+logged as one compact Replay instead of one event per answer.
+
+app.py appends Replay lines to FROG_REPLAY_LOG when a game ends, each
+holding the choices made since the previous line of the same session
+(`start` is the index of the first one); read_replays joins them again.
+The game then drops the logged choices, so a saved game only carries
+the ones of its current game. A session restored from the session store
+may log some choices again, and the reader skips the ones it already has.
+
+Usage: python replay.py replays.jsonl [--bank questions.bank] [--decks-dir decks] [--workers 8]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from engine import GameEngine
+from question_bank import QuestionBank
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Replay:
+    session: str
+    seed: int
+    choices: List[Tuple[int, float]] = field(default_factory=list)
+    start: int = 0
+    deck: str = "default"
+    generated_distractors: bool = False
+
+
+class GameResult(NamedTuple):
+    score: int
+    attempts: int
+    correct: int
+    victory: bool
+    qids: Tuple[int, ...]
+
+
+def replay_games(bank: QuestionBank, replay: Replay, distractors=None, clock=lambda: 0.0) -> Iterator[GameResult]:
+    """Result of every game of a replayed session, the unfinished last one included
+
+    `distractors` must be the deck's DistractorEngine when the session
+    played with generated options.
+    """
+    engine = GameEngine(bank, clock=clock, distractors=distractors, seed=replay.seed)
+    qids = [engine.current_qid]
+    for option, response_time in replay.choices:
+        if engine.game_over:
+            yield GameResult(engine.score, engine.total_attempts, engine.correct_answers, engine.victory, tuple(qids))
+            engine.new_game()
+            qids = [engine.current_qid]
+        engine.answer(engine.options[option] if option >= 0 else "", response_time)
+        engine.next_question()
+        if not engine.game_over:
+            qids.append(engine.current_qid)
+    yield GameResult(engine.score, engine.total_attempts, engine.correct_answers, engine.victory, tuple(qids))
+
+
+def read_replays(path: str) -> List[Replay]:
+    """Sessions of a replay log, each with the choices of all its lines joined in order
+
+    Lines that cannot be decoded, e.g. cut short by a crash, are skipped.
+    """
+    sessions: Dict[Tuple[str, int], Replay] = {}
+    skipped = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                part = Replay(**json.loads(line))
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            replay = sessions.setdefault((part.session, part.seed), Replay(part.session, part.seed, [], 0, part.deck,
+                                                                             part.generated_distractors))
+            if part.start > len(replay.choices):
+                raise ValueError(f"{path}: session {part.session} is missing choices {len(replay.choices)}-{part.start}")
+            # A restored session may log choices that were already logged
+            replay.choices.extend(tuple(choice) for choice in part.choices[len(replay.choices) - part.start:])
+    if skipped:
+        logger.warning("Skipped %d unreadable lines of %s", skipped, path)
+    return list(sessions.values())
+
+
+def load_decks(bank_path: str = None, decks_dir: str = None):
+    from decks import DEFAULT_DECK, Deck, DeckCache, load_deck
+    from simulate import load_bank
+
+    def loader(name):
+        if name == DEFAULT_DECK:
+            return Deck(DEFAULT_DECK, load_bank(bank_path))
+        return load_deck(name, decks_dir)
+    return DeckCache(loader)
+
+
+def replay_chunk(replays: List[Replay], bank_path: str = None, decks_dir: str = None) -> List[List[GameResult]]:
+    decks = load_decks(bank_path, decks_dir)
+    results = []
+    for replay in replays:
+        deck = decks.get(replay.deck)
+        distractors = deck.distractors if replay.generated_distractors else None
+        results.append(list(replay_games(deck.bank, replay, distractors)))
+    return results
+
+
+def replay_all(replays: List[Replay], workers: int = 1, bank_path: str = None, decks_dir: str = None,
+               chunk_size: int = 1000) -> List[List[GameResult]]:
+    """Games of every replayed session, across a pool of `workers` processes"""
+    chunks = [replays[start:start + chunk_size] for start in range(0, len(replays), chunk_size)]
+    if workers <= 1:
+        return [games for chunk in chunks for games in replay_chunk(chunk, bank_path, decks_dir)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(replay_chunk, chunk, bank_path, decks_dir) for chunk in chunks]
+        return [games for future in futures for games in future.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", help="replay log written by the app (FROG_REPLAY_LOG)")
+    parser.add_argument("--bank", help="bank file of the default deck, as FROG_BANK_FILE")
+    parser.add_argument("--decks-dir", help="directory of the other decks, as FROG_DECKS_DIR")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    replays = read_replays(args.log)
+    start = time.perf_counter()
+    sessions = replay_all(replays, args.workers, args.bank, args.decks_dir)
+    elapsed = time.perf_counter() - start
+
+    games = [game for session in sessions for game in session]
+    finished = [game for game in games if game.attempts]
+    print(f"sessions:     {len(sessions)}")
+    print(f"games:        {len(finished)}")
+    if finished:
+        print(f"victory rate: {sum(g.victory for g in finished) / len(finished):.1%}")
+        print(f"mean score:   {sum(g.score for g in finished) / len(finished):.1f} (best {max(g.score for g in finished)})")
+    print(f"throughput:   {len(games) / elapsed:,.0f} games/s on {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
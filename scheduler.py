@@ -0,0 +1,89 @@
+"""SM-2 style spaced-repetition scheduling of words for one player
+
+Time is counted in turns (questions answered by the player), which fits a
+game where reviews happen within and across short sessions. Every word the
+player has seen has an ease factor, an interval and a due turn; due words
+sit in a heap ordered by due turn, so finding the next review is O(log N)
+however large the bank or the history.
+"""
+import heapq
+from typing import Dict, List, Optional
+
+MIN_EASE = 1.3
+START_EASE = 2.5
+# Intervals in turns: after the first and second correct answer in a row,
+# and after a wrong answer
+FIRST_INTERVAL = 5
+SECOND_INTERVAL = 15
+RELEARN_INTERVAL = 3
+
+
+def answer_quality(correct: bool, response_time: float) -> int:
+    """SM-2 grade (0-5) from correctness and response speed"""
+    if not correct:
+        return 1
+    if response_time < 5:
+        return 5
+    if response_time < 10:
+        return 4
+    return 3
+
+
+class ReviewScheduler:
+    """Per-player ease factors, intervals and due turns of seen words"""
+
+    def __init__(self):
+        self.turn = 0
+        # qid -> [ease, interval, repetitions]
+        self.cards: Dict[int, List[float]] = {}
+        # (due turn, qid); a word is in the heap unless it is being asked
+        self._due: List[tuple] = []
+
+    def __len__(self):
+        return len(self.cards)
+
+    def pop_due(self) -> Optional[int]:
+        """Take the most overdue word if one is due this turn"""
+        if self._due and self._due[0][0] <= self.turn:
+            return heapq.heappop(self._due)[1]
+        return None
+
+    def pop_next(self) -> Optional[int]:
+        """Take the word with the earliest due turn, even if it is not due yet"""
+        if self._due:
+            return heapq.heappop(self._due)[1]
+        return None
+
+    def upcoming(self, n: int) -> List[int]:
+        """The `n` words with the earliest due turns, without taking them"""
+        return [qid for _, qid in heapq.nsmallest(n, self._due)]
+
+    def review(self, qid: int, correct: bool, response_time: float):
+        """Record an answer for a word and schedule its next review"""
+        self.turn += 1
+        ease, interval, repetitions = self.cards.get(qid, (START_EASE, 0, 0))
+        quality = answer_quality(correct, response_time)
+
+        ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if quality < 3:
+            repetitions, interval = 0, RELEARN_INTERVAL
+        else:
+            repetitions += 1
+            if repetitions == 1:
+                interval = FIRST_INTERVAL
+            elif repetitions == 2:
+                interval = SECOND_INTERVAL
+            else:
+                interval = round(interval * ease)
+
+        self.cards[qid] = [ease, interval, repetitions]
+        heapq.heappush(self._due, (self.turn + interval, qid))
+
+    def to_state(self) -> dict:
+        return {"turn": self.turn, "cards": [[qid] + card for qid, card in self.cards.items()], "due": [list(entry) for entry in self._due]}
+
+    def load_state(self, state: dict):
+        self.turn = state["turn"]
+        self.cards = {card[0]: card[1:] for card in state["cards"]}
+        self._due = [tuple(entry) for entry in state["due"]]
+        heapq.heapify(self._due)
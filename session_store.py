@@ -0,0 +1,174 @@
+"""Pluggable persistence for game sessions
+
+A store maps a session key to a JSON-serializable state dict. The app
+saves each session at most once per rerun and only when its state
+changed, and restores it on the first rerun of a new Streamlit session.
+This lets a game survive a server restart or a move to another worker.
+
+    memory                      process-local dict (default)
+    sqlite:///path/to/games.db  SQLite file in WAL mode, shared by workers
+
+Sessions not saved for `ttl` seconds (SESSION_TTL, a week, by default)
+expire, and the memory store also keeps at most `capacity` sessions,
+evicting the least recently used one.
+
+Any SessionStore subclass can be used instead, e.g. a thin wrapper
+around a Redis client.
+
+Session keys travel in the page URL, so a key is a bearer token: whoever
+has the link can continue that game. sign_key/verify_key add an HMAC so a
+server only accepts keys it issued itself, not made-up or guessed ones.
+"""
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+SIGNATURE_LENGTH = 16
+SESSION_TTL = 7 * 24 * 3600
+MEMORY_CAPACITY = 10_000
+# The SQLite store deletes expired rows once every this many saves
+EXPIRE_EVERY = 1000
+
+
+def sign_key(key: str, secret: bytes) -> str:
+    """`key` with an HMAC signature appended, for use in a URL"""
+    signature = hmac.new(secret, key.encode("utf-8"), hashlib.sha256).hexdigest()[:SIGNATURE_LENGTH]
+    return f"{key}.{signature}"
+
+
+def verify_key(signed: str, secret: bytes) -> Optional[str]:
+    """The key of a signed key, or None if the signature does not match"""
+    key, _, _ = signed.rpartition(".")
+    if not key or not hmac.compare_digest(sign_key(key, secret).encode("utf-8"), signed.encode("utf-8")):
+        return None
+    return key
+
+
+class SessionStore(ABC):
+    """Interface of a session store"""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[dict]:
+        """The saved state of a session, or None"""
+
+    @abstractmethod
+    def save(self, key: str, state: dict):
+        """Save the state of a session, replacing any previous one"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Forget a session"""
+
+
+class MemorySessionStore(SessionStore):
+    """Keeps sessions in an LRU dict; survives reconnects, not restarts"""
+
+    def __init__(self, capacity: int = MEMORY_CAPACITY, ttl: float = SESSION_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        # key -> (JSON state, time of the last save), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def load(self, key):
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time() - self.ttl:
+                del self._sessions[key]
+                return None
+            self._sessions.move_to_end(key)
+        return json.loads(entry[0])
+
+    def save(self, key, state):
+        data = json.dumps(state, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._sessions[key] = (data, now)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+            # Saved sessions come last, so expired ones are at the front
+            while self._sessions:
+                oldest = next(iter(self._sessions))
+                if self._sessions[oldest][1] >= now - self.ttl:
+                    break
+                del self._sessions[oldest]
+
+    def delete(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Keeps sessions in a SQLite file in WAL mode
+
+    Every save is one upsert in its own transaction. Each thread gets its
+    own connection, and WAL lets readers run while another worker writes.
+    Expired rows are not loaded, and every EXPIRE_EVERY saves of a
+    process delete them.
+    """
+
+    def __init__(self, path: str, ttl: float = SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._saves = 0
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+        self.expire()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, key):
+        row = self._connection().execute("SELECT state FROM sessions WHERE key = ? AND updated >= ?",
+                                         (key, time.time() - self.ttl)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, key, state):
+        data = json.dumps(state, separators=(",", ":"))
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO sessions (key, state, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                (key, data, time.time()),
+            )
+        self._saves += 1
+        if self._saves % EXPIRE_EVERY == 0:
+            self.expire()
+
+    def expire(self):
+        """Delete the sessions not saved within the TTL"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - self.ttl,))
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+
+def open_session_store(url: str) -> SessionStore:
+    """Create a store from a URL: memory or sqlite:///<path>"""
+    if not url or url == "memory":
+        return MemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unknown session store: {url}")
@@ -0,0 +1,154 @@
+"""Batch simulator: play many synthetic games with the headless engine
+
+Each simulated player answers correctly with a per-difficulty probability
+and takes a log-normally distributed time to answer. Games are spread over
+a process pool and the script reports outcome statistics and throughput.
+
+Every player gets a fresh engine and plays --games-per-player games (one
+by default), so the spaced-repetition schedule only carries over between
+the games of one player and results do not depend on how games are
+chunked. --random-selection plays without spaced repetition.
+
+Usage: python simulate.py --games 1000000 --workers 8 --accuracy 0.9,0.75,0.6
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict
+
+from engine import GameEngine
+from question_bank import QuestionBank
+
+
+@dataclass
+class PlayerModel:
+    """Answer accuracy per difficulty and a log-normal response time"""
+    accuracy: Dict[int, float]
+    median_response_time: float = 5.0
+    response_time_sigma: float = 0.5
+
+    def answer(self, engine: GameEngine, rng: random.Random):
+        """Pick an option and a response time for the engine's current question"""
+        q = engine.current_question
+        if rng.random() < self.accuracy.get(q.difficulty, 0.5):
+            selected = q.meaning
+        else:
+            selected = rng.choice([o for o in engine.options if o != q.meaning] or engine.options)
+        response_time = self.median_response_time * math.exp(rng.gauss(0, self.response_time_sigma))
+        return selected, response_time
+
+
+@dataclass
+class SimulationResult:
+    games: int = 0
+    victories: int = 0
+    answers: int = 0
+    total_score: int = 0
+    best_score: int = 0
+    score_histogram: Dict[int, int] = field(default_factory=dict)
+
+    def merge(self, other: "SimulationResult"):
+        self.games += other.games
+        self.victories += other.victories
+        self.answers += other.answers
+        self.total_score += other.total_score
+        self.best_score = max(self.best_score, other.best_score)
+        for bucket, count in other.score_histogram.items():
+            self.score_histogram[bucket] = self.score_histogram.get(bucket, 0) + count
+
+
+def load_bank(path=None) -> QuestionBank:
+    if path:
+        from bank_file import load_bank as load_bank_file
+        return load_bank_file(path)
+    from questions import QUESTIONS
+    return QuestionBank(QUESTIONS)
+
+
+def play_games(games: int, player: PlayerModel, seed: int, bank_path=None, bucket_size=50, games_per_player=1,
+               spaced_repetition=True) -> SimulationResult:
+    """Play `games` full games and aggregate their outcomes"""
+    bank = load_bank(bank_path)
+    rng = random.Random(seed)
+    result = SimulationResult()
+
+    for game in range(games):
+        if game % games_per_player == 0:
+            engine = GameEngine(bank, rng=rng, clock=lambda: 0.0, spaced_repetition=spaced_repetition)
+        else:
+            engine.new_game()
+        while not engine.game_over:
+            selected, response_time = player.answer(engine, rng)
+            engine.answer(selected, response_time)
+            engine.next_question()
+
+        result.games += 1
+        result.victories += engine.victory
+        result.answers += engine.total_attempts
+        result.total_score += engine.score
+        result.best_score = max(result.best_score, engine.score)
+        bucket = engine.score // bucket_size * bucket_size
+        result.score_histogram[bucket] = result.score_histogram.get(bucket, 0) + 1
+
+    return result
+
+
+def simulate(games: int, player: PlayerModel, workers: int, seed: int = 0, bank_path=None, chunk_size=10_000,
+             games_per_player=1, spaced_repetition=True) -> SimulationResult:
+    """Play `games` games across a pool of `workers` processes"""
+    # Chunks hold whole players, so a player's games stay on one engine
+    chunk_size = max(chunk_size // games_per_player, 1) * games_per_player
+    chunks = [min(chunk_size, games - start) for start in range(0, games, chunk_size)]
+    options = dict(games_per_player=games_per_player, spaced_repetition=spaced_repetition)
+    result = SimulationResult()
+    if workers <= 1:
+        for i, chunk in enumerate(chunks):
+            result.merge(play_games(chunk, player, seed + i, bank_path, **options))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, chunk, player, seed + i, bank_path, **options) for i, chunk in enumerate(chunks)]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--accuracy", default="0.9,0.75,0.6", help="correct-answer probability for difficulty 1,2,3")
+    parser.add_argument("--median-time", type=float, default=5.0, help="median response time in seconds")
+    parser.add_argument("--time-sigma", type=float, default=0.5, help="log-normal sigma of the response time")
+    parser.add_argument("--bank", help="bank file to play with instead of the built-in questions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games-per-player", type=int, default=1,
+                        help="games each simulated player plays on one engine, carrying its review schedule")
+    parser.add_argument("--random-selection", action="store_true", help="draw random unused words, no spaced repetition")
+    args = parser.parse_args()
+
+    accuracy = {difficulty: float(p) for difficulty, p in enumerate(args.accuracy.split(","), start=1)}
+    player = PlayerModel(accuracy, args.median_time, args.time_sigma)
+
+    start = time.perf_counter()
+    result = simulate(args.games, player, args.workers, args.seed, args.bank,
+                      games_per_player=args.games_per_player, spaced_repetition=not args.random_selection)
+    elapsed = time.perf_counter() - start
+
+    print(f"games:        {result.games}")
+    print(f"victory rate: {result.victories / result.games:.1%}")
+    print(f"mean answers: {result.answers / result.games:.2f}")
+    print(f"mean score:   {result.total_score / result.games:.1f} (best {result.best_score})")
+    print("score histogram:")
+    for bucket in sorted(result.score_histogram):
+        print(f"  {bucket:>5}+ {result.score_histogram[bucket]}")
+    print(f"throughput:   {result.games / elapsed:,.0f} games/s on {args.workers} workers "
+          f"({result.games / elapsed / args.workers:,.0f} games/s per core)")
+
+
+if __name__ == "__main__":
+    main()